@@ -1,139 +1,115 @@
-from flask import Flask, request, jsonify
+import time
+
+# Measured from the start of this module's import to report worker cold start
+IMPORT_STARTED = time.perf_counter()
+
+from flask import Blueprint, Flask, current_app, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
-import google.generativeai as genai
 import os
-import PyPDF2 as pdf
 from dotenv import load_dotenv
 import json
+import re
 import io
 import logging
-import time
+import queue
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import timedelta
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 
 # Import our custom modules
-from config.database import init_database, close_database, get_database
+from config.database import get_database
+from config.migrations import apply_migrations
 from routes.auth import auth_bp
 from routes.reviews import reviews_bp
-from models.review import Review
+from routes.analytics import analytics_bp
+from services.cache import get_result_cache, get_extraction_cache
+from services.job_queue import JobQueue, CallbackURLError
+from services.pdf_extraction import get_extraction_engine
+from services.prescorer import local_analysis
+from services.prompt_builder import build_prompt
+from services.write_batcher import get_review_write_batcher, DURABILITY_FLUSHED
+from services.llm_client import get_llm_client, GEMINI_MODEL_NAME, GENERATION_CONFIG
+from services.tracing import bind, install_log_filter, init_app as init_tracing
+from services.metrics import (
+    stage, init_app as init_metrics, metrics_response, LLM_BYTES, ANALYSIS_FALLBACKS, PARSE_FAILURES
+)
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini AI
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Configure Flask
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['JWT_SECRET_KEY'] = os.getenv(
-    'JWT_SECRET_KEY', 'your-secret-key-change-in-production')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
-app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
-
-# Initialize JWT
-jwt = JWTManager(app)
-
-# Configure CORS with specific settings
-CORS(app,
-     origins=['*'],  # Allow all origins for now, restrict in production
-     methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-     allow_headers=['Content-Type', 'Authorization'],
-     supports_credentials=False)
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; each line carries the trace ID of the request that emitted it
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:[trace %(trace_id)s] %(message)s')
+install_log_filter()
 logger = logging.getLogger(__name__)
 
-# Register blueprints
-app.register_blueprint(auth_bp)
-app.register_blueprint(reviews_bp)
-
-# Initialize database connection
-
-
-def initialize_database():
-    """Initialize database connection"""
-    if not init_database():
-        logger.error("Failed to initialize database connection")
-        raise Exception("Database initialization failed")
-    logger.info("Database initialized successfully")
-
-
-# Initialize database when the module is loaded
-initialize_database()
-
-# Cleanup database connection on app teardown
-
-
-@app.teardown_appcontext
-def close_db(error):
-    """Close database connection on app teardown"""
-    if error:
-        logger.error(f"App context teardown with error: {error}")
-    # Database connections are managed by the connection pool
-
-# Error handlers
-
-
-@app.errorhandler(413)
-def too_large(e):
-    return jsonify({'error': 'File too large. Maximum size is 16MB.'}), 413
-
-
-@app.errorhandler(400)
-def bad_request(e):
-    return jsonify({'error': 'Bad request. Please check your input.'}), 400
-
-
-@app.errorhandler(500)
-def internal_error(e):
-    logger.error(f"Internal server error: {str(e)}")
-    return jsonify({'error': 'Internal server error. Please try again later.'}), 500
+# Routes defined in this module; registered on the app by create_app()
+main_bp = Blueprint('main', __name__)
 
 
 def get_gemini_response(input_text):
     """Get response from Gemini AI model"""
     try:
-        # Use Gemini 2.0 Flash model
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-
-        # Configure generation parameters for better consistency
-        generation_config = genai.types.GenerationConfig(
-            temperature=0.1,  # Lower temperature for more consistent responses
-            top_p=0.8,
-            top_k=40,
-            max_output_tokens=1000,
-        )
+        prompt_bytes = len(input_text.encode('utf-8'))
+        LLM_BYTES.labels('prompt').inc(prompt_bytes)
+        with stage('llm') as llm_span:
+            response_text = get_llm_client().generate(input_text)
+            if llm_span:
+                llm_span.set_attribute('llm.model', GEMINI_MODEL_NAME)
+                llm_span.set_attribute('llm.prompt_bytes', prompt_bytes)
+                llm_span.set_attribute('llm.response_bytes', len(response_text.encode('utf-8')))
+        LLM_BYTES.labels('response').inc(len(response_text.encode('utf-8')))
+        logger.info(f"AI Response received: {len(response_text)} characters")
+        return response_text
 
-        response = model.generate_content(
-            input_text,
-            generation_config=generation_config
-        )
+    except Exception as e:
+        logger.error(f"AI model error: {str(e)}")
+        raise Exception(f"AI model error: {str(e)}")
 
-        if not response.text:
-            raise Exception("Empty response from AI model")
 
-        logger.info(f"AI Response received: {len(response.text)} characters")
-        return response.text
+def stream_gemini_response(input_text):
+    """Stream response text from Gemini AI model as it is generated"""
+    try:
+        LLM_BYTES.labels('prompt').inc(len(input_text.encode('utf-8')))
+        with stage('llm') as llm_span:
+            if llm_span:
+                llm_span.set_attribute('llm.model', GEMINI_MODEL_NAME)
+                llm_span.set_attribute('llm.streamed', True)
+            for chunk in get_llm_client().stream(input_text):
+                LLM_BYTES.labels('response').inc(len(chunk.encode('utf-8')))
+                yield chunk
 
     except Exception as e:
-        logger.error(f"AI model error: {str(e)}")
+        logger.error(f"AI model streaming error: {str(e)}")
         raise Exception(f"AI model error: {str(e)}")
 
 
+def report_extraction(pdf_span, extraction):
+    """Log a finished PDF extraction and add its details to the span"""
+    if pdf_span:
+        pdf_span.set_attribute('pdf.page_count', extraction['pageCount'])
+        pdf_span.set_attribute('pdf.pages_extracted', extraction['pagesExtracted'])
+        pdf_span.set_attribute('pdf.cpu_ms', extraction['cpuMs'])
+        pdf_span.set_attribute('pdf.cached', extraction['cached'])
+    if extraction['cached']:
+        logger.info(f"PDF text served from the extraction cache in {extraction['elapsedMs']}ms")
+        return
+    logger.info(
+        f"PDF extraction took {extraction['elapsedMs']}ms "
+        f"({extraction['pagesExtracted']}/{extraction['pageCount']} pages, "
+        f"{extraction['cpuMs']}ms CPU)")
+
+
 def extract_pdf_text(file_stream):
     """Extract text from PDF file"""
     try:
-        reader = pdf.PdfReader(file_stream)
-        text = ""
-        for page in reader.pages:
-            text += str(page.extract_text())
-        return text
+        with stage('pdf_extraction') as pdf_span:
+            extraction = get_extraction_engine().extract(file_stream.read())
+        report_extraction(pdf_span, extraction)
+        return extraction['text']
     except Exception as e:
         raise Exception(f"PDF processing error: {str(e)}")
 
@@ -165,6 +141,7 @@ def parse_ai_response(response_text):
             try:
                 parsed_data = json.loads(json_str)
             except json.JSONDecodeError:
+                PARSE_FAILURES.labels('needs_repair').inc()
                 # If JSON parsing fails, try to fix common issues
                 json_str = json_str.replace("'", '"')  # Replace single quotes
                 json_str = json_str.replace('""', '"')  # Fix double quotes
@@ -194,6 +171,7 @@ def parse_ai_response(response_text):
 
         else:
             logger.warning("No JSON structure found in response")
+            PARSE_FAILURES.labels('no_json').inc()
             # Fallback parsing if JSON structure is not found
             return {
                 'jd_match': '0%',
@@ -203,6 +181,7 @@ def parse_ai_response(response_text):
 
     except Exception as e:
         logger.error(f"Error parsing AI response: {str(e)}")
+        PARSE_FAILURES.labels('unparseable').inc()
         # Return default structure if parsing fails
         return {
             'jd_match': '0%',
@@ -239,17 +218,252 @@ Instructions:
 """
 
 
-@app.route('/', methods=['GET'])
+@main_bp.route('/', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    result_cache = get_result_cache()
+    extraction_cache = get_extraction_cache()
     return jsonify({
         'status': 'healthy',
         'message': 'Smart ATS API is running',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'startup': current_app.config['STARTUP_TIMINGS'],
+        'resultCache': result_cache.get_stats() if result_cache else None,
+        'extractionCache': extraction_cache.get_stats() if extraction_cache else None,
+        'llm': get_llm_client().get_stats()
     })
 
 
-@app.route('/analyze', methods=['POST'])
+@main_bp.route('/health/db', methods=['GET'])
+def database_health_check():
+    """MongoDB reachability and this worker's connection pool metrics"""
+    db = get_database()
+    started = time.perf_counter()
+    healthy = db.is_connected()
+    return jsonify({
+        'status': 'healthy' if healthy else 'unhealthy',
+        'pingMs': round((time.perf_counter() - started) * 1000, 2),
+        'pool': db.get_pool_stats()
+    }), 200 if healthy else 503
+
+
+@main_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics, optionally protected by METRICS_AUTH_TOKEN"""
+    token = os.getenv('METRICS_AUTH_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return jsonify({'error': 'Unauthorized'}), 401
+    return metrics_response()
+
+
+class AnalysisFallback(Exception):
+    """Raised when the AI model could not produce an analysis"""
+
+    def __init__(self, response, status_code=200):
+        super().__init__(response.get('profile_summary', 'Analysis unavailable'))
+        self.response = response
+        self.status_code = status_code
+
+
+def check_analysis_form(form, files):
+    """Validate the form fields and uploaded files of an analysis request
+
+    Returns (job_description, resume_file, None) on success, or
+    (None, None, error_message) when the request is invalid. Shared by the
+    Flask views and the ASGI entry point.
+    """
+    # Check if required fields are present
+    if 'job_description' not in form:
+        logger.warning("Job description missing from request")
+        return None, None, 'Job description is required'
+
+    if 'resume' not in files:
+        logger.warning("Resume file missing from request")
+        return None, None, 'Resume file is required'
+
+    job_description = form['job_description']
+    resume_file = files['resume']
+
+    logger.info(f"Processing resume: {resume_file.filename}")
+
+    # Validate inputs
+    if not job_description.strip():
+        logger.warning("Empty job description provided")
+        return None, None, 'Job description cannot be empty'
+
+    if resume_file.filename == '':
+        logger.warning("No resume file selected")
+        return None, None, 'No resume file selected'
+
+    if not resume_file.filename.lower().endswith('.pdf'):
+        logger.warning(f"Invalid file type: {resume_file.filename}")
+        return None, None, 'Only PDF files are supported'
+
+    return job_description, resume_file, None
+
+
+def validate_analysis_request():
+    """Validate the form fields of an analysis request
+
+    Returns (job_description, resume_file, None) on success, or
+    (None, None, error_response) when the request is invalid.
+    """
+    job_description, resume_file, error = check_analysis_form(request.form, request.files)
+    if error:
+        return None, None, (jsonify({'error': error}), 400)
+    return job_description, resume_file, None
+
+
+def get_precomputed_analysis(resume_text, job_description):
+    """Get an analysis that does not need the AI model, if there is one
+
+    Returns (response, cache_key). The response is None when the AI model
+    must be called; cache_key is where its result should then be stored.
+    """
+    # Resumes that clearly do not match get a local result without the AI model
+    local_response = local_analysis(resume_text, job_description)
+    if local_response is not None:
+        logger.info("Local pre-score below threshold, skipping AI model")
+        local_response['source'] = 'local'
+        return local_response, None
+
+    # Serve repeated analyses from the result cache
+    result_cache = get_result_cache()
+    if not result_cache:
+        return None, None
+
+    cache_key = result_cache.make_key(
+        resume_text, job_description, GEMINI_MODEL_NAME, GENERATION_CONFIG)
+    with stage('cache_lookup'):
+        cached_response = result_cache.get(cache_key)
+
+    if cached_response is not None:
+        logger.info("Result cache hit, skipping AI model")
+        cached_response['cache'] = 'hit'
+        cached_response['source'] = 'ai'
+
+    return cached_response, cache_key
+
+
+def get_fallback_response(resume_text):
+    """Response returned when the AI model is unavailable"""
+    return {
+        'jd_match': '50%',
+        'missing_keywords': ['Unable to analyze - AI service unavailable'],
+        'profile_summary': f'Analysis temporarily unavailable due to AI service issues. Resume contains {len(resume_text)} characters of text. Please try again later.'
+    }
+
+
+def build_analysis_prompt(resume_text, job_description):
+    """Build the AI prompt from compressed inputs within the token budget"""
+    with stage('prompt_build'):
+        formatted_prompt, prompt_tokens = build_prompt(
+            input_prompt, resume_text, job_description)
+    logger.info(
+        f"Prompt tokens (estimated): {prompt_tokens['original']} before, "
+        f"{prompt_tokens['compressed']} after compression")
+    return formatted_prompt, prompt_tokens
+
+
+def finalize_analysis(ai_response, resume_text, cache_key):
+    """Parse and validate an AI response, storing it in the result cache"""
+    # Parse the response
+    with stage('parse'):
+        parsed_response = parse_ai_response(ai_response)
+    logger.info("Successfully parsed AI response")
+
+    # Validate the parsed response
+    if not parsed_response.get('jd_match') or parsed_response.get('jd_match') == '0%':
+        logger.warning(
+            "Received low-quality response, adding fallback data")
+        if not parsed_response.get('profile_summary') or 'Error' in parsed_response.get('profile_summary', ''):
+            parsed_response[
+                'profile_summary'] = f"Resume analysis completed. The document contains {len(resume_text)} characters of professional content."
+
+    # Only cache responses that parsed into a real score
+    result_cache = get_result_cache()
+    if result_cache and cache_key and parsed_response.get('jd_match', '0%') != '0%':
+        result_cache.set(cache_key, parsed_response)
+    parsed_response['cache'] = 'miss'
+    parsed_response['source'] = 'ai'
+
+    return parsed_response
+
+
+def run_analysis(resume_text, job_description):
+    """Analyze extracted resume text against a job description
+
+    Raises AnalysisFallback when the AI model is unavailable.
+    """
+    precomputed_response, cache_key = get_precomputed_analysis(
+        resume_text, job_description)
+    if precomputed_response is not None:
+        return precomputed_response
+
+    formatted_prompt, prompt_tokens = build_analysis_prompt(
+        resume_text, job_description)
+
+    # Get AI response; the LLM client retries with backoff and fails fast
+    # while its circuit breaker is open
+    logger.info("Sending request to AI model")
+    try:
+        ai_response = get_gemini_response(formatted_prompt)
+    except Exception:
+        logger.error("AI request failed, returning fallback response")
+        ANALYSIS_FALLBACKS.labels('llm_error').inc()
+        raise AnalysisFallback(get_fallback_response(resume_text))
+
+    if not ai_response:
+        logger.error("No AI response received")
+        ANALYSIS_FALLBACKS.labels('empty_response').inc()
+        raise AnalysisFallback({
+            'jd_match': '0%',
+            'missing_keywords': ['Analysis failed'],
+            'profile_summary': 'Unable to analyze resume at this time. Please try again later.'
+        }, 500)
+
+    parsed_response = finalize_analysis(ai_response, resume_text, cache_key)
+    parsed_response['prompt_tokens'] = prompt_tokens
+    return parsed_response
+
+
+def build_review_data(user_id, job_title, job_description, resume_file_name, parsed_response):
+    """Build the review data saved for an analysis"""
+    # Extract match score as integer
+    match_score_str = parsed_response.get('jd_match', '0%')
+    match_score = int(match_score_str.replace('%', ''))
+
+    return {
+        'userId': user_id,
+        'jobTitle': job_title,
+        'jobDescription': job_description,
+        'resumeFileName': secure_filename(resume_file_name),
+        'matchScore': match_score,
+        'missingKeywords': parsed_response.get('missing_keywords', []),
+        'profileSummary': parsed_response.get('profile_summary', ''),
+    }
+
+
+def save_analysis_review(user_id, job_title, job_description, resume_file_name, parsed_response):
+    """Save an analysis as a review for the user, returning the review ID"""
+    try:
+        # Save review through the write batcher
+        review_data = build_review_data(
+            user_id, job_title, job_description, resume_file_name, parsed_response)
+
+        with stage('review_save'):
+            saved_review = get_review_write_batcher().save(review_data)
+        logger.info(
+            f"Review saved for user {user_id}: {saved_review['id']}")
+        return saved_review['id']
+
+    except Exception as save_error:
+        logger.warning(f"Failed to save review: {str(save_error)}")
+        # Don't fail the entire request if saving fails
+        return None
+
+
+@main_bp.route('/analyze', methods=['POST'])
 @jwt_required(optional=True)
 def analyze_resume():
     """Analyze resume against job description"""
@@ -259,32 +473,9 @@ def analyze_resume():
         logger.info(
             f"Received resume analysis request from user: {user_id or 'anonymous'}")
 
-        # Check if required fields are present
-        if 'job_description' not in request.form:
-            logger.warning("Job description missing from request")
-            return jsonify({'error': 'Job description is required'}), 400
-
-        if 'resume' not in request.files:
-            logger.warning("Resume file missing from request")
-            return jsonify({'error': 'Resume file is required'}), 400
-
-        job_description = request.form['job_description']
-        resume_file = request.files['resume']
-
-        logger.info(f"Processing resume: {resume_file.filename}")
-
-        # Validate inputs
-        if not job_description.strip():
-            logger.warning("Empty job description provided")
-            return jsonify({'error': 'Job description cannot be empty'}), 400
-
-        if resume_file.filename == '':
-            logger.warning("No resume file selected")
-            return jsonify({'error': 'No resume file selected'}), 400
-
-        if not resume_file.filename.lower().endswith('.pdf'):
-            logger.warning(f"Invalid file type: {resume_file.filename}")
-            return jsonify({'error': 'Only PDF files are supported'}), 400
+        job_description, resume_file, error_response = validate_analysis_request()
+        if error_response:
+            return error_response
 
         # Extract text from PDF
         logger.info("Extracting text from PDF")
@@ -296,91 +487,21 @@ def analyze_resume():
 
         logger.info(f"Extracted {len(resume_text)} characters from PDF")
 
-        # Prepare prompt for AI
-        formatted_prompt = input_prompt.format(
-            text=resume_text,
-            jd=job_description
-        )
-
-        # Get AI response with retry mechanism
-        logger.info("Sending request to AI model")
-        max_retries = 2
-        ai_response = None
-
-        for attempt in range(max_retries + 1):
-            try:
-                ai_response = get_gemini_response(formatted_prompt)
-                logger.info(
-                    f"Received response from AI model (attempt {attempt + 1})")
-                break
-            except Exception as ai_error:
-                logger.warning(
-                    f"AI request attempt {attempt + 1} failed: {str(ai_error)}")
-                if attempt == max_retries:
-                    # If all retries failed, return a fallback response
-                    logger.error(
-                        "All AI request attempts failed, returning fallback response")
-                    return jsonify({
-                        'jd_match': '50%',
-                        'missing_keywords': ['Unable to analyze - AI service unavailable'],
-                        'profile_summary': f'Analysis temporarily unavailable due to AI service issues. Resume contains {len(resume_text)} characters of text. Please try again later.'
-                    })
-                time.sleep(1)  # Wait 1 second before retry
-
-        if not ai_response:
-            logger.error("No AI response received after retries")
-            return jsonify({
-                'jd_match': '0%',
-                'missing_keywords': ['Analysis failed'],
-                'profile_summary': 'Unable to analyze resume at this time. Please try again later.'
-            }), 500
-
-        # Parse the response
-        parsed_response = parse_ai_response(ai_response)
-        logger.info("Successfully parsed AI response")
-
-        # Validate the parsed response
-        if not parsed_response.get('jd_match') or parsed_response.get('jd_match') == '0%':
-            logger.warning(
-                "Received low-quality response, adding fallback data")
-            if not parsed_response.get('profile_summary') or 'Error' in parsed_response.get('profile_summary', ''):
-                parsed_response[
-                    'profile_summary'] = f"Resume analysis completed. The document contains {len(resume_text)} characters of professional content."
+        try:
+            parsed_response = run_analysis(resume_text, job_description)
+        except AnalysisFallback as fallback:
+            return jsonify(fallback.response), fallback.status_code
 
         # Save review if user is authenticated
         if user_id:
-            try:
-                # Get job title from form data
-                job_title = request.form.get('job_title', 'Untitled Position')
-
-                # Extract match score as integer
-                match_score_str = parsed_response.get('jd_match', '0%')
-                match_score = int(match_score_str.replace('%', ''))
-
-                # Create review model instance
-                review_model = Review(get_database().get_reviews_collection())
-
-                # Save review
-                review_data = {
-                    'userId': user_id,
-                    'jobTitle': job_title,
-                    'jobDescription': job_description,
-                    'resumeFileName': secure_filename(resume_file.filename),
-                    'matchScore': match_score,
-                    'missingKeywords': parsed_response.get('missing_keywords', []),
-                    'profileSummary': parsed_response.get('profile_summary', ''),
-                }
-
-                saved_review = review_model.create_review(review_data)
-                logger.info(
-                    f"Review saved for user {user_id}: {saved_review['id']}")
-
-                # Add review ID to response
-                parsed_response['reviewId'] = saved_review['id']
+            # Get job title from form data
+            job_title = request.form.get('job_title', 'Untitled Position')
+            review_id = save_analysis_review(
+                user_id, job_title, job_description, resume_file.filename, parsed_response)
 
-            except Exception as save_error:
-                logger.warning(f"Failed to save review: {str(save_error)}")
-                # Don't fail the entire request if saving fails
+            # Add review ID to response
+            if review_id:
+                parsed_response['reviewId'] = review_id
 
         return jsonify(parsed_response)
 
@@ -394,6 +515,508 @@ def analyze_resume():
         }), 500
 
 
+# Matches the score in a partially generated JSON response
+JD_MATCH_PATTERN = re.compile(r'"(?:JD Match|jd_match)"\s*:\s*"?\s*(\d{1,3})\s*%')
+
+
+def sse_event(event, data):
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def generate_analysis_events(resume_bytes, job_description, job_title, resume_file_name, user_id):
+    """Run an analysis, yielding SSE messages as results become available"""
+    yield sse_event('status', {'stage': 'extracting'})
+
+    try:
+        resume_text = extract_pdf_text(io.BytesIO(resume_bytes))
+    except Exception as e:
+        yield sse_event('error', {'error': str(e)})
+        return
+
+    if not resume_text.strip():
+        logger.error("Failed to extract text from PDF")
+        yield sse_event('error', {'error': 'Could not extract text from PDF. Please ensure the PDF contains readable text.'})
+        return
+
+    logger.info(f"Extracted {len(resume_text)} characters from PDF")
+
+    parsed_response, cache_key = get_precomputed_analysis(
+        resume_text, job_description)
+    jd_match_sent = False
+
+    if parsed_response is None:
+        yield sse_event('status', {'stage': 'analyzing'})
+
+        formatted_prompt, prompt_tokens = build_analysis_prompt(
+            resume_text, job_description)
+
+        # The LLM client retries only until the first chunk, so clients never
+        # see tokens from two different generations
+        chunks = []
+        try:
+            for chunk in stream_gemini_response(formatted_prompt):
+                chunks.append(chunk)
+                yield sse_event('token', {'text': chunk})
+
+                if not jd_match_sent:
+                    match = JD_MATCH_PATTERN.search(''.join(chunks))
+                    if match:
+                        jd_match_sent = True
+                        yield sse_event('jd_match', {'jd_match': f"{match.group(1)}%"})
+        except Exception:
+            if chunks:
+                yield sse_event('error', {'error': 'AI response was interrupted. Please try again.'})
+                return
+            logger.error("AI streaming failed, returning fallback response")
+            ANALYSIS_FALLBACKS.labels('llm_error').inc()
+            yield sse_event('result', get_fallback_response(resume_text))
+            return
+
+        ai_response = ''.join(chunks)
+        if not ai_response:
+            yield sse_event('error', {'error': 'Unable to analyze resume at this time. Please try again later.'})
+            return
+
+        parsed_response = finalize_analysis(ai_response, resume_text, cache_key)
+        parsed_response['prompt_tokens'] = prompt_tokens
+
+    if not jd_match_sent and parsed_response.get('jd_match'):
+        yield sse_event('jd_match', {'jd_match': parsed_response['jd_match']})
+
+    # Save review if user is authenticated
+    if user_id:
+        review_id = save_analysis_review(
+            user_id, job_title, job_description, resume_file_name, parsed_response)
+        if review_id:
+            parsed_response['reviewId'] = review_id
+
+    yield sse_event('result', parsed_response)
+
+
+@main_bp.route('/analyze/stream', methods=['POST'])
+@jwt_required(optional=True)
+def analyze_resume_stream():
+    """Analyze resume against job description, streaming progress over SSE"""
+    try:
+        user_id = get_jwt_identity()
+        logger.info(
+            f"Received streaming analysis request from user: {user_id or 'anonymous'}")
+
+        job_description, resume_file, error_response = validate_analysis_request()
+        if error_response:
+            return error_response
+
+        return Response(
+            stream_with_context(generate_analysis_events(
+                resume_file.read(),
+                job_description,
+                request.form.get('job_title', 'Untitled Position'),
+                resume_file.filename,
+                user_id
+            )),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'  # Disable proxy buffering
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error in analyze_resume_stream: {str(e)}")
+        return jsonify({'error': 'An error occurred during analysis. Please try again.'}), 500
+
+
+def process_analysis_job(payload):
+    """Run a queued analysis job and return its result"""
+    resume_text = payload.get('resumeText')
+    if resume_text is None:
+        # Jobs queued before text was extracted at submission carry the PDF
+        resume_text = extract_pdf_text(io.BytesIO(payload['resume']))
+
+    if not resume_text.strip():
+        raise Exception('Could not extract text from PDF. Please ensure the PDF contains readable text.')
+
+    try:
+        parsed_response = run_analysis(resume_text, payload['jobDescription'])
+    except AnalysisFallback as fallback:
+        raise Exception(str(fallback))
+
+    if payload.get('userId'):
+        review_id = save_analysis_review(
+            payload['userId'], payload['jobTitle'], payload['jobDescription'],
+            payload['resumeFileName'], parsed_response)
+        if review_id:
+            parsed_response['reviewId'] = review_id
+
+    return parsed_response
+
+
+# Queue for asynchronous analysis jobs. Set ANALYSIS_JOB_WORKERS=0 to only
+# accept jobs in this process and leave processing to worker.py processes.
+ANALYSIS_JOB_WORKERS = int(os.getenv('ANALYSIS_JOB_WORKERS', 4))
+analysis_job_queue = JobQueue(
+    get_database().get_analysis_jobs_collection,
+    process_analysis_job,
+    max_workers=max(ANALYSIS_JOB_WORKERS, 1),
+    lease_seconds=int(os.getenv('ANALYSIS_JOB_LEASE_SECONDS', 300)),
+    callback_allowed_hosts=os.getenv('ANALYSIS_JOB_CALLBACK_HOSTS', '').split(',')
+)
+
+
+@main_bp.route('/analyze/jobs', methods=['POST'])
+@jwt_required(optional=True)
+def submit_analysis_job():
+    """Queue a resume analysis and return its job ID immediately"""
+    try:
+        user_id = get_jwt_identity()
+        logger.info(
+            f"Received analysis job from user: {user_id or 'anonymous'}")
+
+        job_description, resume_file, error_response = validate_analysis_request()
+        if error_response:
+            return error_response
+
+        callback_url = request.form.get('callback_url')
+        if callback_url and not user_id:
+            return jsonify({'error': 'Callback URLs require authentication'}), 401
+
+        # Extracted up front so the job stores text rather than the whole PDF
+        resume_text = extract_pdf_text(resume_file)
+        if not resume_text.strip():
+            logger.error("Failed to extract text from PDF")
+            return jsonify({'error': 'Could not extract text from PDF. Please ensure the PDF contains readable text.'}), 400
+
+        payload = {
+            'userId': user_id,
+            'jobTitle': request.form.get('job_title', 'Untitled Position'),
+            'jobDescription': job_description,
+            'resumeFileName': resume_file.filename,
+            'resumeText': resume_text
+        }
+
+        try:
+            job = analysis_job_queue.submit(
+                payload, user_id=user_id, callback_url=callback_url)
+        except CallbackURLError as e:
+            return jsonify({'error': str(e)}), 400
+        job_id = job['jobId']
+        logger.info(f"Analysis job queued: {job_id}")
+
+        response = {
+            'jobId': job_id,
+            'status': 'queued',
+            'statusUrl': f'/analyze/jobs/{job_id}'
+        }
+        if job['accessToken']:
+            # Anonymous jobs can only be read with this token
+            response['accessToken'] = job['accessToken']
+        return jsonify(response), 202
+
+    except Exception as e:
+        logger.error(f"Error in submit_analysis_job: {str(e)}")
+        return jsonify({'error': 'Failed to queue analysis job'}), 500
+
+
+@main_bp.route('/analyze/jobs/<job_id>', methods=['GET'])
+@jwt_required(optional=True)
+def get_analysis_job(job_id):
+    """Get the status and result of an analysis job"""
+    try:
+        user_id = get_jwt_identity()
+
+        # Header only: query strings end up in access logs and proxies
+        access_token = request.headers.get('X-Job-Token')
+        job = analysis_job_queue.get_job(job_id, user_id, access_token)
+
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        return jsonify(job)
+
+    except Exception as e:
+        logger.error(f"Error in get_analysis_job: {str(e)}")
+        return jsonify({'error': 'Failed to get analysis job'}), 500
+
+
+# Batch analysis limits
+BATCH_MAX_RESUMES = int(os.getenv('BATCH_MAX_RESUMES', 200))
+BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', 8))
+BATCH_SAVE_CHUNK_SIZE = int(os.getenv('BATCH_SAVE_CHUNK_SIZE', 50))
+BATCH_MAX_UNCOMPRESSED_BYTES = int(
+    os.getenv('BATCH_MAX_UNCOMPRESSED_BYTES', 100 * 1024 * 1024))
+
+
+def collect_batch_resumes():
+    """Collect (file name, PDF bytes) pairs from uploaded PDFs and zip archives"""
+    resumes = []
+    uncompressed_bytes = 0
+
+    for upload in request.files.getlist('resumes'):
+        file_name = upload.filename or ''
+
+        if file_name.lower().endswith('.pdf'):
+            resumes.append((file_name, upload.read()))
+
+        elif file_name.lower().endswith('.zip'):
+            with zipfile.ZipFile(upload.stream) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+                        continue
+                    if info.filename.startswith('__MACOSX/'):
+                        continue
+
+                    # Guard against zip bombs before decompressing
+                    uncompressed_bytes += info.file_size
+                    if uncompressed_bytes > BATCH_MAX_UNCOMPRESSED_BYTES:
+                        raise ValueError('Zip archive is too large when uncompressed')
+
+                    resumes.append(
+                        (os.path.basename(info.filename), archive.read(info)))
+
+        else:
+            raise ValueError(f'Unsupported file type: {file_name}')
+
+        if len(resumes) > BATCH_MAX_RESUMES:
+            raise ValueError(
+                f'Too many resumes. Maximum is {BATCH_MAX_RESUMES} per batch.')
+
+    return resumes
+
+
+def generate_batch_results(resumes, job_description, job_title, user_id):
+    """Analyze resumes concurrently, yielding NDJSON lines as each finishes
+
+    PDF text is extracted on the shared process pool and AI calls run on a
+    thread pool capped at BATCH_LLM_CONCURRENCY. Reviews are queued on the
+    review write batcher as results arrive and their IDs are reported every
+    BATCH_SAVE_CHUNK_SIZE results.
+    """
+    outcomes = queue.Queue()
+    llm_pool = ThreadPoolExecutor(
+        max_workers=BATCH_LLM_CONCURRENCY, thread_name_prefix='batch-llm')
+    batcher = get_review_write_batcher()
+
+    def analyze(extraction):
+        if not extraction['text'].strip():
+            raise ValueError('Could not extract text from PDF')
+        try:
+            parsed_response = run_analysis(extraction['text'], job_description)
+        except AnalysisFallback as fallback:
+            raise Exception(str(fallback))
+        return parsed_response, extraction
+
+    # Pool threads do not inherit the request's trace context
+    traced_analyze = bind(analyze)
+
+    def on_analyzed(index, file_name, future):
+        outcomes.put((index, file_name, future.exception() or future.result()))
+
+    def on_extracted(index, file_name, future):
+        if future.exception():
+            outcomes.put((index, file_name, future.exception()))
+            return
+        try:
+            llm_future = llm_pool.submit(traced_analyze, future.result())
+        except RuntimeError:
+            # The client disconnected and the batch was cancelled
+            return
+        llm_future.add_done_callback(partial(on_analyzed, index, file_name))
+
+    def save_pending(pending):
+        review_ids = {}
+        failed = 0
+        for index, review, write_future in pending:
+            try:
+                if batcher.durability == DURABILITY_FLUSHED:
+                    write_future.result(timeout=batcher.flush_timeout)
+                review_ids[str(index)] = review['id']
+            except Exception as save_error:
+                failed += 1
+                logger.warning(f"Failed to save batch review {index}: {str(save_error)}")
+
+        logger.info(f"Saved {len(review_ids)} batch reviews for user {user_id}")
+        line = {'type': 'saved', 'reviewIds': review_ids}
+        if failed:
+            line['error'] = f'Failed to save {failed} reviews'
+        return json.dumps(line) + '\n'
+
+    try:
+        extraction_engine = get_extraction_engine()
+        for index, (file_name, data) in enumerate(resumes):
+            extraction_future = extraction_engine.submit(data)
+            extraction_future.add_done_callback(
+                partial(on_extracted, index, file_name))
+
+        pending_reviews = []
+        succeeded = 0
+
+        for _ in range(len(resumes)):
+            index, file_name, outcome = outcomes.get()
+
+            if isinstance(outcome, Exception):
+                logger.warning(f"Batch resume {file_name} failed: {str(outcome)}")
+                line = {'type': 'error', 'index': index,
+                        'fileName': file_name, 'error': str(outcome)}
+            else:
+                succeeded += 1
+                parsed_response, extraction = outcome
+                line = {'type': 'result', 'index': index,
+                        'fileName': file_name, 'result': parsed_response,
+                        'extraction': {key: extraction[key] for key in
+                                       ('pageCount', 'pagesExtracted', 'elapsedMs', 'cpuMs')}}
+                if user_id:
+                    review, write_future = batcher.submit(build_review_data(
+                        user_id, job_title, job_description, file_name, parsed_response))
+                    pending_reviews.append((index, review, write_future))
+
+            yield json.dumps(line) + '\n'
+
+            if len(pending_reviews) >= BATCH_SAVE_CHUNK_SIZE:
+                yield save_pending(pending_reviews)
+                pending_reviews = []
+
+        if pending_reviews:
+            yield save_pending(pending_reviews)
+
+        yield json.dumps({
+            'type': 'summary',
+            'total': len(resumes),
+            'succeeded': succeeded,
+            'failed': len(resumes) - succeeded
+        }) + '\n'
+
+    finally:
+        llm_pool.shutdown(wait=False, cancel_futures=True)
+
+
+@main_bp.route('/analyze/batch', methods=['POST'])
+@jwt_required(optional=True)
+def analyze_batch():
+    """Analyze many resumes against one job description, streaming NDJSON results"""
+    try:
+        user_id = get_jwt_identity()
+
+        job_description = request.form.get('job_description', '')
+        if not job_description.strip():
+            return jsonify({'error': 'Job description is required'}), 400
+
+        try:
+            resumes = collect_batch_resumes()
+        except (ValueError, zipfile.BadZipFile) as e:
+            return jsonify({'error': str(e)}), 400
+
+        if not resumes:
+            return jsonify({'error': 'At least one PDF resume is required'}), 400
+
+        job_title = request.form.get('job_title', 'Untitled Position')
+        logger.info(
+            f"Received batch of {len(resumes)} resumes from user: {user_id or 'anonymous'}")
+
+        return Response(
+            stream_with_context(generate_batch_results(
+                resumes, job_description, job_title, user_id)),
+            mimetype='application/x-ndjson'
+        )
+
+    except Exception as e:
+        logger.error(f"Error in analyze_batch: {str(e)}")
+        return jsonify({'error': 'Batch analysis failed. Please try again.'}), 500
+
+
+def too_large(e):
+    return jsonify({'error': 'File too large. Maximum size is 16MB.'}), 413
+
+
+def bad_request(e):
+    return jsonify({'error': 'Bad request. Please check your input.'}), 400
+
+
+def internal_error(e):
+    logger.error(f"Internal server error: {str(e)}")
+    return jsonify({'error': 'Internal server error. Please try again later.'}), 500
+
+
+def start_analysis_job_workers():
+    """Start processing queued analysis jobs in this process, unless disabled
+
+    Called by the server entry points (gunicorn's post_worker_init hook, the
+    ASGI lifespan and ``__main__``), never on import.
+    """
+    if ANALYSIS_JOB_WORKERS > 0:
+        analysis_job_queue.start()
+
+
+def create_app(start_job_workers=False):
+    """Create and configure the Flask application
+
+    Nothing here touches the network: MongoDB and the AI model are connected
+    on first use, indexes are created by ``python manage.py migrate`` rather
+    than by every worker, and the job queue is only started when
+    ``start_job_workers`` is set.
+    """
+    created_started = time.perf_counter()
+
+    app = Flask(__name__)
+
+    # Configure Flask
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    app.config['JWT_SECRET_KEY'] = os.getenv(
+        'JWT_SECRET_KEY', 'your-secret-key-change-in-production')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
+
+    # Initialize JWT
+    JWTManager(app)
+
+    # Configure CORS with specific settings
+    CORS(app,
+         origins=['*'],  # Allow all origins for now, restrict in production
+         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+         allow_headers=['Content-Type', 'Authorization'],
+         supports_credentials=False)
+
+    # Register blueprints
+    app.register_blueprint(main_bp)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(reviews_bp)
+    app.register_blueprint(analytics_bp)
+
+    # Request spans and trace headers, then timing, Prometheus metrics and Server-Timing headers
+    init_tracing(app)
+    init_metrics(app)
+
+    # Error handlers
+    app.register_error_handler(413, too_large)
+    app.register_error_handler(400, bad_request)
+    app.register_error_handler(500, internal_error)
+
+    if start_job_workers:
+        start_analysis_job_workers()
+
+    now = time.perf_counter()
+    app.config['STARTUP_TIMINGS'] = {
+        'importMs': round((created_started - IMPORT_STARTED) * 1000, 2),
+        'createAppMs': round((now - created_started) * 1000, 2),
+        'totalMs': round((now - IMPORT_STARTED) * 1000, 2)
+    }
+    logger.info(
+        f"App created in {app.config['STARTUP_TIMINGS']['totalMs']}ms "
+        f"(imports {app.config['STARTUP_TIMINGS']['importMs']}ms)")
+    return app
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
+    # The development server applies pending migrations itself; deployments
+    # run ``python manage.py migrate`` once before starting workers
+    try:
+        apply_migrations(get_database().db)
+    except Exception as e:
+        logger.warning(f"Failed to apply migrations: {str(e)}")
+
+    start_analysis_job_workers()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
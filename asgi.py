@@ -0,0 +1,290 @@
+"""
+ASGI entry point for Smart ATS
+
+POST /analyze is served natively async: while a request waits on PDF
+extraction, the AI model or its review write, it holds no thread, so one
+process can keep hundreds of analyses in flight. Every other route is served
+by the Flask app on a small thread pool, with the same JSON contracts.
+
+Start with:
+    uvicorn asgi:app
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn asgi:app
+"""
+import os
+import time
+import asyncio
+import logging
+import contextlib
+
+import jwt
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+from app import (
+    app as flask_app, AnalysisFallback, ANALYSIS_FALLBACKS, DURABILITY_FLUSHED, LLM_BYTES, GEMINI_MODEL_NAME,
+    build_analysis_prompt, build_review_data, check_analysis_form, finalize_analysis, get_fallback_response,
+    get_precomputed_analysis, report_extraction, start_analysis_job_workers, analysis_job_queue
+)
+from services.llm_client import get_llm_client
+from services.metrics import HTTP_REQUEST_SECONDS, collect_server_timings, server_timing_header, stage
+from services.pdf_extraction import get_extraction_engine
+from services.tracing import get_tracer, traceparent_header, use_span, STATUS_ERROR
+from services.write_batcher import get_review_write_batcher
+
+logger = logging.getLogger(__name__)
+
+# Threads serving the Flask routes in each process
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 8))
+
+
+async def get_gemini_response_async(input_text):
+    """Get response from Gemini AI model without blocking the event loop"""
+    try:
+        prompt_bytes = len(input_text.encode('utf-8'))
+        LLM_BYTES.labels('prompt').inc(prompt_bytes)
+        with stage('llm') as llm_span:
+            response_text = await get_llm_client().agenerate(input_text)
+            if llm_span:
+                llm_span.set_attribute('llm.model', GEMINI_MODEL_NAME)
+                llm_span.set_attribute('llm.prompt_bytes', prompt_bytes)
+                llm_span.set_attribute('llm.response_bytes', len(response_text.encode('utf-8')))
+        LLM_BYTES.labels('response').inc(len(response_text.encode('utf-8')))
+        logger.info(f"AI Response received: {len(response_text)} characters")
+        return response_text
+
+    except Exception as e:
+        logger.error(f"AI model error: {str(e)}")
+        raise Exception(f"AI model error: {str(e)}")
+
+
+async def extract_pdf_text_async(data):
+    """Extract text from PDF bytes on the extraction process pool"""
+    try:
+        with stage('pdf_extraction') as pdf_span:
+            # Submitting hashes the PDF and may read the persistent extraction cache
+            future = await asyncio.to_thread(get_extraction_engine().submit, data)
+            extraction = await asyncio.wrap_future(future)
+        report_extraction(pdf_span, extraction)
+        return extraction['text']
+    except Exception as e:
+        raise Exception(f"PDF processing error: {str(e)}")
+
+
+async def run_analysis_async(resume_text, job_description):
+    """Analyze extracted resume text against a job description
+
+    Same steps as app.run_analysis; result cache lookups and stores, which
+    may go to MongoDB, run on the default thread pool. Raises
+    AnalysisFallback when the AI model is unavailable.
+    """
+    precomputed_response, cache_key = await asyncio.to_thread(
+        get_precomputed_analysis, resume_text, job_description)
+    if precomputed_response is not None:
+        return precomputed_response
+
+    formatted_prompt, prompt_tokens = build_analysis_prompt(
+        resume_text, job_description)
+
+    logger.info("Sending request to AI model")
+    try:
+        ai_response = await get_gemini_response_async(formatted_prompt)
+    except Exception:
+        logger.error("AI request failed, returning fallback response")
+        ANALYSIS_FALLBACKS.labels('llm_error').inc()
+        raise AnalysisFallback(get_fallback_response(resume_text))
+
+    if not ai_response:
+        logger.error("No AI response received")
+        ANALYSIS_FALLBACKS.labels('empty_response').inc()
+        raise AnalysisFallback({
+            'jd_match': '0%',
+            'missing_keywords': ['Analysis failed'],
+            'profile_summary': 'Unable to analyze resume at this time. Please try again later.'
+        }, 500)
+
+    parsed_response = await asyncio.to_thread(
+        finalize_analysis, ai_response, resume_text, cache_key)
+    parsed_response['prompt_tokens'] = prompt_tokens
+    return parsed_response
+
+
+async def save_analysis_review_async(user_id, job_title, job_description, resume_file_name, parsed_response):
+    """Save an analysis as a review through the write batcher, returning the review ID"""
+    try:
+        review_data = build_review_data(
+            user_id, job_title, job_description, resume_file_name, parsed_response)
+
+        batcher = get_review_write_batcher()
+        with stage('review_save'):
+            # submit blocks only when the batcher applies back-pressure
+            review, write_future = await asyncio.to_thread(batcher.submit, review_data)
+            if batcher.durability == DURABILITY_FLUSHED:
+                await asyncio.wait_for(asyncio.wrap_future(write_future), batcher.flush_timeout)
+        logger.info(
+            f"Review saved for user {user_id}: {review['id']}")
+        return review['id']
+
+    except Exception as save_error:
+        logger.warning(f"Failed to save review: {str(save_error)}")
+        # Don't fail the entire request if saving fails
+        return None
+
+
+def get_optional_identity(request: Request):
+    """Decode an optional bearer token the way jwt_required(optional=True) does
+
+    Returns (user_id, None), or (None, error_response) for an invalid token.
+    """
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None, None
+
+    try:
+        with flask_app.app_context():
+            claims = decode_token(header[len('Bearer '):].strip())
+            identity_claim = flask_app.config['JWT_IDENTITY_CLAIM']
+    except jwt.ExpiredSignatureError:
+        return None, JSONResponse({'msg': 'Token has expired'}, 401)
+    except Exception as e:
+        return None, JSONResponse({'msg': str(e)}, 422)
+
+    if claims.get('type') != 'access':
+        return None, JSONResponse({'msg': 'Only non-refresh tokens are allowed'}, 422)
+    return claims.get(identity_claim), None
+
+
+async def analyze_resume(request: Request) -> Response:
+    """Analyze resume against job description"""
+    try:
+        user_id, auth_error = get_optional_identity(request)
+        if auth_error:
+            return auth_error
+        logger.info(
+            f"Received resume analysis request from user: {user_id or 'anonymous'}")
+
+        # Rejected from the header before buffering when the length is declared
+        max_length = flask_app.config['MAX_CONTENT_LENGTH']
+        if int(request.headers.get('content-length') or 0) > max_length or len(await request.body()) > max_length:
+            return JSONResponse({'error': 'File too large. Maximum size is 16MB.'}, 413)
+
+        form = await request.form()
+        try:
+            fields = {key: value for key, value in form.multi_items() if isinstance(value, str)}
+            files = {key: value for key, value in form.multi_items() if isinstance(value, UploadFile)}
+            job_description, resume_file, error = check_analysis_form(fields, files)
+            if error:
+                return JSONResponse({'error': error}, 400)
+            resume_file_name = resume_file.filename
+            resume_bytes = await resume_file.read()
+        finally:
+            await form.close()
+
+        # Extract text from PDF
+        logger.info("Extracting text from PDF")
+        resume_text = await extract_pdf_text_async(resume_bytes)
+
+        if not resume_text.strip():
+            logger.error("Failed to extract text from PDF")
+            return JSONResponse({'error': 'Could not extract text from PDF. Please ensure the PDF contains readable text.'}, 400)
+
+        logger.info(f"Extracted {len(resume_text)} characters from PDF")
+
+        try:
+            parsed_response = await run_analysis_async(resume_text, job_description)
+        except AnalysisFallback as fallback:
+            return JSONResponse(fallback.response, fallback.status_code)
+
+        # Save review if user is authenticated
+        if user_id:
+            job_title = fields.get('job_title', 'Untitled Position')
+            review_id = await save_analysis_review_async(
+                user_id, job_title, job_description, resume_file_name, parsed_response)
+
+            # Add review ID to response
+            if review_id:
+                parsed_response['reviewId'] = review_id
+
+        return JSONResponse(parsed_response)
+
+    except Exception as e:
+        logger.error(f"Error in analyze_resume: {str(e)}")
+        return JSONResponse({
+            'error': str(e),
+            'jd_match': '0%',
+            'missing_keywords': [],
+            'profile_summary': 'An error occurred during analysis. Please try again.'
+        }, 500)
+
+
+def observed(route: str, endpoint):
+    """Trace and time an async endpoint as the Flask request hooks do for views"""
+
+    async def wrapper(request: Request) -> Response:
+        started = time.perf_counter()
+        root = get_tracer().start_remote_child(
+            f"{request.method} {route}",
+            {
+                "http.method": request.method,
+                "http.route": route,
+                "http.target": request.url.path,
+            },
+            traceparent=request.headers.get('traceparent')
+        )
+        try:
+            with use_span(root), collect_server_timings() as timings:
+                response = await endpoint(request)
+        except BaseException as e:
+            root.record_error(e)
+            get_tracer().finish_root(root)
+            raise
+
+        elapsed = time.perf_counter() - started
+        HTTP_REQUEST_SECONDS.labels(request.method, route, str(response.status_code)).observe(elapsed)
+        response.headers['Server-Timing'] = server_timing_header(timings, elapsed)
+        response.headers['traceparent'] = traceparent_header(root)
+        root.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            root.status = STATUS_ERROR
+        get_tracer().finish_root(root)
+        return response
+    return wrapper
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    """Process queued analysis jobs while the server runs"""
+    start_analysis_job_workers()
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(analysis_job_queue.stop, True)
+
+
+def create_asgi_app() -> Starlette:
+    """Serve /analyze natively and mount the Flask app for all other routes"""
+    return Starlette(
+        lifespan=lifespan,
+        routes=[
+            Route('/analyze', observed('/analyze', analyze_resume), methods=['POST']),
+            Mount('/', app=WSGIMiddleware(flask_app, workers=ASGI_WSGI_THREADS)),
+        ],
+        # Same CORS policy as the Flask app, also covering the native routes
+        middleware=[
+            Middleware(
+                CORSMiddleware,
+                allow_origins=['*'],
+                allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+                allow_headers=['Content-Type', 'Authorization']
+            )
+        ]
+    )
+
+
+app = create_asgi_app()
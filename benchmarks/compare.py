@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files
+
+Usage (from the project root):
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 0.1]
+
+Prints throughput and latency changes per scenario and exits with status 1
+when any scenario regresses by more than the threshold.
+"""
+import sys
+import json
+import argparse
+from typing import Dict, Any, List, Tuple
+
+# (metric path, label, whether higher is better)
+METRICS = [
+    (('throughputRps',), 'throughput', True),
+    (('throughputOps',), 'throughput', True),
+    (('latencyMs', 'p50'), 'p50', False),
+    (('latencyMs', 'p99'), 'p99', False),
+    (('errorRate',), 'errors', False),
+    (('analysesInFlightPerWorker',), 'in flight/worker', True),
+]
+
+
+def load_results(path: str) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    with open(path) as f:
+        report = json.load(f)
+    return report, {result['name']: result for result in report['results']}
+
+
+def metric(result: Dict[str, Any], path) -> Any:
+    value = result
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(baseline: Dict[str, Dict[str, Any]], candidate: Dict[str, Dict[str, Any]],
+            threshold: float) -> Tuple[List[List[str]], List[str]]:
+    """Rows of the comparison table and the list of regressions"""
+    rows = []
+    regressions = []
+    for name in sorted(set(baseline) | set(candidate)):
+        if name not in baseline or name not in candidate:
+            rows.append([name, 'only in ' + ('candidate' if name in candidate else 'baseline'), '', '', ''])
+            continue
+
+        for path, label, higher_is_better in METRICS:
+            old, new = metric(baseline[name], path), metric(candidate[name], path)
+            if old is None or new is None:
+                continue
+
+            if old:
+                change = (new - old) / old
+            else:
+                change = 0.0 if not new else float('inf')
+            worse = -change if higher_is_better else change
+            flag = ''
+            if label == 'errors':
+                # Error rates are compared in absolute terms
+                if new - old > threshold / 10:
+                    flag = 'REGRESSION'
+            elif worse > threshold:
+                flag = 'REGRESSION'
+            elif -worse > threshold:
+                flag = 'improved'
+
+            if flag == 'REGRESSION':
+                regressions.append(f"{name} {label}")
+            rows.append([name, label, f"{old:g}", f"{new:g}", f"{change:+.1%}" + (f"  {flag}" if flag else '')])
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative change counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    baseline_report, baseline = load_results(args.baseline)
+    candidate_report, candidate = load_results(args.candidate)
+
+    for label, report in (('baseline', baseline_report), ('candidate', candidate_report)):
+        git = report.get('git') or {}
+        print(f"{label:<10} {str(git.get('commit'))[:10]}{' (dirty)' if git.get('dirty') else ''} "
+              f"{report.get('createdAt')} {report.get('label') or ''}")
+    if baseline_report.get('environment') != candidate_report.get('environment'):
+        print("warning: results were recorded in different environments")
+    if baseline_report.get('config') != candidate_report.get('config'):
+        print("warning: results were recorded with different benchmark settings")
+    print()
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    header = ['scenario', 'metric', 'baseline', 'candidate', 'change']
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Synthetic, deterministic inputs for the benchmarks: resume PDFs, job
+descriptions and AI model responses
+"""
+import json
+import random
+from typing import List, Dict
+
+SKILLS = [
+    "Python", "Flask", "Django", "FastAPI", "MongoDB", "PostgreSQL", "Redis", "Docker",
+    "Kubernetes", "Terraform", "AWS", "GCP", "React", "TypeScript", "GraphQL", "REST APIs",
+    "CI/CD", "Kafka", "Spark", "Airflow", "Pandas", "NumPy", "scikit-learn", "Linux",
+]
+
+TITLES = [
+    "Backend Engineer", "Senior Python Developer", "Data Engineer", "Platform Engineer",
+    "Full Stack Developer", "Machine Learning Engineer", "Site Reliability Engineer",
+]
+
+SENTENCES = [
+    "Designed and operated {skill} services handling {n} requests per second.",
+    "Led a team of {n} engineers migrating legacy systems to {skill}.",
+    "Reduced infrastructure cost by {n}% by rewriting batch jobs with {skill}.",
+    "Built internal tooling with {skill} used daily by {n} analysts.",
+    "Improved p99 latency by {n}% through profiling and {skill} tuning.",
+]
+
+# Lines per page that fit the synthetic PDF layout
+LINES_PER_PAGE = 48
+
+
+def _escape_pdf_text(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(pages: List[List[str]]) -> bytes:
+    """Write a minimal text PDF with one Helvetica text block per page"""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"")
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for lines in pages:
+        text_ops = "\n".join(f"({_escape_pdf_text(line)}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 56 760 Td\n{text_ops}\nET".encode('latin-1', 'replace')
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font_id, content_id)
+        ))
+
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_offset)
+    return bytes(output)
+
+
+def resume_lines(rng: random.Random, line_count: int) -> List[str]:
+    """Plausible resume text lines"""
+    lines = [f"{rng.choice(TITLES)} - {rng.randint(2, 15)} years of experience", ""]
+    while len(lines) < line_count:
+        sentence = rng.choice(SENTENCES)
+        lines.append(sentence.format(skill=rng.choice(SKILLS), n=rng.randint(2, 90)))
+    return lines
+
+
+def build_resume_pdf(page_count: int, seed: int = 0) -> bytes:
+    """A synthetic resume PDF with ``page_count`` full pages of text"""
+    rng = random.Random(seed)
+    lines = resume_lines(rng, page_count * LINES_PER_PAGE)
+    return build_pdf([lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)])
+
+
+def build_pdf_corpus(page_counts=(1, 3, 10), per_size: int = 5, seed: int = 0) -> Dict[int, List[bytes]]:
+    """Several distinct synthetic resumes for each page count"""
+    return {
+        pages: [build_resume_pdf(pages, seed=seed * 1000 + pages * 100 + index) for index in range(per_size)]
+        for pages in page_counts
+    }
+
+
+def build_job_description(seed: int = 0) -> str:
+    """A job description sharing vocabulary with the synthetic resumes"""
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, 8)
+    return (
+        f"We are hiring a {rng.choice(TITLES)}. You will build and run production services "
+        f"with {', '.join(skills[:-1])} and {skills[-1]}. Experience with distributed systems, "
+        f"observability and mentoring engineers is a plus."
+    )
+
+
+def build_ai_responses(seed: int = 0) -> Dict[str, str]:
+    """AI model responses in the shapes parse_ai_response has to handle"""
+    rng = random.Random(seed)
+    payload = {
+        "JD Match": f"{rng.randint(40, 95)}%",
+        "MissingKeywords": rng.sample(SKILLS, 5),
+        "Profile Summary": " ".join(
+            rng.choice(SENTENCES).format(skill=rng.choice(SKILLS), n=rng.randint(2, 90)) for _ in range(3))
+    }
+    clean = json.dumps(payload, indent=2)
+    return {
+        "clean": clean,
+        "fenced": f"```json\n{clean}\n```",
+        "with_prose": f"Here is the analysis you asked for:\n{clean}\nLet me know if you need more detail.",
+        "single_quotes": clean.replace('"', "'"),
+        "no_json": "The resume looks like a reasonable match but I cannot produce structured output.",
+    }
@@ -0,0 +1,164 @@
+"""
+Closed- and open-loop HTTP load generators and latency statistics
+"""
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# A request factory returns (method, path, body, headers) for each request
+RequestFactory = Callable[[int], Tuple[str, str, Optional[bytes], Dict[str, str]]]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_latencies(latencies_ms: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds"""
+    values = sorted(latencies_ms)
+    return {
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 0.50), 3),
+        "p90": round(percentile(values, 0.90), 3),
+        "p99": round(percentile(values, 0.99), 3),
+        "max": round(values[-1], 3) if values else 0.0,
+    }
+
+
+class Recorder:
+    """Thread-safe collection of request outcomes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies_ms: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency_ms: float, status: str, ok: bool):
+        with self._lock:
+            self.latencies_ms.append(latency_ms)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if not ok:
+                self.errors += 1
+
+    def summary(self, elapsed_seconds: float) -> Dict[str, Any]:
+        with self._lock:
+            count = len(self.latencies_ms)
+            return {
+                "requests": count,
+                "errors": self.errors,
+                "errorRate": round(self.errors / count, 4) if count else 0.0,
+                "statuses": dict(sorted(self.statuses.items())),
+                "elapsedSeconds": round(elapsed_seconds, 3),
+                "throughputRps": round(count / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+                "latencyMs": summarize_latencies(self.latencies_ms),
+            }
+
+
+def send(base_url: str, request: Tuple[str, str, Optional[bytes], Dict[str, str]],
+         timeout: float = 60) -> Tuple[int, bytes]:
+    """Send one request on a fresh connection and read the whole response"""
+    method, path, body, headers = request
+    url = urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+    try:
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def _timed_send(base_url: str, request, recorder: Recorder, started: float):
+    try:
+        status, _ = send(base_url, request)
+        recorder.record((time.perf_counter() - started) * 1000, str(status), status < 400)
+    except Exception as e:
+        recorder.record((time.perf_counter() - started) * 1000, type(e).__name__, False)
+
+
+def run_closed_loop(base_url: str, make_request: RequestFactory, concurrency: int,
+                    duration_seconds: float, warmup_seconds: float = 1.0) -> Dict[str, Any]:
+    """Each of ``concurrency`` clients sends its next request as soon as the previous one finishes
+
+    Measures the throughput the server sustains at a fixed number of
+    concurrent users. Requests made during warm-up are not recorded.
+    """
+    recorder = Recorder()
+    counter = iter(range(10 ** 12))
+    counter_lock = threading.Lock()
+    measure_from = time.perf_counter() + warmup_seconds
+    stop_at = measure_from + duration_seconds
+
+    def client():
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            with counter_lock:
+                index = next(counter)
+            target = recorder if now >= measure_from else Recorder()
+            _timed_send(base_url, make_request(index), target, now)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = recorder.summary(duration_seconds)
+    result.update({"mode": "closed", "concurrency": concurrency})
+    return result
+
+
+def run_open_loop(base_url: str, make_request: RequestFactory, rate_per_second: float,
+                  duration_seconds: float, max_in_flight: int = 256, seed: int = 0) -> Dict[str, Any]:
+    """Send requests at Poisson-distributed arrival times regardless of response times
+
+    Latency is measured from each request's scheduled send time, so time
+    spent queued behind a slow server is counted instead of hidden
+    (no coordinated omission). Requests that cannot be sent because
+    ``max_in_flight`` are already outstanding are counted as dropped errors.
+    """
+    rng = random.Random(seed)
+    recorder = Recorder()
+    slots = threading.BoundedSemaphore(max_in_flight)
+    dropped = 0
+
+    def run(request, scheduled):
+        try:
+            _timed_send(base_url, request, recorder, scheduled)
+        finally:
+            slots.release()
+
+    started = time.perf_counter()
+    next_send = started
+    index = 0
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        while next_send < started + duration_seconds:
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if slots.acquire(blocking=False):
+                executor.submit(run, make_request(index), next_send)
+            else:
+                dropped += 1
+            index += 1
+            next_send += rng.expovariate(rate_per_second)
+
+    result = recorder.summary(time.perf_counter() - started)
+    result["errors"] += dropped
+    result.update({
+        "mode": "open",
+        "targetRps": rate_per_second,
+        "maxInFlight": max_in_flight,
+        "dropped": dropped,
+    })
+    return result
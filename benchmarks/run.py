@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Smart ATS
+
+Runs closed- and open-loop HTTP load against /analyze, /auth/login and
+/reviews with a fake AI model, plus micro-benchmarks of PDF extraction and
+AI response parsing, and writes the results as JSON for compare.py.
+
+Usage (from the project root):
+    python -m benchmarks.run
+    python -m benchmarks.run --mongodb-uri mongodb://localhost:27017 --server gunicorn
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+
+Concurrency per worker, sync against async (asgi.py):
+    python -m benchmarks.run --suites http --endpoints analyze --server gunicorn --workers 1 \
+        --concurrency 16,64,256 --llm-latency 1 --output sync.json
+    python -m benchmarks.run --suites http --endpoints analyze --server gunicorn-asgi --workers 1 \
+        --concurrency 16,64,256 --llm-latency 1 --output async.json
+    python -m benchmarks.compare sync.json async.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import logging
+import argparse
+import platform
+import threading
+import subprocess
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from benchmarks.fixtures import (
+    build_pdf_corpus, build_job_description, build_ai_responses, SKILLS, TITLES
+)
+from benchmarks.load import run_closed_loop, run_open_loop, summarize_latencies, send
+from benchmarks.mongo import BenchmarkMongo
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_SCHEMA_VERSION = 1
+
+BENCH_EMAIL = 'bench.user@smart-ats.dev'
+BENCH_PASSWORD = 'benchmark-password'
+
+ENDPOINTS = ('analyze', 'login', 'reviews')
+
+SERVERS = ('inprocess', 'gunicorn', 'asgi', 'gunicorn-asgi')
+
+
+def parse_list(value: str, cast=int) -> List:
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Smart ATS benchmark suite")
+    parser.add_argument('--suites', default='http,micro', help="Comma-separated: http, micro")
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help="Comma-separated: analyze, login, reviews")
+    parser.add_argument('--server', choices=SERVERS, default='inprocess',
+                        help="Serve the Flask app (inprocess, gunicorn) or the ASGI app (asgi, gunicorn-asgi) "
+                             "from a thread in this process or from gunicorn (needs a real MongoDB)")
+    parser.add_argument('--workers', type=int, default=None, help="gunicorn worker processes (default from gunicorn.conf.py)")
+    parser.add_argument('--mongo', choices=('auto', 'uri', 'mongod', 'mongomock'), default='auto')
+    parser.add_argument('--mongodb-uri', default=None, help="Existing MongoDB server to create a throwaway database on")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds of load per scenario")
+    parser.add_argument('--warmup', type=float, default=1, help="Closed-loop warm-up seconds per scenario")
+    parser.add_argument('--concurrency', default='1,8,32', help="Closed-loop client counts")
+    parser.add_argument('--rates', default='5,20', help="Open-loop target requests per second")
+    parser.add_argument('--max-in-flight', type=int, default=256)
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Fake AI model latency in seconds")
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--result-cache', action='store_true', help="Keep the analysis result cache enabled")
+    parser.add_argument('--extraction-cache', action='store_true',
+                        help="Keep the extracted-text cache enabled (the corpus is reused, so extractions become cache hits)")
+    parser.add_argument('--seed-reviews', type=int, default=200)
+    parser.add_argument('--pdf-pages', default='1,3,10', help="Page counts of the synthetic PDF corpus")
+    parser.add_argument('--pdfs-per-size', type=int, default=5)
+    parser.add_argument('--micro-iterations', type=int, default=20, help="Passes over the corpus per micro-benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--app-log-level', default='WARNING')
+    parser.add_argument('--label', default=None, help="Free-form label stored with the results")
+    parser.add_argument('--output', default=None, help="Results file (default: benchmarks/results/<commit>-<time>.json)")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """App settings for benchmarking; must be applied before the app is imported"""
+    os.environ.update({
+        'LLM_BACKEND': 'fake',
+        'FAKE_LLM_LATENCY_SECONDS': str(args.llm_latency),
+        'FAKE_LLM_ERROR_RATE': str(args.llm_error_rate),
+        'BCRYPT_ROUNDS': str(args.bcrypt_rounds),
+        'RESULT_CACHE_BACKEND': 'memory' if args.result_cache else 'none',
+        'EXTRACTION_CACHE_BACKEND': 'memory' if args.extraction_cache else 'none',
+        'ANALYSIS_JOB_WORKERS': '0',
+        'JWT_SECRET_KEY': os.getenv('JWT_SECRET_KEY') or uuid.uuid4().hex,
+    })
+
+
+def git_info() -> Dict[str, Any]:
+    def git(*command):
+        return subprocess.run(['git', *command], cwd=PROJECT_ROOT, capture_output=True, text=True).stdout.strip()
+
+    try:
+        return {"commit": git('rev-parse', 'HEAD') or None, "dirty": bool(git('status', '--porcelain'))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def seed_data(args) -> Dict[str, Any]:
+    """Create the benchmark user and review history"""
+    from config.database import get_database
+    from models.user import User
+    from models.review import Review
+
+    db = get_database()
+    user_id = db.get_users_collection().insert_one({
+        "email": BENCH_EMAIL,
+        "password": User.hash_password(BENCH_PASSWORD),
+        "firstName": "Bench",
+        "lastName": "User",
+        "createdAt": datetime.utcnow(),
+        "updatedAt": datetime.utcnow(),
+        "isActive": True,
+        "profile": {"totalReviews": 0, "scoreSum": 0, "lastLoginAt": None}
+    }).inserted_id
+
+    reviews = [
+        {
+            "userId": str(user_id),
+            "jobTitle": TITLES[index % len(TITLES)],
+            "jobDescription": build_job_description(args.seed + index),
+            "resumeFileName": f"resume_{index}.pdf",
+            "matchScore": 40 + index % 56,
+            "missingKeywords": [SKILLS[(index + offset) % len(SKILLS)] for offset in range(3)],
+            "profileSummary": "Seeded review for benchmarking."
+        }
+        for index in range(args.seed_reviews)
+    ]
+    review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
+    for start in range(0, len(reviews), 100):
+        review_model.create_reviews(reviews[start:start + 100])
+
+    return {"userId": str(user_id)}
+
+
+class InProcessServer:
+    """The Flask app served by werkzeug's threaded server on a background thread"""
+
+    def __init__(self):
+        from werkzeug.serving import make_server
+        from app import app
+
+        self._server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class InProcessASGIServer:
+    """The ASGI app served by uvicorn on a background thread (one event loop)"""
+
+    def __init__(self, log_level: str):
+        import uvicorn
+        from asgi import app
+
+        port = _free_port()
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(
+            app, host='127.0.0.1', port=port, log_level=log_level.lower(), access_log=False))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        deadline = time.monotonic() + 30
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("uvicorn did not start within 30 seconds")
+            time.sleep(0.05)
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+class GunicornServer:
+    """The app served by gunicorn with gunicorn.conf.py, in a child process"""
+
+    def __init__(self, log_level: str, asgi: bool = False, workers: Optional[int] = None):
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.log_level = log_level
+        self.asgi = asgi
+        self.workers = workers
+        self._process = None
+
+    def start(self):
+        env = dict(os.environ)
+        if self.workers:
+            env['WEB_CONCURRENCY'] = str(self.workers)
+        if self.asgi:
+            env['GUNICORN_WORKER_CLASS'] = 'uvicorn.workers.UvicornWorker'
+        self._process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'asgi:app' if self.asgi else 'app:app',
+             '--bind', f"127.0.0.1:{self.port}", '--log-level', self.log_level.lower()],
+            cwd=PROJECT_ROOT, env=env
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError("gunicorn exited during startup")
+            try:
+                send(self.base_url, ('GET', '/', None, {}), timeout=2)
+                return
+            except OSError:
+                time.sleep(0.25)
+        raise RuntimeError("gunicorn did not start within 60 seconds")
+
+    def stop(self):
+        if self._process:
+            self._process.terminate()
+            self._process.wait(timeout=30)
+
+
+def multipart_body(fields: Dict[str, str], file_field: str, file_name: str, data: bytes):
+    """Encode form fields and one file as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode())
+    parts.append(
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{file_field}\"; filename=\"{file_name}\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n".encode() + data + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def login(base_url: str) -> str:
+    status, body = send(base_url, (
+        'POST', '/auth/login',
+        json.dumps({"email": BENCH_EMAIL, "password": BENCH_PASSWORD}).encode(),
+        {'Content-Type': 'application/json'}
+    ))
+    if status != 200:
+        raise RuntimeError(f"Benchmark login failed with status {status}: {body[:200]!r}")
+    return json.loads(body)['token']
+
+
+def request_factories(token: str, pdf_corpus, args):
+    """Request builders for each benchmarked endpoint"""
+    auth = {'Authorization': f"Bearer {token}"}
+    login_body = json.dumps({"email": BENCH_EMAIL, "password": BENCH_PASSWORD}).encode()
+    pdfs = [(pages, data) for pages, items in sorted(pdf_corpus.items()) for data in items]
+    job_descriptions = [build_job_description(args.seed + index) for index in range(16)]
+
+    def analyze(index):
+        pages, data = pdfs[index % len(pdfs)]
+        body, content_type = multipart_body(
+            {
+                "job_description": job_descriptions[index % len(job_descriptions)],
+                "job_title": TITLES[index % len(TITLES)]
+            },
+            'resume', f"resume_{pages}p_{index % len(pdfs)}.pdf", data)
+        return 'POST', '/analyze', body, {**auth, 'Content-Type': content_type}
+
+    def login_request(index):
+        return 'POST', '/auth/login', login_body, {'Content-Type': 'application/json'}
+
+    def reviews(index):
+        return 'GET', '/reviews?limit=20&view=summary', None, auth
+
+    return {'analyze': analyze, 'login': login_request, 'reviews': reviews}
+
+
+def analyses_in_flight(endpoint: str, result: Dict[str, Any], args) -> Dict[str, Any]:
+    """AI calls the server kept in flight per worker, from throughput and the fake model latency
+
+    Each analysis waits about --llm-latency seconds on the model, so by
+    Little's law throughput x latency is the number waiting at once.
+    """
+    if endpoint != 'analyze' or args.llm_error_rate or args.result_cache:
+        return {}
+    workers = server_workers(args)
+    return {"analysesInFlightPerWorker": round(result['throughputRps'] * args.llm_latency / workers, 2)}
+
+
+def server_workers(args) -> int:
+    """Worker processes serving requests"""
+    if args.server in ('gunicorn', 'gunicorn-asgi'):
+        return args.workers or int(os.getenv('WEB_CONCURRENCY', min(os.cpu_count() * 2 + 1, 8)))
+    return 1
+
+
+def run_http_suite(base_url: str, factories, args) -> List[Dict[str, Any]]:
+    results = []
+    for endpoint in parse_list(args.endpoints, str):
+        make_request = factories[endpoint]
+        for concurrency in parse_list(args.concurrency):
+            logging.warning(f"HTTP {endpoint}: closed loop, {concurrency} clients")
+            result = run_closed_loop(base_url, make_request, concurrency, args.duration, args.warmup)
+            results.append({"name": f"http.{endpoint}.closed.c{concurrency}", "kind": "http",
+                            "endpoint": endpoint, **result, **analyses_in_flight(endpoint, result, args)})
+        for rate in parse_list(args.rates, float):
+            logging.warning(f"HTTP {endpoint}: open loop, {rate} req/s")
+            result = run_open_loop(base_url, make_request, rate, args.duration, args.max_in_flight, args.seed)
+            results.append({"name": f"http.{endpoint}.open.r{rate:g}", "kind": "http",
+                            "endpoint": endpoint, **result, **analyses_in_flight(endpoint, result, args)})
+    return results
+
+
+def run_micro_suite(pdf_corpus, args) -> List[Dict[str, Any]]:
+    """Time extract_pdf_text per PDF size and parse_ai_response per response shape"""
+    from app import extract_pdf_text, parse_ai_response
+
+    results = []
+    for pages, pdfs in sorted(pdf_corpus.items()):
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(args.micro_iterations):
+            for data in pdfs:
+                call_started = time.perf_counter()
+                extract_pdf_text(io.BytesIO(data))
+                latencies.append((time.perf_counter() - call_started) * 1000)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "name": f"micro.extract_pdf_text.p{pages}",
+            "kind": "micro",
+            "calls": len(latencies),
+            "throughputOps": round(len(latencies) / elapsed, 2),
+            "pagesPerSecond": round(len(latencies) * pages / elapsed, 2),
+            "latencyMs": summarize_latencies(latencies)
+        })
+
+    calls_per_shape = args.micro_iterations * 100
+    for shape, response in build_ai_responses(args.seed).items():
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(calls_per_shape):
+            call_started = time.perf_counter()
+            parse_ai_response(response)
+            latencies.append((time.perf_counter() - call_started) * 1000)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "name": f"micro.parse_ai_response.{shape}",
+            "kind": "micro",
+            "calls": calls_per_shape,
+            "throughputOps": round(calls_per_shape / elapsed, 2),
+            "latencyMs": summarize_latencies(latencies)
+        })
+    return results
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, PROJECT_ROOT)
+    os.chdir(PROJECT_ROOT)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s %(message)s')
+
+    suites = set(parse_list(args.suites, str))
+    backend = args.mongo if args.mongo != 'auto' else BenchmarkMongo.choose_backend(args.mongodb_uri)
+    if args.server.startswith('gunicorn') and backend == 'mongomock':
+        raise SystemExit("--server gunicorn needs a real MongoDB (--mongodb-uri or mongod on PATH)")
+
+    configure_environment(args)
+    mongo = BenchmarkMongo(backend, args.mongodb_uri)
+    mongo.start()
+
+    # Importing the app configures logging, so quieten it afterwards
+    import app  # noqa: F401
+    from config.database import get_database
+    from config.migrations import apply_migrations
+    logging.getLogger().setLevel(args.app_log_level)
+
+    pdf_corpus = build_pdf_corpus(tuple(parse_list(args.pdf_pages)), args.pdfs_per_size, args.seed)
+    results = []
+    server = None
+    try:
+        if backend != 'mongomock':
+            apply_migrations(get_database().db)
+
+        if 'http' in suites:
+            seed_data(args)
+            if args.server.startswith('gunicorn'):
+                server = GunicornServer(args.app_log_level, args.server == 'gunicorn-asgi', args.workers)
+            elif args.server == 'asgi':
+                server = InProcessASGIServer(args.app_log_level)
+            else:
+                server = InProcessServer()
+            server.start()
+            token = login(server.base_url)
+            results.extend(run_http_suite(server.base_url, request_factories(token, pdf_corpus, args), args))
+
+        if 'micro' in suites:
+            logging.warning("Micro-benchmarks: extract_pdf_text, parse_ai_response")
+            # The malformed responses would log a warning per call
+            logging.disable(logging.WARNING)
+            try:
+                results.extend(run_micro_suite(pdf_corpus, args))
+            finally:
+                logging.disable(logging.NOTSET)
+    finally:
+        if server:
+            server.stop()
+        mongo.stop()
+
+    git = git_info()
+    report = {
+        "schemaVersion": RESULTS_SCHEMA_VERSION,
+        "label": args.label,
+        "createdAt": datetime.utcnow().isoformat() + 'Z',
+        "git": git,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpuCount": os.cpu_count(),
+            "server": args.server,
+            "workers": server_workers(args),
+            "mongo": backend
+        },
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ('output', 'label', 'mongodb_uri')
+        },
+        "results": results
+    }
+
+    output = args.output or os.path.join(
+        PROJECT_ROOT, 'benchmarks', 'results',
+        f"{(git['commit'] or 'unknown')[:10]}-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        latency = result['latencyMs']
+        print(f"{result['name']:<44} {result.get('throughputRps', result.get('throughputOps')):>10} /s  "
+              f"p50 {latency['p50']:>9.3f} ms  p99 {latency['p99']:>9.3f} ms"
+              + (f"  errors {result['errors']}" if result.get('errors') else ""))
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
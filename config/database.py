@@ -1,55 +1,101 @@
 import os
 import logging
+import threading
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from typing import Optional
 
+from services.metrics import MongoCommandMetrics
+from services.pool_metrics import ConnectionPoolMetrics
+from services.tracing import MongoTracingListener
+
 logger = logging.getLogger(__name__)
 
+# Feed MongoDB command timings into the Prometheus metrics and request traces
+mongo_command_metrics = MongoCommandMetrics()
+mongo_tracing_listener = MongoTracingListener()
+
+# Pool size when neither MONGODB_MAX_POOL_SIZE nor the server config sets one
+DEFAULT_MAX_POOL_SIZE = 50
+
+
+def pool_size_for_threads(threads: int) -> int:
+    """Connections one process can use at once: its request threads plus background threads
+    
+    Background threads are the analysis job workers, the review write
+    batcher and one spare for the analytics pipeline or health checks.
+    """
+    return threads + int(os.getenv('ANALYSIS_JOB_WORKERS', 4)) + 2
+
 
 class Database:
-    """MongoDB database connection and management"""
+    """MongoDB database connection and management
+    
+    The client is created on first use rather than at import time. Creating
+    a MongoClient does not block; the driver connects in the background and
+    the first operation waits for server selection. Indexes are managed by
+    the migrations in config/migrations.py.
+    """
     
     def __init__(self):
         self.client: Optional[MongoClient] = None
-        self.db = None
-        self.users_collection = None
-        self.reviews_collection = None
+        self._db = None
+        self._lock = threading.Lock()
+        self.max_pool_size = int(os.getenv('MONGODB_MAX_POOL_SIZE', DEFAULT_MAX_POOL_SIZE))
+        self.pool_metrics = ConnectionPoolMetrics()
     
-    def connect(self) -> bool:
-        """Connect to MongoDB"""
-        try:
+    def configure_pool(self, max_pool_size: int):
+        """Set the pool size used when the client is next created
+        
+        MONGODB_MAX_POOL_SIZE, when set, takes precedence.
+        """
+        self.max_pool_size = int(os.getenv('MONGODB_MAX_POOL_SIZE', max_pool_size))
+    
+    def _open(self):
+        """Create the MongoDB client if it does not exist yet"""
+        with self._lock:
+            if self._db is not None:
+                return
+            
             # Get MongoDB URI from environment variables
             mongodb_uri = os.getenv('MONGODB_URI')
             if not mongodb_uri:
-                logger.error("MONGODB_URI environment variable not set")
-                return False
+                raise RuntimeError("MONGODB_URI environment variable not set")
             
             # Get database name
             db_name = os.getenv('MONGODB_DB_NAME', 'smart_ats')
             
+            wait_queue_timeout_ms = os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS')
+            
             # Create MongoDB client
             self.client = MongoClient(
                 mongodb_uri,
                 serverSelectionTimeoutMS=5000,  # 5 second timeout
                 connectTimeoutMS=10000,         # 10 second connection timeout
                 socketTimeoutMS=20000,          # 20 second socket timeout
-                maxPoolSize=50,                 # Maximum number of connections
+                maxPoolSize=self.max_pool_size, # Maximum number of connections
+                minPoolSize=int(os.getenv('MONGODB_MIN_POOL_SIZE', 0)),
+                waitQueueTimeoutMS=int(wait_queue_timeout_ms) if wait_queue_timeout_ms else None,
+                event_listeners=[self.pool_metrics, mongo_command_metrics, mongo_tracing_listener],
                 retryWrites=True
             )
-            
-            # Test the connection
-            self.client.admin.command('ping')
-            
-            # Get database and collections
-            self.db = self.client[db_name]
-            self.users_collection = self.db.users
-            self.reviews_collection = self.db.reviews
-            
-            # Create indexes for better performance
-            self._create_indexes()
-            
-            logger.info(f"Successfully connected to MongoDB database: {db_name}")
+            self._db = self.client[db_name]
+            logger.info(
+                f"MongoDB client created for database: {db_name} "
+                f"(pid {os.getpid()}, maxPoolSize {self.max_pool_size})")
+    
+    @property
+    def db(self):
+        """The application database, creating the client on first use"""
+        if self._db is None:
+            self._open()
+        return self._db
+    
+    def connect(self) -> bool:
+        """Connect to MongoDB and verify the server is reachable"""
+        try:
+            self.db.client.admin.command('ping')
+            logger.info(f"Successfully connected to MongoDB database: {self.db.name}")
             return True
             
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
@@ -59,55 +105,72 @@ class Database:
             logger.error(f"Unexpected error connecting to MongoDB: {str(e)}")
             return False
     
-    def _create_indexes(self):
-        """Create database indexes for better performance"""
-        try:
-            # Users collection indexes
-            self.users_collection.create_index("email", unique=True)
-            self.users_collection.create_index("createdAt")
-            self.users_collection.create_index("isActive")
-            
-            # Reviews collection indexes
-            self.reviews_collection.create_index("userId")
-            self.reviews_collection.create_index("createdAt")
-            self.reviews_collection.create_index([("userId", 1), ("createdAt", -1)])
-            self.reviews_collection.create_index([("jobTitle", "text"), ("missingKeywords", "text")])
-            
-            logger.info("Database indexes created successfully")
-            
-        except Exception as e:
-            logger.warning(f"Failed to create some indexes: {str(e)}")
-    
     def disconnect(self):
         """Disconnect from MongoDB"""
-        if self.client:
-            self.client.close()
-            logger.info("Disconnected from MongoDB")
+        with self._lock:
+            if self.client:
+                self.client.close()
+                logger.info("Disconnected from MongoDB")
+            # The next use creates a fresh client
+            self.client = None
+            self._db = None
+    
+    def reset_after_fork(self):
+        """Forget a client inherited from the parent process
+        
+        MongoClient is not fork-safe. The inherited client is dropped without
+        closing it, since its sockets and monitor threads belong to the
+        parent; the next use in this process creates a new client.
+        """
+        with self._lock:
+            self.client = None
+            self._db = None
+            self.pool_metrics = ConnectionPoolMetrics()
+    
+    def get_pool_stats(self) -> dict:
+        """Connection pool utilization for this process"""
+        return {
+            "pid": os.getpid(),
+            "connected": self.client is not None,
+            "maxPoolSize": self.max_pool_size,
+            **self.pool_metrics.get_stats()
+        }
     
     def is_connected(self) -> bool:
         """Check if database is connected"""
         try:
-            if self.client:
-                self.client.admin.command('ping')
-                return True
-            return False
+            self.db.client.admin.command('ping')
+            return True
         except Exception:
             return False
     
     def get_users_collection(self):
         """Get users collection"""
-        return self.users_collection
+        return self.db.users
     
     def get_reviews_collection(self):
         """Get reviews collection"""
-        return self.reviews_collection
+        return self.db.reviews
+    
+    def get_analysis_cache_collection(self):
+        """Get analysis result cache collection"""
+        return self.db.analysis_cache
+    
+    def get_extraction_cache_collection(self):
+        """Get extracted PDF text cache collection"""
+        return self.db.extraction_cache
+    
+    def get_analysis_jobs_collection(self):
+        """Get analysis job queue collection"""
+        return self.db.analysis_jobs
+    
+    def get_user_stats_collection(self):
+        """Get per-user review statistics collection"""
+        return self.db.user_stats
     
     def get_database_stats(self) -> dict:
         """Get database statistics"""
         try:
-            if not self.db:
-                return {}
-            
             stats = self.db.command("dbStats")
             
             return {
@@ -133,8 +196,8 @@ class Database:
                 }
             
             # Test basic operations
-            self.users_collection.find_one({}, {"_id": 1})
-            self.reviews_collection.find_one({}, {"_id": 1})
+            self.get_users_collection().find_one({}, {"_id": 1})
+            self.get_reviews_collection().find_one({}, {"_id": 1})
             
             return {
                 "status": "healthy",
@@ -159,7 +222,7 @@ def get_database():
 
 
 def init_database():
-    """Initialize database connection"""
+    """Connect to the database eagerly and check that it is reachable"""
     return db_instance.connect()
 
 
@@ -0,0 +1,119 @@
+import logging
+from datetime import datetime
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Collection recording which migrations have been applied
+MIGRATIONS_COLLECTION = 'schema_migrations'
+
+
+def create_user_indexes(db):
+    """Indexes for user lookups"""
+    db.users.create_index("email", unique=True)
+    db.users.create_index("createdAt")
+    db.users.create_index("isActive")
+
+
+def create_review_indexes(db):
+    """Indexes for review listing, pagination and statistics"""
+    db.reviews.create_index("userId")
+    db.reviews.create_index("createdAt")
+    db.reviews.create_index([("userId", 1), ("createdAt", -1), ("_id", -1)])
+    db.reviews.create_index([("userId", 1), ("matchScore", 1)])
+
+
+def create_review_search_index(db):
+    """Per-user text index used by review search
+    
+    A collection can only have one text index, so the older index
+    without the userId prefix is dropped first.
+    """
+    legacy_index = "jobTitle_text_missingKeywords_text"
+    if legacy_index in db.reviews.index_information():
+        db.reviews.drop_index(legacy_index)
+    
+    db.reviews.create_index(
+        [("userId", 1), ("jobTitle", "text"), ("missingKeywords", "text")],
+        weights={"jobTitle": 3, "missingKeywords": 1},
+        name="userId_1_review_search_text"
+    )
+
+
+def create_keyword_rollup_indexes(db):
+    """Indexes for per-user keyword rollups and their daily buckets"""
+    db.keyword_rollups.create_index([("userId", 1), ("keyword", 1)], unique=True)
+    db.keyword_rollups.create_index([("userId", 1), ("count", -1), ("keyword", 1)])
+    db.keyword_daily.create_index([("userId", 1), ("keyword", 1), ("day", 1)], unique=True)
+    db.keyword_daily.create_index([("userId", 1), ("day", 1)])
+    db.keyword_daily.create_index("expiresAt", expireAfterSeconds=0)
+
+
+def create_analytics_indexes(db):
+    """Indexes for the materialized platform analytics"""
+    for name in ("analytics_title_keywords", "analytics_title_scores"):
+        db[name].create_index("day")
+        db[name].create_index([("title", 1), ("day", 1)])
+
+
+def create_cache_and_job_indexes(db):
+    """Indexes for the analysis result cache and job queue"""
+    db.analysis_cache.create_index("expiresAt", expireAfterSeconds=0)
+    db.analysis_cache.create_index("lastAccessedAt")
+    db.analysis_jobs.create_index([("status", 1), ("createdAt", 1)])
+    db.analysis_jobs.create_index("expiresAt", expireAfterSeconds=0)
+
+
+def create_extraction_cache_indexes(db):
+    """Indexes for the extracted PDF text cache"""
+    db.extraction_cache.create_index("expiresAt", expireAfterSeconds=0)
+    db.extraction_cache.create_index("lastAccessedAt")
+
+
+# Applied in order; never renumber or remove an entry, only append. Every
+# migration must be safe to re-run, since two deploys may race to apply it.
+MIGRATIONS = [
+    (1, "Create user indexes", create_user_indexes),
+    (2, "Create review indexes", create_review_indexes),
+    (3, "Create per-user review search index", create_review_search_index),
+    (4, "Create keyword rollup indexes", create_keyword_rollup_indexes),
+    (5, "Create analytics indexes", create_analytics_indexes),
+    (6, "Create cache and job queue indexes", create_cache_and_job_indexes),
+    (7, "Create extraction cache indexes", create_extraction_cache_indexes),
+]
+
+
+def get_migration_status(db) -> List[Dict[str, Any]]:
+    """List every migration and when it was applied"""
+    applied = {doc['_id']: doc for doc in db[MIGRATIONS_COLLECTION].find()}
+    return [
+        {
+            "version": version,
+            "description": description,
+            "appliedAt": applied[version]['appliedAt'].isoformat() if version in applied else None
+        }
+        for version, description, _ in MIGRATIONS
+    ]
+
+
+def apply_migrations(db) -> List[int]:
+    """Apply pending migrations in order and return their versions"""
+    applied = {doc['_id'] for doc in db[MIGRATIONS_COLLECTION].find({}, {"_id": 1})}
+    completed = []
+    
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        
+        logger.info(f"Applying migration {version}: {description}")
+        migrate(db)
+        db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": version},
+            {"$setOnInsert": {"description": description, "appliedAt": datetime.utcnow()}},
+            upsert=True
+        )
+        completed.append(version)
+    
+    if completed:
+        logger.info(f"Applied {len(completed)} migration(s)")
+    return completed
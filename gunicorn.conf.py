@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration for Smart ATS
+
+Start with: gunicorn app:app (this file is picked up automatically), or
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn asgi:app for the
+async entry point
+"""
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+# Analysis requests mostly wait on the AI model, so each worker runs
+# several request threads
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Each worker imports the app itself by default. With preloading, the app is
+# imported once in the master and post_fork gives each worker its own clients.
+# Either way, job queue threads are only started in workers (post_worker_init).
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+
+def request_threads(cfg):
+    """Threads per worker that may use MongoDB at once"""
+    if 'uvicorn' in cfg.worker_class_str.lower():
+        # Flask routes run on ASGI_WSGI_THREADS threads and the native async
+        # routes hand blocking calls to asyncio's default executor
+        return int(os.getenv('ASGI_WSGI_THREADS', 8)) + min(32, multiprocessing.cpu_count() + 4)
+    return cfg.threads
+
+
+def on_starting(server):
+    """Report the MongoDB connections this server can open, and optionally migrate"""
+    from config.database import get_database, pool_size_for_threads
+
+    pool_size = int(os.getenv('MONGODB_MAX_POOL_SIZE', pool_size_for_threads(request_threads(server.cfg))))
+    server.log.info(
+        f"MongoDB pool: {pool_size} connections per worker, up to "
+        f"{pool_size * server.cfg.workers} for {server.cfg.workers} workers")
+
+    if os.getenv('MIGRATE_ON_START', 'false').lower() == 'true':
+        from config.migrations import apply_migrations
+
+        apply_migrations(get_database().db)
+
+    # Workers must not inherit a client created in the master
+    get_database().disconnect()
+
+
+def post_fork(server, worker):
+    """Give each worker its own MongoDB client sized for its thread count"""
+    from config.database import get_database, pool_size_for_threads
+
+    db = get_database()
+    db.reset_after_fork()
+    db.configure_pool(pool_size_for_threads(request_threads(server.cfg)))
+    server.log.info(f"Worker {worker.pid} MongoDB maxPoolSize {db.max_pool_size}")
+
+
+def post_worker_init(worker):
+    """Process queued analysis jobs in each worker once the app is loaded"""
+    from app import start_analysis_job_workers
+
+    start_analysis_job_workers()
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live metrics when metrics are aggregated across workers"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
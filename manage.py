@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for Smart ATS
+
+Usage:
+    python manage.py migrate               Apply pending database migrations
+    python manage.py migrate --status      List migrations and when they were applied
+    python manage.py analytics             Run the analytics pipeline once
+    python manage.py repair-user-stats     Rebuild user profile review counters
+    python manage.py startup-time          Measure worker cold start
+    python manage.py trace-collector       Receive OTLP/JSON traces locally
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+from config.database import init_database, close_database, get_database
+from config.migrations import apply_migrations, get_migration_status
+from models.user import User
+from services.analytics_pipeline import create_analytics_pipeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate(args):
+    """Apply pending database migrations (indexes) once per deploy"""
+    db = get_database().db
+    if not args.status:
+        apply_migrations(db)
+    print(json.dumps(get_migration_status(db), indent=2))
+    return 0
+
+
+def measure_startup_time(args):
+    """Import the app in fresh interpreters and report how long a worker takes to boot"""
+    script = "import json, app; print(json.dumps(app.app.config['STARTUP_TIMINGS']))"
+
+    samples = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        )
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        timings['processMs'] = round((time.perf_counter() - started) * 1000, 2)
+        samples.append(timings)
+
+    print(json.dumps({
+        "runs": args.runs,
+        **{
+            key: {
+                "median": round(statistics.median(sample[key] for sample in samples), 2),
+                "min": min(sample[key] for sample in samples),
+                "max": max(sample[key] for sample in samples)
+            }
+            for key in samples[0]
+        }
+    }, indent=2))
+    return 0
+
+
+def print_span_tree(spans):
+    """Print spans indented under their parents with their durations"""
+    children = {}
+    span_ids = {span['spanId'] for span in spans}
+    for span in spans:
+        parent = span.get('parentSpanId') if span.get('parentSpanId') in span_ids else None
+        children.setdefault(parent, []).append(span)
+
+    def walk(parent, depth):
+        for span in sorted(children.get(parent, []), key=lambda s: int(s['startTimeUnixNano'])):
+            duration_ms = (int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])) / 1e6
+            error = ' ERROR' if span.get('status', {}).get('code') == 2 else ''
+            print(f"{'  ' * depth}{span['name']} {duration_ms:.1f}ms{error}")
+            walk(span['spanId'], depth + 1)
+    walk(None, 1)
+
+
+def run_trace_collector(args):
+    """Accept OTLP/JSON trace exports, append them to a file and print each span tree
+
+    A stand-in for an OpenTelemetry collector during local debugging; point
+    the app at it with TRACE_EXPORTER=otlp and OTLP_ENDPOINT.
+    """
+    output = args.output
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/v1/traces':
+                self.send_error(404)
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            except ValueError:
+                self.send_error(400, "Expected OTLP/JSON")
+                return
+
+            with open(output, 'a') as f:
+                f.write(json.dumps(body, separators=(',', ':')) + '\n')
+            for resource_spans in body.get('resourceSpans', []):
+                for scope_spans in resource_spans.get('scopeSpans', []):
+                    spans = scope_spans.get('spans', [])
+                    if spans:
+                        print(f"trace {spans[0]['traceId']}")
+                        print_span_tree(spans)
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, format, *log_args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), Handler)
+    logger.info(f"Collecting traces on http://127.0.0.1:{args.port}/v1/traces into {output}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def run_analytics(args):
+    """Refresh the materialized analytics views"""
+    summary = create_analytics_pipeline(lambda: get_database().db).run_once()
+    print(json.dumps(summary, default=str, indent=2))
+    return 0
+
+
+def repair_user_stats(args):
+    """Rebuild every user's profile review count and score sum from their reviews"""
+    db = get_database()
+    started = time.perf_counter()
+    reset = User(db.get_users_collection()).rebuild_review_stats(db.get_reviews_collection())
+    logger.info(
+        f"Rebuilt user review stats in {time.perf_counter() - started:.2f}s "
+        f"({reset} users without reviews reset)")
+    return 0
+
+
+# name: (handler, help, needs a database connection)
+COMMANDS = {
+    'migrate': (migrate, "Apply pending database migrations", True),
+    'analytics': (run_analytics, "Run the analytics pipeline once", True),
+    'repair-user-stats': (repair_user_stats, "Rebuild user profile review counters from reviews", True),
+    'startup-time': (measure_startup_time, "Measure worker cold start", False),
+    'trace-collector': (run_trace_collector, "Receive OTLP/JSON traces locally", False),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart ATS maintenance commands")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text, _) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    subparsers.choices['migrate'].add_argument(
+        '--status', action='store_true', help="Only list migrations")
+    subparsers.choices['startup-time'].add_argument(
+        '--runs', type=int, default=5, help="Number of cold starts to measure")
+    subparsers.choices['trace-collector'].add_argument(
+        '--port', type=int, default=4318, help="Port to listen on (default 4318, the OTLP/HTTP port)")
+    subparsers.choices['trace-collector'].add_argument(
+        '--output', default='traces.jsonl', help="File the received traces are appended to")
+
+    args = parser.parse_args()
+    handler, _, needs_database = COMMANDS[args.command]
+
+    load_dotenv()
+    if needs_database and not init_database():
+        logger.error("Failed to connect to the database")
+        return 1
+
+    try:
+        return handler(args)
+    finally:
+        close_database()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
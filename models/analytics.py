@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+
+from services.analytics_pipeline import (
+    TITLE_KEYWORDS_COLLECTION, TITLE_SCORES_COLLECTION, STATE_COLLECTION,
+    PIPELINE_ID, HISTOGRAM_BUCKETS
+)
+
+
+class Analytics:
+    """Read-only queries over the materialized platform-wide analytics
+
+    Never reads the reviews collection; results are as fresh as the last
+    analytics pipeline run.
+    """
+
+    def __init__(self, db):
+        self.title_keywords = db[TITLE_KEYWORDS_COLLECTION]
+        self.title_scores = db[TITLE_SCORES_COLLECTION]
+        self.state = db[STATE_COLLECTION]
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        return title.strip().lower()
+
+    @staticmethod
+    def _since(days: int) -> datetime:
+        today = datetime.utcnow()
+        return datetime(today.year, today.month, today.day) - timedelta(days=days - 1)
+
+    def get_missing_keywords(self, days: int, limit: int = 20, title: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most frequently missing keywords over the last ``days``, optionally for one job title"""
+        match = {"day": {"$gte": self._since(days)}}
+        if title:
+            match["title"] = self.normalize_title(title)
+
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": "$keyword",
+                    "keyword": {"$first": "$displayKeyword"},
+                    "frequency": {"$sum": "$count"}
+                }
+            },
+            {"$sort": {"frequency": -1, "_id": 1}},
+            {"$limit": limit}
+        ]
+
+        return [
+            {"keyword": item["keyword"], "frequency": item["frequency"]}
+            for item in self.title_keywords.aggregate(pipeline)
+        ]
+
+    def get_top_titles(self, days: int, limit: int = 20) -> List[Dict[str, Any]]:
+        """Job titles with the most reviews over the last ``days``"""
+        pipeline = [
+            {"$match": {"day": {"$gte": self._since(days)}}},
+            {
+                "$group": {
+                    "_id": "$title",
+                    "jobTitle": {"$first": "$displayTitle"},
+                    "reviews": {"$sum": "$count"},
+                    "scoreSum": {"$sum": "$scoreSum"}
+                }
+            },
+            {"$sort": {"reviews": -1, "_id": 1}},
+            {"$limit": limit}
+        ]
+
+        return [
+            {
+                "jobTitle": item["jobTitle"],
+                "reviews": item["reviews"],
+                "averageScore": round(item["scoreSum"] / item["reviews"], 2)
+            }
+            for item in self.title_scores.aggregate(pipeline)
+        ]
+
+    def get_score_distribution(self, title: str, days: int) -> Dict[str, Any]:
+        """Score histogram and daily review counts for a job title over the last ``days``"""
+        rows = list(
+            self.title_scores.find({"title": self.normalize_title(title), "day": {"$gte": self._since(days)}})
+            .sort("day", 1)
+        )
+
+        histogram = [0] * HISTOGRAM_BUCKETS
+        for row in rows:
+            histogram = [total + count for total, count in zip(histogram, row["histogram"])]
+        reviews = sum(row["count"] for row in rows)
+        score_sum = sum(row["scoreSum"] for row in rows)
+
+        return {
+            "jobTitle": rows[-1]["displayTitle"] if rows else title,
+            "reviews": reviews,
+            "averageScore": round(score_sum / reviews, 2) if reviews else 0,
+            "scoreDistribution": histogram,
+            "daily": [
+                {
+                    "day": row["day"].date().isoformat(),
+                    "reviews": row["count"],
+                    "averageScore": round(row["scoreSum"] / row["count"], 2)
+                }
+                for row in rows
+            ]
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """When the materialized views were last refreshed"""
+        state = self.state.find_one({"_id": PIPELINE_ID}) or {}
+        return {
+            "watermark": state["watermark"].isoformat() if state.get("watermark") else None,
+            "lastRunAt": state["lastRunAt"].isoformat() if state.get("lastRunAt") else None,
+            "lastRunMs": state.get("lastRunMs"),
+            "running": bool(state.get("leaseOwner"))
+        }
@@ -0,0 +1,170 @@
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Iterable, Tuple
+from collections import defaultdict
+from bson import ObjectId
+from pymongo import UpdateOne
+
+
+class KeywordRollup:
+    """Per-user missing-keyword counts maintained incrementally
+    
+    ``keyword_rollups`` holds one document per user and normalized keyword
+    with all-time count and score sum; ``keyword_daily`` holds the same
+    counters per day (by review creation date) for windowed views and
+    expires after MAX_WINDOW_DAYS. Trending keywords are then a top-K read
+    instead of an $unwind over every review.
+    """
+    
+    WINDOWS = (7, 30, 90)
+    MAX_WINDOW_DAYS = 90
+    
+    _SPACE_PATTERN = re.compile(r'\s+')
+    
+    def __init__(self, db_collection, daily_collection, reviews_collection):
+        self.collection = db_collection
+        self.daily_collection = daily_collection
+        self.reviews_collection = reviews_collection
+    
+    @classmethod
+    def normalize(cls, keyword: str) -> str:
+        """Case- and whitespace-insensitive form used to group keywords"""
+        return cls._SPACE_PATTERN.sub(' ', str(keyword)).strip().lower()
+    
+    @staticmethod
+    def _day(timestamp: datetime) -> datetime:
+        return datetime(timestamp.year, timestamp.month, timestamp.day)
+    
+    def _contributions(self, review_docs: Iterable[Dict[str, Any]], sign: int) -> Dict[Tuple, Dict[str, Any]]:
+        """Sum count/score changes per (userId, keyword, day)
+        
+        A keyword listed twice in one review counts once.
+        """
+        changes = {}
+        for review_doc in review_docs:
+            keywords = {}
+            for keyword in review_doc.get('missingKeywords') or []:
+                normalized = self.normalize(keyword)
+                if normalized:
+                    keywords.setdefault(normalized, str(keyword).strip())
+            
+            day = self._day(review_doc['createdAt'])
+            for normalized, display in keywords.items():
+                key = (review_doc['userId'], normalized, day)
+                change = changes.setdefault(key, {"count": 0, "scoreSum": 0, "display": display})
+                change["count"] += sign
+                change["scoreSum"] += sign * int(review_doc['matchScore'])
+        return changes
+    
+    def apply(self, added: Iterable[Dict[str, Any]] = (), removed: Iterable[Dict[str, Any]] = ()):
+        """Add and remove reviews' keyword contributions with bulk writes
+        
+        Review documents need userId, missingKeywords, matchScore and createdAt.
+        """
+        changes = self._contributions(added, 1)
+        for key, change in self._contributions(removed, -1).items():
+            merged = changes.setdefault(key, {"count": 0, "scoreSum": 0, "display": change["display"]})
+            merged["count"] += change["count"]
+            merged["scoreSum"] += change["scoreSum"]
+        
+        totals = defaultdict(lambda: {"count": 0, "scoreSum": 0, "display": None})
+        daily_operations = []
+        cutoff = self._day(datetime.utcnow()) - timedelta(days=self.MAX_WINDOW_DAYS)
+        
+        for (user_id, keyword, day), change in changes.items():
+            if not change["count"] and not change["scoreSum"]:
+                continue
+            total = totals[(user_id, keyword)]
+            total["count"] += change["count"]
+            total["scoreSum"] += change["scoreSum"]
+            total["display"] = total["display"] or change["display"]
+            
+            # Buckets older than the largest window are not kept
+            if day >= cutoff:
+                daily_operations.append(UpdateOne(
+                    {"userId": user_id, "keyword": keyword, "day": day},
+                    {
+                        "$inc": {"count": change["count"], "scoreSum": change["scoreSum"]},
+                        "$setOnInsert": {
+                            "display": change["display"],
+                            "expiresAt": day + timedelta(days=self.MAX_WINDOW_DAYS + 1)
+                        }
+                    },
+                    upsert=change["count"] > 0
+                ))
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"userId": user_id, "keyword": keyword},
+                {
+                    "$inc": {"count": total["count"], "scoreSum": total["scoreSum"]},
+                    "$setOnInsert": {"display": total["display"]},
+                    "$set": {"updatedAt": now}
+                },
+                upsert=total["count"] > 0
+            )
+            for (user_id, keyword), total in totals.items()
+            if total["count"] or total["scoreSum"]
+        ]
+        
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        if daily_operations:
+            self.daily_collection.bulk_write(daily_operations, ordered=False)
+        
+        if any(total["count"] < 0 for total in totals.values()):
+            user_ids = list({user_id for (user_id, _), total in totals.items() if total["count"] < 0})
+            self.collection.delete_many({"userId": {"$in": user_ids}, "count": {"$lte": 0}})
+            self.daily_collection.delete_many({"userId": {"$in": user_ids}, "count": {"$lte": 0}})
+    
+    def top_keywords(self, user_id: ObjectId, limit: int = 20, window_days: int = None) -> List[Dict[str, Any]]:
+        """Most frequent missing keywords, all-time or over the last ``window_days``"""
+        if window_days is None:
+            items = (
+                self.collection.find({"userId": user_id, "count": {"$gt": 0}})
+                .sort([("count", -1), ("keyword", 1)])
+                .limit(limit)
+            )
+        else:
+            since = self._day(datetime.utcnow()) - timedelta(days=window_days - 1)
+            pipeline = [
+                {"$match": {"userId": user_id, "day": {"$gte": since}}},
+                {
+                    "$group": {
+                        "_id": "$keyword",
+                        "count": {"$sum": "$count"},
+                        "scoreSum": {"$sum": "$scoreSum"},
+                        "display": {"$first": "$display"}
+                    }
+                },
+                {"$match": {"count": {"$gt": 0}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": limit}
+            ]
+            items = self.daily_collection.aggregate(pipeline)
+        
+        return [
+            {
+                "keyword": item["display"],
+                "frequency": item["count"],
+                "averageScore": round(item["scoreSum"] / item["count"], 2)
+            }
+            for item in items
+        ]
+    
+    def rebuild(self, user_id: ObjectId):
+        """Recompute a user's rollups from their reviews
+        
+        Concurrent updates of the same user's rollups are double counted or
+        lost; Review builds rollups under a per-user lease instead of calling
+        this directly.
+        """
+        reviews = self.reviews_collection.find(
+            {"userId": user_id, "missingKeywords.0": {"$exists": True}},
+            {"userId": 1, "missingKeywords": 1, "matchScore": 1, "createdAt": 1}
+        )
+        
+        self.collection.delete_many({"userId": user_id})
+        self.daily_collection.delete_many({"userId": user_id})
+        self.apply(added=reviews)
@@ -1,16 +1,92 @@
-from datetime import datetime
-from typing import Optional, Dict, Any, List
-from bson import ObjectId
+import base64
+import binascii
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+from bson import ObjectId, json_util
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from models.user_stats import UserStats
+from models.keyword_rollup import KeywordRollup
+from services.text_search import build_highlights
+
+# MongoDB error code for a $text query without a text index
+INDEX_NOT_FOUND = 27
+
+
+class SearchIndexMissingError(Exception):
+    """Raised when reviews are searched before the text index migration has run"""
 
 
 class Review:
     """Review model for MongoDB operations"""
     
-    def __init__(self, db_collection):
+    # Fields of a review response, in order
+    RESPONSE_FIELDS = [
+        'id', 'userId', 'jobTitle', 'jobDescription', 'resumeFileName', 'matchScore',
+        'missingKeywords', 'profileSummary', 'recommendations', 'createdAt', 'updatedAt'
+    ]
+    
+    # Fields of the summary view used by list screens
+    SUMMARY_FIELDS = ['id', 'jobTitle', 'resumeFileName', 'matchScore', 'createdAt', 'updatedAt']
+    
+    VIEWS = {'full': RESPONSE_FIELDS, 'summary': SUMMARY_FIELDS}
+    
+    # Stored fields the derived statistics and keyword rollups are computed from
+    DERIVED_FIELDS = {"userId": 1, "matchScore": 1, "missingKeywords": 1, "createdAt": 1}
+    
+    # Types of the sort key values held by listing and search cursors
+    LIST_CURSOR_TYPES = (datetime, ObjectId)
+    SEARCH_CURSOR_TYPES = (float, ObjectId)
+    
+    # How long a keyword rollup build may hold a user before others take over
+    KEYWORD_BUILD_LEASE_SECONDS = 60
+    KEYWORD_BUILD_POLL_SECONDS = 0.05
+    
+    def __init__(self, db_collection, stats_collection=None):
         self.collection = db_collection
+        if stats_collection is None:
+            stats_collection = db_collection.database['user_stats']
+        self.stats = UserStats(stats_collection, db_collection)
+        self.keywords = KeywordRollup(
+            db_collection.database['keyword_rollups'],
+            db_collection.database['keyword_daily'],
+            db_collection
+        )
     
-    def create_review(self, review_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new review"""
+    @classmethod
+    def resolve_fields(cls, view: Optional[str] = None, fields: Optional[str] = None) -> Optional[List[str]]:
+        """Turn a ``view`` name or comma-separated ``fields`` list into response fields
+        
+        Returns None for the full view.
+        """
+        if fields:
+            requested = [field.strip() for field in fields.split(',') if field.strip()]
+            unknown = [field for field in requested if field not in cls.RESPONSE_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown review fields: {', '.join(unknown)}")
+            # id is always returned so clients can link to the review
+            return ['id'] + [field for field in cls.RESPONSE_FIELDS if field in requested and field != 'id']
+        
+        view = (view or 'full').lower()
+        if view not in cls.VIEWS:
+            raise ValueError(f"Unknown view: {view}. Use one of: {', '.join(cls.VIEWS)}")
+        return None if view == 'full' else list(cls.VIEWS[view])
+    
+    @staticmethod
+    def _projection(fields: Optional[List[str]], *extra: str) -> Optional[Dict[str, int]]:
+        """MongoDB projection for response fields plus fields needed internally"""
+        if fields is None:
+            return None
+        projection = {field: 1 for field in fields if field != 'id'}
+        projection.update({field: 1 for field in extra})
+        return projection
+    
+    @staticmethod
+    def _build_review_document(review_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate review data and build the document to insert"""
         # Validate required fields
         required_fields = ['userId', 'jobTitle', 'jobDescription', 'resumeFileName', 'matchScore']
         for field in required_fields:
@@ -18,7 +94,7 @@ class Review:
                 raise ValueError(f"Missing required field: {field}")
         
         # Create review document
-        review_doc = {
+        return {
             "userId": ObjectId(review_data['userId']),
             "jobTitle": review_data['jobTitle'],
             "jobDescription": review_data['jobDescription'],
@@ -30,50 +106,244 @@ class Review:
             "createdAt": datetime.utcnow(),
             "updatedAt": datetime.utcnow()
         }
+    
+    def new_review_document(self, review_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a review document with its ID assigned, ready for insert_documents"""
+        review_doc = self._build_review_document(review_data)
+        review_doc['_id'] = ObjectId()
+        return review_doc
+    
+    def format_review(self, review_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a review document for API response"""
+        return self._format_review_response(review_doc)
+    
+    def create_review(self, review_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new review"""
+        review_doc = self._build_review_document(review_data)
+        self._ensure_derived_stats([review_doc['userId']])
         
         # Insert review
         result = self.collection.insert_one(review_doc)
         review_doc['_id'] = result.inserted_id
+        self.stats.review_created(review_doc)
+        self.keywords.apply(added=[review_doc])
         
         return self._format_review_response(review_doc)
     
-    def get_user_reviews(self, user_id: str, page: int = 1, limit: int = 10) -> Dict[str, Any]:
-        """Get reviews for a specific user with pagination"""
+    def create_reviews(self, reviews_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many reviews with a single bulk insert"""
+        review_docs = [self._build_review_document(review_data) for review_data in reviews_data]
+        if not review_docs:
+            return []
+        
+        failures = self.insert_documents(review_docs)
+        if failures:
+            raise ValueError(f"Failed to save {len(failures)} of {len(review_docs)} reviews")
+        # The reviews are saved even if their derived statistics lag
+        self.update_derived_stats(review_docs)
+        
+        return [self._format_review_response(review_doc) for review_doc in review_docs]
+    
+    def insert_documents(self, review_docs: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Bulk insert built review documents
+        
+        Returns error messages for documents that failed, keyed by position;
+        the others are inserted. Missing user stats are built first; pass
+        the inserted documents to update_derived_stats afterwards.
+        """
+        self._ensure_derived_stats(review_doc['userId'] for review_doc in review_docs)
+        
+        failures = {}
         try:
-            skip = (page - 1) * limit
-            
-            # Get total count
-            total = self.collection.count_documents({"userId": ObjectId(user_id)})
-            
-            # Get reviews
-            reviews = list(
-                self.collection.find({"userId": ObjectId(user_id)})
-                .sort("createdAt", -1)
-                .skip(skip)
-                .limit(limit)
+            # insert_many sets _id on each document that does not have one
+            self.collection.insert_many(review_docs, ordered=False)
+        except BulkWriteError as e:
+            failures = {error['index']: error.get('errmsg', 'Write failed') for error in e.details.get('writeErrors', [])}
+        return failures
+    
+    def _ensure_derived_stats(self, user_ids: Iterable[ObjectId]):
+        """Build missing user stats and keyword rollups before the users' reviews are written"""
+        try:
+            for user_id, stats in self.stats.ensure(user_ids).items():
+                if not stats.get('keywordRollupBuilt'):
+                    self._ensure_keyword_rollups(user_id)
+        except Exception:
+            # Users left without stats or rollups are rebuilt from their
+            # reviews, including these, when they are next read
+            pass
+    
+    def _ensure_keyword_rollups(self, user_id: ObjectId):
+        """Build a user's keyword rollups from their reviews unless they are built
+        
+        The build holds a lease on the user's stats document, so only one runs
+        at a time and other callers wait for it to finish. Incremental updates
+        and trending reads therefore never overlap the rebuild.
+        """
+        while True:
+            now = datetime.utcnow()
+            lease_id = secrets.token_hex(8)
+            claimed = self.stats.collection.update_one(
+                {
+                    "_id": user_id,
+                    "keywordRollupBuilt": {"$ne": True},
+                    "$or": [
+                        {"keywordRollupLease": {"$exists": False}},
+                        {"keywordRollupLease.expiresAt": {"$lt": now}}
+                    ]
+                },
+                {"$set": {"keywordRollupLease": {
+                    "id": lease_id,
+                    "expiresAt": now + timedelta(seconds=self.KEYWORD_BUILD_LEASE_SECONDS)
+                }}}
             )
             
-            return {
-                "reviews": [self._format_review_response(review) for review in reviews],
-                "total": total,
-                "page": page,
-                "totalPages": (total + limit - 1) // limit
+            if claimed.modified_count:
+                lease = {"_id": user_id, "keywordRollupLease.id": lease_id}
+                try:
+                    self.keywords.rebuild(user_id)
+                except Exception:
+                    self.stats.collection.update_one(lease, {"$unset": {"keywordRollupLease": ""}})
+                    raise
+                self.stats.collection.update_one(
+                    lease, {"$set": {"keywordRollupBuilt": True}, "$unset": {"keywordRollupLease": ""}})
+                return
+            
+            stats = self.stats.collection.find_one({"_id": user_id}, {"keywordRollupBuilt": 1})
+            if not stats or stats.get('keywordRollupBuilt'):
+                return
+            time.sleep(self.KEYWORD_BUILD_POLL_SECONDS)
+    
+    def update_derived_stats(self, review_docs: List[Dict[str, Any]]) -> bool:
+        """Count inserted reviews in the user stats and keyword rollups"""
+        if not review_docs:
+            return True
+        try:
+            self.stats.reviews_created(review_docs)
+            self.keywords.apply(added=review_docs)
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def encode_cursor(values: List[Any]) -> str:
+        """Encode the sort key of the last item on a page as an opaque cursor"""
+        return base64.urlsafe_b64encode(json_util.dumps(values).encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor: str, types: Tuple[type, ...]) -> List[Any]:
+        """Decode a cursor created by encode_cursor holding one value of each of ``types``
+        
+        The values go straight into query operators, so anything else a
+        client could encode (objects, arrays, other types) is rejected.
+        """
+        try:
+            values = json_util.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, binascii.Error, UnicodeError):
+            raise ValueError("Invalid pagination cursor")
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Invalid pagination cursor")
+        if not all(isinstance(value, expected) for value, expected in zip(values, types)):
+            raise ValueError("Invalid pagination cursor")
+        return values
+    
+    def _newest_first_page(self, query: Dict[str, Any], page: int, limit: int,
+                           after: Optional[str], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fetch one page of reviews ordered by (createdAt, _id) descending
+        
+        With an ``after`` cursor the page starts right after the cursor's
+        position using the (userId, createdAt, _id) index, so every page costs
+        the same regardless of depth. Without one, ``page`` is skipped to.
+        """
+        if after:
+            created_at, review_id = self.decode_cursor(after, self.LIST_CURSOR_TYPES)
+            query = {
+                **query,
+                "$or": [
+                    {"createdAt": {"$lt": created_at}},
+                    {"createdAt": created_at, "_id": {"$lt": review_id}}
+                ]
             }
+        
+        projection = self._projection(fields, 'createdAt')
+        cursor = self.collection.find(query, projection).sort([("createdAt", -1), ("_id", -1)])
+        if not after:
+            cursor = cursor.skip((page - 1) * limit)
+        
+        # One extra review tells whether there is a next page
+        reviews = list(cursor.limit(limit + 1))
+        has_more = len(reviews) > limit
+        reviews = reviews[:limit]
+        
+        next_cursor = None
+        if has_more:
+            last = reviews[-1]
+            next_cursor = self.encode_cursor([last['createdAt'], last['_id']])
+        
+        return {
+            "reviews": [self._format_review_response(review, fields) for review in reviews],
+            "nextCursor": next_cursor,
+            "hasMore": has_more
+        }
+    
+    @staticmethod
+    def _add_page_info(result: Dict[str, Any], total: Optional[int], page: int,
+                       limit: int, after: Optional[str]) -> Dict[str, Any]:
+        """Add total and page numbers to a page of results"""
+        if total is not None:
+            result["total"] = total
+            if not after:
+                result["totalPages"] = (total + limit - 1) // limit
+        if not after:
+            result["page"] = page
+        return result
+    
+    def get_user_reviews(self, user_id: str, page: int = 1, limit: int = 10,
+                         after: Optional[str] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get reviews for a specific user, newest first
+        
+        Pass the previous page's ``nextCursor`` as ``after`` for constant-time
+        paging; ``page`` is kept for compatibility. The total comes from the
+        user's stats document.
+        """
+        if after:
+            self.decode_cursor(after, self.LIST_CURSOR_TYPES)
+        
+        try:
+            result = self._newest_first_page({"userId": ObjectId(user_id)}, page, limit, after, fields)
+            total = self.stats.format_stats(self.stats.get(ObjectId(user_id)))["totalReviews"]
+            return self._add_page_info(result, total, page, limit, after)
         except Exception:
-            return {"reviews": [], "total": 0, "page": 1, "totalPages": 0}
+            return {"reviews": [], "total": 0, "page": 1, "totalPages": 0, "nextCursor": None, "hasMore": False}
+    
+    def iter_user_reviews(self, user_id: str, fields: Optional[List[str]] = None,
+                          batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield all of a user's reviews, newest first, without loading them at once"""
+        projection = self._projection(fields or self.RESPONSE_FIELDS)
+        cursor = (
+            self.collection.find({"userId": ObjectId(user_id)}, projection)
+            .sort([("createdAt", -1), ("_id", -1)])
+            .batch_size(batch_size)
+        )
+        try:
+            for review in cursor:
+                yield self._format_review_response(review, fields)
+        finally:
+            cursor.close()
     
-    def get_review_by_id(self, review_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    def get_review_by_id(self, review_id: str, user_id: str,
+                         fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """Get a specific review by ID (only if it belongs to the user)"""
         try:
-            review = self.collection.find_one({
-                "_id": ObjectId(review_id),
-                "userId": ObjectId(user_id)
-            })
-            return self._format_review_response(review) if review else None
+            review = self.collection.find_one(
+                {"_id": ObjectId(review_id), "userId": ObjectId(user_id)},
+                self._projection(fields)
+            )
+            return self._format_review_response(review, fields) if review else None
         except Exception:
             return None
     
-    def update_review(self, review_id: str, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def update_review(self, review_id: str, user_id: str, update_data: Dict[str, Any],
+                      fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """Update a review (only if it belongs to the user)"""
         try:
             # Remove fields that shouldn't be updated directly
@@ -83,159 +353,176 @@ class Review:
             if not update_data:
                 return None
             
+            if 'matchScore' in update_data:
+                update_data['matchScore'] = int(update_data['matchScore'])
             update_data['updatedAt'] = datetime.utcnow()
             
-            result = self.collection.update_one(
+            if 'matchScore' in update_data or 'missingKeywords' in update_data:
+                self._ensure_derived_stats([ObjectId(user_id)])
+            
+            # The previous version carries the old values for the stats update
+            previous = self.collection.find_one_and_update(
                 {"_id": ObjectId(review_id), "userId": ObjectId(user_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                projection=self.DERIVED_FIELDS,
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.modified_count > 0:
-                return self.get_review_by_id(review_id, user_id)
-            return None
+            if not previous:
+                return None
+            
+            if 'matchScore' in update_data:
+                self.stats.score_changed(previous['userId'], previous['matchScore'], update_data['matchScore'])
+            if 'matchScore' in update_data or 'missingKeywords' in update_data:
+                self.keywords.apply(added=[{**previous, **update_data}], removed=[previous])
+            
+            return self.get_review_by_id(review_id, user_id, fields)
         except Exception:
             return None
     
     def delete_review(self, review_id: str, user_id: str) -> bool:
         """Delete a review (only if it belongs to the user)"""
         try:
-            result = self.collection.delete_one({
-                "_id": ObjectId(review_id),
-                "userId": ObjectId(user_id)
-            })
-            return result.deleted_count > 0
+            self._ensure_derived_stats([ObjectId(user_id)])
+            deleted = self.collection.find_one_and_delete(
+                {"_id": ObjectId(review_id), "userId": ObjectId(user_id)},
+                projection=self.DERIVED_FIELDS
+            )
+            if not deleted:
+                return False
+            
+            self.stats.review_deleted(deleted)
+            self.keywords.apply(removed=[deleted])
+            return True
         except Exception:
             return False
     
-    def get_user_stats(self, user_id: str) -> Dict[str, Any]:
-        """Get user's review statistics"""
+    def get_user_stats(self, user_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get user's review statistics from their maintained stats document"""
         try:
-            pipeline = [
-                {"$match": {"userId": ObjectId(user_id)}},
-                {
-                    "$group": {
-                        "_id": None,
-                        "totalReviews": {"$sum": 1},
-                        "averageScore": {"$avg": "$matchScore"},
-                        "bestScore": {"$max": "$matchScore"},
-                        "recentReviews": {"$push": "$$ROOT"}
-                    }
-                }
+            stats = self.stats.get(ObjectId(user_id))
+            response = self.stats.format_stats(stats)
+            
+            # Get recent reviews (last 5) by ID
+            recent_ids = stats.get('recentReviewIds', []) if stats else []
+            reviews = {
+                review['_id']: review
+                for review in self.collection.find({"_id": {"$in": recent_ids}}, self._projection(fields))
+            }
+            response["recentReviews"] = [
+                self._format_review_response(reviews[review_id], fields)
+                for review_id in recent_ids if review_id in reviews
             ]
             
-            result = list(self.collection.aggregate(pipeline))
+            return response
+        except Exception:
+            response = self.stats.format_stats(None)
+            response["recentReviews"] = []
+            return response
+    
+    def search_reviews(self, user_id: str, query: str, page: int = 1, limit: int = 10,
+                       after: Optional[str] = None, include_total: bool = True,
+                       fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Search user's reviews by job title or keywords, most relevant first
+        
+        Uses the (userId, jobTitle, missingKeywords) text index, so only the
+        user's matching reviews are read. Results carry a relevance score and
+        highlights; ``after`` takes the previous page's ``nextCursor``.
+        """
+        if after:
+            self.decode_cursor(after, self.SEARCH_CURSOR_TYPES)
+        
+        try:
+            search_filter = {"userId": ObjectId(user_id), "$text": {"$search": query}}
             
-            if not result:
-                return {
-                    "totalReviews": 0,
-                    "averageScore": 0,
-                    "bestScore": 0,
-                    "recentReviews": []
-                }
+            pipeline = [
+                {"$match": search_filter},
+                {"$addFields": {"relevance": {"$meta": "textScore"}}}
+            ]
             
-            stats = result[0]
+            if after:
+                relevance, review_id = self.decode_cursor(after, self.SEARCH_CURSOR_TYPES)
+                pipeline.append({
+                    "$match": {
+                        "$or": [
+                            {"relevance": {"$lt": relevance}},
+                            {"relevance": relevance, "_id": {"$lt": review_id}}
+                        ]
+                    }
+                })
             
-            # Get recent reviews (last 5)
-            recent_reviews = list(
-                self.collection.find({"userId": ObjectId(user_id)})
-                .sort("createdAt", -1)
-                .limit(5)
-            )
+            pipeline.append({"$sort": {"relevance": -1, "_id": -1}})
+            if not after:
+                pipeline.append({"$skip": (page - 1) * limit})
             
-            return {
-                "totalReviews": stats.get("totalReviews", 0),
-                "averageScore": round(stats.get("averageScore", 0), 2),
-                "bestScore": stats.get("bestScore", 0),
-                "recentReviews": [self._format_review_response(review) for review in recent_reviews]
-            }
-        except Exception:
-            return {
-                "totalReviews": 0,
-                "averageScore": 0,
-                "bestScore": 0,
-                "recentReviews": []
-            }
-    
-    def search_reviews(self, user_id: str, query: str, page: int = 1, limit: int = 10) -> Dict[str, Any]:
-        """Search user's reviews by job title or keywords"""
-        try:
-            skip = (page - 1) * limit
+            # One extra review tells whether there is a next page
+            pipeline.append({"$limit": limit + 1})
             
-            # Create search filter
-            search_filter = {
-                "userId": ObjectId(user_id),
-                "$or": [
-                    {"jobTitle": {"$regex": query, "$options": "i"}},
-                    {"missingKeywords": {"$regex": query, "$options": "i"}}
-                ]
-            }
+            # Highlights need the searched fields even when they are not returned
+            projection = self._projection(fields, 'relevance', 'jobTitle', 'missingKeywords')
+            if projection:
+                pipeline.append({"$project": projection})
             
-            # Get total count
-            total = self.collection.count_documents(search_filter)
+            reviews = list(self.collection.aggregate(pipeline))
+            has_more = len(reviews) > limit
+            reviews = reviews[:limit]
             
-            # Get reviews
-            reviews = list(
-                self.collection.find(search_filter)
-                .sort("createdAt", -1)
-                .skip(skip)
-                .limit(limit)
-            )
+            next_cursor = None
+            if has_more:
+                last = reviews[-1]
+                next_cursor = self.encode_cursor([last['relevance'], last['_id']])
             
-            return {
-                "reviews": [self._format_review_response(review) for review in reviews],
-                "total": total,
-                "page": page,
-                "totalPages": (total + limit - 1) // limit
+            result = {
+                "reviews": [self._format_search_result(review, query, fields) for review in reviews],
+                "nextCursor": next_cursor,
+                "hasMore": has_more
             }
-        except Exception:
-            return {"reviews": [], "total": 0, "page": 1, "totalPages": 0}
+            
+            total = self.collection.count_documents(search_filter) if include_total else None
+            return self._add_page_info(result, total, page, limit, after)
+        except OperationFailure as e:
+            if e.code == INDEX_NOT_FOUND:
+                raise SearchIndexMissingError(
+                    "The review search index is missing; run `python manage.py migrate`")
+            raise
     
-    def get_trending_keywords(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get trending keywords from user's reviews"""
+    def _format_search_result(self, review: Dict[str, Any], query: str,
+                              fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Format a search hit with its relevance score and highlights"""
+        result = self._format_review_response(review, fields)
+        result["relevance"] = round(review['relevance'], 4)
+        result["highlights"] = build_highlights(review, query)
+        return result
+    
+    def get_trending_keywords(self, user_id: str, window_days: Optional[int] = None,
+                              limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the user's most frequent missing keywords, optionally over the last ``window_days``"""
         try:
-            pipeline = [
-                {"$match": {"userId": ObjectId(user_id)}},
-                {"$unwind": "$missingKeywords"},
-                {
-                    "$group": {
-                        "_id": "$missingKeywords",
-                        "frequency": {"$sum": 1},
-                        "averageScore": {"$avg": "$matchScore"}
-                    }
-                },
-                {"$sort": {"frequency": -1}},
-                {"$limit": 20}
-            ]
+            user_object_id = ObjectId(user_id)
             
-            result = list(self.collection.aggregate(pipeline))
+            # Rollups are built from existing reviews the first time they are used
+            self._ensure_derived_stats([user_object_id])
             
-            return [
-                {
-                    "keyword": item["_id"],
-                    "frequency": item["frequency"],
-                    "averageScore": round(item["averageScore"], 2)
-                }
-                for item in result
-            ]
+            return self.keywords.top_keywords(user_object_id, limit, window_days)
         except Exception:
             return []
     
     @staticmethod
-    def _format_review_response(review: Dict[str, Any]) -> Dict[str, Any]:
-        """Format review data for API response"""
+    def _format_review_response(review: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Format review data for API response, limited to ``fields`` if given"""
         if not review:
             return None
         
-        return {
-            "id": str(review['_id']),
-            "userId": str(review['userId']),
-            "jobTitle": review['jobTitle'],
-            "jobDescription": review['jobDescription'],
-            "resumeFileName": review['resumeFileName'],
-            "matchScore": review['matchScore'],
-            "missingKeywords": review['missingKeywords'],
-            "profileSummary": review['profileSummary'],
-            "recommendations": review.get('recommendations', []),
-            "createdAt": review['createdAt'].isoformat(),
-            "updatedAt": review['updatedAt'].isoformat()
-        }
+        response = {}
+        for field in fields or Review.RESPONSE_FIELDS:
+            if field == 'id':
+                response['id'] = str(review['_id'])
+            elif field == 'userId':
+                response['userId'] = str(review['userId'])
+            elif field in ('createdAt', 'updatedAt'):
+                response[field] = review[field].isoformat()
+            elif field == 'recommendations':
+                response['recommendations'] = review.get('recommendations', [])
+            else:
+                response[field] = review[field]
+        return response
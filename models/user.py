@@ -1,9 +1,13 @@
+import copy
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from bson import ObjectId
-import bcrypt
+from pymongo import UpdateOne
 from email_validator import validate_email, EmailNotValidError
 
+from services.cache import get_user_cache
+from services.password_hasher import get_password_hasher
+
 
 class User:
     """User model for MongoDB operations"""
@@ -13,14 +17,35 @@ class User:
     
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash a password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash a password using bcrypt on the password hasher pool"""
+        return get_password_hasher().hash(password)
     
     @staticmethod
     def verify_password(password: str, hashed: str) -> bool:
-        """Verify a password against its hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        """Verify a password against its hash on the password hasher pool"""
+        return get_password_hasher().verify(password, hashed)
+    
+    @staticmethod
+    def _cache_user(user: Dict[str, Any]):
+        """Cache a formatted user under its ID and email"""
+        cache = get_user_cache()
+        if cache is not None:
+            cache.set(f"user:{user['id']}", copy.deepcopy(user))
+            cache.set(f"email:{user['email']}", user['id'])
+    
+    @staticmethod
+    def _cached_user(user_id: str) -> Optional[Dict[str, Any]]:
+        cache = get_user_cache()
+        user = cache.get(f"user:{user_id}") if cache is not None else None
+        return copy.deepcopy(user) if user else None
+    
+    @staticmethod
+    def invalidate_cached_user(user_id: Any):
+        """Drop a user from this process's user cache after it changes"""
+        cache = get_user_cache()
+        if cache is not None:
+            # Email entries only point at the ID entry, so they go stale with it
+            cache.delete(f"user:{user_id}")
     
     @staticmethod
     def validate_email_format(email: str) -> bool:
@@ -62,7 +87,7 @@ class User:
             "isActive": True,
             "profile": {
                 "totalReviews": 0,
-                "averageScore": 0,
+                "scoreSum": 0,
                 "lastLoginAt": None
             }
         }
@@ -81,29 +106,56 @@ class User:
         if not user:
             return None
         
-        if not self.verify_password(password, user['password']):
+        hasher = get_password_hasher()
+        if not hasher.verify(password, user['password']):
             return None
         
-        # Update last login
+        # Update last login, upgrading the hash if the bcrypt cost has changed
+        update = {"profile.lastLoginAt": datetime.utcnow()}
+        if hasher.needs_rehash(user['password']):
+            update["password"] = hasher.hash(password)
+        
         self.collection.update_one(
             {"_id": user['_id']},
-            {"$set": {"profile.lastLoginAt": datetime.utcnow()}}
+            {"$set": update}
         )
+        self.invalidate_cached_user(user['_id'])
         
         return self._format_user_response(user)
     
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user by ID"""
+        """Get user by ID, from the user cache when possible"""
+        cached = self._cached_user(user_id)
+        if cached:
+            return cached
+        
         try:
             user = self.collection.find_one({"_id": ObjectId(user_id), "isActive": True})
-            return self._format_user_response(user) if user else None
+            if not user:
+                return None
+            
+            user = self._format_user_response(user)
+            self._cache_user(user)
+            return user
         except Exception:
             return None
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        """Get user by email"""
-        user = self.collection.find_one({"email": email.lower(), "isActive": True})
-        return self._format_user_response(user) if user else None
+        """Get user by email, from the user cache when possible"""
+        email = email.lower()
+        cache = get_user_cache()
+        user_id = cache.get(f"email:{email}") if cache is not None else None
+        cached = self._cached_user(user_id) if user_id else None
+        if cached:
+            return cached
+        
+        user = self.collection.find_one({"email": email, "isActive": True})
+        if not user:
+            return None
+        
+        user = self._format_user_response(user)
+        self._cache_user(user)
+        return user
     
     def update_user(self, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update user information"""
@@ -121,6 +173,7 @@ class User:
                 {"_id": ObjectId(user_id)},
                 {"$set": update_data}
             )
+            self.invalidate_cached_user(user_id)
             
             if result.modified_count > 0:
                 return self.get_user_by_id(user_id)
@@ -128,33 +181,103 @@ class User:
         except Exception:
             return None
     
+    @staticmethod
+    def _add_review_scores(count: int, score_sum: int) -> List[Dict[str, Any]]:
+        """Update pipeline adding reviews to the running count and score sum
+        
+        Profiles written before scoreSum existed have it derived from their
+        stored average on first update.
+        """
+        total = {"$ifNull": ["$profile.totalReviews", 0]}
+        legacy_sum = {"$multiply": [{"$ifNull": ["$profile.averageScore", 0]}, total]}
+        return [
+            {
+                "$set": {
+                    "profile.totalReviews": {"$add": [total, count]},
+                    "profile.scoreSum": {"$add": [{"$ifNull": ["$profile.scoreSum", legacy_sum]}, score_sum]},
+                    "updatedAt": "$$NOW"
+                }
+            },
+            {"$unset": "profile.averageScore"}
+        ]
+    
     def update_user_stats(self, user_id: str, review_score: int) -> bool:
-        """Update user's review statistics"""
+        """Add a review score to the user's statistics in one atomic update"""
         try:
-            user = self.collection.find_one({"_id": ObjectId(user_id)})
-            if not user:
-                return False
-            
-            current_total = user.get('profile', {}).get('totalReviews', 0)
-            current_avg = user.get('profile', {}).get('averageScore', 0)
-            
-            new_total = current_total + 1
-            new_avg = ((current_avg * current_total) + review_score) / new_total
-            
-            self.collection.update_one(
+            result = self.collection.update_one(
                 {"_id": ObjectId(user_id)},
-                {
-                    "$set": {
-                        "profile.totalReviews": new_total,
-                        "profile.averageScore": round(new_avg, 2),
-                        "updatedAt": datetime.utcnow()
-                    }
-                }
+                self._add_review_scores(1, int(review_score))
             )
+            self.invalidate_cached_user(user_id)
+            return result.matched_count > 0
+        except Exception:
+            return False
+    
+    def update_user_stats_bulk(self, review_scores: Dict[Any, List[int]]) -> bool:
+        """Add new review scores to many users' statistics in one bulk write"""
+        try:
+            operations = [
+                UpdateOne({"_id": ObjectId(user_id)}, self._add_review_scores(len(scores), sum(scores)))
+                for user_id, scores in review_scores.items()
+            ]
+            
+            if operations:
+                self.collection.bulk_write(operations, ordered=False)
+            for user_id in review_scores:
+                self.invalidate_cached_user(user_id)
             return True
         except Exception:
             return False
     
+    def rebuild_review_stats(self, reviews_collection) -> int:
+        """Recompute every user's review count and score sum from the reviews collection
+        
+        Aggregated counters are merged into the users collection server-side
+        with $merge; users without reviews are then reset to zero. Returns
+        the number of users reset.
+        """
+        repaired_at = datetime.utcnow()
+        
+        reviews_collection.aggregate([
+            {
+                "$group": {
+                    "_id": "$userId",
+                    "totalReviews": {"$sum": 1},
+                    "scoreSum": {"$sum": "$matchScore"}
+                }
+            },
+            {
+                "$merge": {
+                    "into": self.collection.name,
+                    "on": "_id",
+                    "whenMatched": [
+                        {
+                            "$set": {
+                                "profile.totalReviews": "$$new.totalReviews",
+                                "profile.scoreSum": "$$new.scoreSum",
+                                "statsRepairedAt": repaired_at
+                            }
+                        },
+                        {"$unset": "profile.averageScore"}
+                    ],
+                    "whenNotMatched": "discard"
+                }
+            }
+        ])
+        
+        result = self.collection.update_many(
+            {"statsRepairedAt": {"$ne": repaired_at}},
+            {
+                "$set": {"profile.totalReviews": 0, "profile.scoreSum": 0, "statsRepairedAt": repaired_at},
+                "$unset": {"profile.averageScore": ""}
+            }
+        )
+        
+        cache = get_user_cache()
+        if cache is not None:
+            cache.clear()
+        return result.modified_count
+    
     def delete_user(self, user_id: str) -> bool:
         """Soft delete user (mark as inactive)"""
         try:
@@ -167,6 +290,7 @@ class User:
                     }
                 }
             )
+            self.invalidate_cached_user(user_id)
             return result.modified_count > 0
         except Exception:
             return False
@@ -183,5 +307,19 @@ class User:
             "firstName": user['firstName'],
             "lastName": user['lastName'],
             "createdAt": user['createdAt'].isoformat(),
-            "profile": user.get('profile', {})
+            "profile": User._format_profile(user.get('profile', {}))
         }
+    
+    @staticmethod
+    def _format_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Derive the average score from the stored running sum and count"""
+        total = profile.get('totalReviews', 0)
+        if 'scoreSum' in profile:
+            average = round(profile['scoreSum'] / total, 2) if total else 0
+        else:
+            average = profile.get('averageScore', 0)
+        
+        formatted = {key: value for key, value in profile.items() if key not in ('scoreSum', 'averageScore')}
+        formatted['totalReviews'] = total
+        formatted['averageScore'] = average
+        return formatted
@@ -0,0 +1,242 @@
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable
+from collections import defaultdict
+from bson import ObjectId
+from pymongo import UpdateOne, ReturnDocument
+
+
+class UserStats:
+    """Per-user review statistics maintained incrementally
+    
+    One document per user (keyed by user ID) holds the review count, score
+    sum, min/max, a 10-bucket score histogram and the IDs of the most recent
+    reviews. Documents are updated atomically as reviews change, so reading
+    stats is a single point lookup instead of an aggregation.
+    """
+    
+    RECENT_REVIEWS = 5
+    HISTOGRAM_BUCKETS = 10
+    
+    def __init__(self, db_collection, reviews_collection):
+        self.collection = db_collection
+        self.reviews_collection = reviews_collection
+    
+    @staticmethod
+    def _bucket(score: int) -> str:
+        """Histogram bucket for a 0-100 score (100 shares the 90s bucket)"""
+        return str(min(max(int(score), 0) // 10, 9))
+    
+    def review_created(self, review_doc: Dict[str, Any]):
+        """Count a newly inserted review; its user's document must exist (see ensure)"""
+        self.reviews_created([review_doc])
+    
+    def reviews_created(self, review_docs: List[Dict[str, Any]]):
+        """Count newly inserted reviews with one bulk write"""
+        by_user = defaultdict(list)
+        for review_doc in review_docs:
+            by_user[review_doc['userId']].append(review_doc)
+        
+        operations = []
+        for user_id, docs in by_user.items():
+            scores = [int(doc['matchScore']) for doc in docs]
+            histogram = defaultdict(int)
+            for score in scores:
+                histogram[f"histogram.{self._bucket(score)}"] += 1
+            newest_first = sorted(docs, key=lambda doc: doc['createdAt'], reverse=True)
+            
+            operations.append(UpdateOne(
+                {"_id": user_id},
+                {
+                    "$inc": {"count": len(docs), "scoreSum": sum(scores), **histogram},
+                    "$min": {"minScore": min(scores)},
+                    "$max": {"maxScore": max(scores)},
+                    "$push": {
+                        "recentReviewIds": {
+                            "$each": [doc['_id'] for doc in newest_first],
+                            "$position": 0,
+                            "$slice": self.RECENT_REVIEWS
+                        }
+                    },
+                    "$set": {"updatedAt": datetime.utcnow()}
+                }
+            ))
+        
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+    
+    def ensure(self, user_ids: Iterable[ObjectId]) -> Dict[ObjectId, Dict[str, Any]]:
+        """Build stats documents for users that do not have one yet
+        
+        Call before writing a user's reviews. The build then never reads a
+        review that is also counted incrementally, and a concurrent build
+        that wins the insert with an older read cannot drop the new review:
+        the review is counted by the increment that follows its write.
+        Returns each user's stats document.
+        """
+        user_ids = list(set(user_ids))
+        stats_by_user = {
+            doc['_id']: doc for doc in
+            self.collection.find({"_id": {"$in": user_ids}})
+        }
+        for user_id in user_ids:
+            if user_id not in stats_by_user:
+                stats_by_user[user_id] = self.rebuild(user_id)
+        return stats_by_user
+    
+    def review_deleted(self, review_doc: Dict[str, Any]):
+        """Remove a deleted review from its user's stats"""
+        score = int(review_doc['matchScore'])
+        stats = self.collection.find_one_and_update(
+            {"_id": review_doc['userId']},
+            {
+                "$inc": {
+                    "count": -1,
+                    "scoreSum": -score,
+                    f"histogram.{self._bucket(score)}": -1
+                },
+                "$pull": {"recentReviewIds": review_doc['_id']},
+                "$set": {"updatedAt": datetime.utcnow()}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if not stats:
+            return
+        
+        if score <= stats.get('minScore', score) or score >= stats.get('maxScore', score):
+            self._recompute_extremes(review_doc['userId'])
+        
+        if len(stats.get('recentReviewIds', [])) < min(stats['count'], self.RECENT_REVIEWS):
+            self._refill_recent(review_doc['userId'])
+    
+    def score_changed(self, user_id: ObjectId, old_score: int, new_score: int):
+        """Move a review between histogram buckets after a score update"""
+        old_score, new_score = int(old_score), int(new_score)
+        if old_score == new_score:
+            return
+        
+        increments = {"scoreSum": new_score - old_score}
+        old_bucket, new_bucket = self._bucket(old_score), self._bucket(new_score)
+        if old_bucket != new_bucket:
+            increments[f"histogram.{old_bucket}"] = -1
+            increments[f"histogram.{new_bucket}"] = 1
+        
+        stats = self.collection.find_one_and_update(
+            {"_id": user_id},
+            {
+                "$inc": increments,
+                "$min": {"minScore": new_score},
+                "$max": {"maxScore": new_score},
+                "$set": {"updatedAt": datetime.utcnow()}
+            },
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        # The old score may have been the only min or max
+        if stats and old_score in (stats.get('minScore'), stats.get('maxScore')):
+            self._recompute_extremes(user_id)
+    
+    def get(self, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+        """Get a user's stats document, building it on first access"""
+        stats = self.collection.find_one({"_id": user_id})
+        if stats is None:
+            stats = self.rebuild(user_id)
+        return stats
+    
+    def rebuild(self, user_id: ObjectId) -> Dict[str, Any]:
+        """Recompute a user's stats from their reviews
+        
+        Only creates the document if it does not exist yet, so a concurrent
+        incremental update is never overwritten.
+        """
+        stats = self._compute(user_id)
+        self.collection.update_one(
+            {"_id": user_id},
+            {"$setOnInsert": stats},
+            upsert=True
+        )
+        return self.collection.find_one({"_id": user_id})
+    
+    def repair(self, user_id: ObjectId) -> Dict[str, Any]:
+        """Overwrite a user's stats with values recomputed from their reviews"""
+        stats = self._compute(user_id)
+        self.collection.replace_one({"_id": user_id}, stats, upsert=True)
+        return stats
+    
+    def _compute(self, user_id: ObjectId) -> Dict[str, Any]:
+        """Aggregate a user's reviews into a stats document"""
+        pipeline = [
+            {"$match": {"userId": user_id}},
+            {
+                "$group": {
+                    "_id": {"$min": [{"$floor": {"$divide": ["$matchScore", 10]}}, 9]},
+                    "count": {"$sum": 1},
+                    "scoreSum": {"$sum": "$matchScore"},
+                    "minScore": {"$min": "$matchScore"},
+                    "maxScore": {"$max": "$matchScore"}
+                }
+            }
+        ]
+        buckets = list(self.reviews_collection.aggregate(pipeline))
+        
+        stats = {
+            "_id": user_id,
+            "count": sum(bucket['count'] for bucket in buckets),
+            "scoreSum": sum(bucket['scoreSum'] for bucket in buckets),
+            "histogram": {str(int(bucket['_id'])): bucket['count'] for bucket in buckets},
+            "recentReviewIds": self._latest_review_ids(user_id),
+            "updatedAt": datetime.utcnow()
+        }
+        if buckets:
+            stats["minScore"] = min(bucket['minScore'] for bucket in buckets)
+            stats["maxScore"] = max(bucket['maxScore'] for bucket in buckets)
+        return stats
+    
+    def _latest_review_ids(self, user_id: ObjectId) -> List[ObjectId]:
+        return [
+            review['_id'] for review in
+            self.reviews_collection.find({"userId": user_id}, {"_id": 1})
+            .sort("createdAt", -1)
+            .limit(self.RECENT_REVIEWS)
+        ]
+    
+    def _recompute_extremes(self, user_id: ObjectId):
+        """Reset min/max from the (userId, matchScore) index"""
+        lowest = self.reviews_collection.find_one(
+            {"userId": user_id}, {"matchScore": 1}, sort=[("matchScore", 1)])
+        highest = self.reviews_collection.find_one(
+            {"userId": user_id}, {"matchScore": 1}, sort=[("matchScore", -1)])
+        
+        if lowest and highest:
+            update = {"$set": {"minScore": lowest['matchScore'], "maxScore": highest['matchScore']}}
+        else:
+            update = {"$unset": {"minScore": "", "maxScore": ""}}
+        self.collection.update_one({"_id": user_id}, update)
+    
+    def _refill_recent(self, user_id: ObjectId):
+        """Reload the recent review IDs after one was deleted"""
+        self.collection.update_one(
+            {"_id": user_id},
+            {"$set": {"recentReviewIds": self._latest_review_ids(user_id)}}
+        )
+    
+    def format_stats(self, stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Format the numeric part of a stats document for API responses"""
+        count = stats.get('count', 0) if stats else 0
+        if not count:
+            return {
+                "totalReviews": 0,
+                "averageScore": 0,
+                "bestScore": 0,
+                "lowestScore": 0,
+                "scoreDistribution": [0] * self.HISTOGRAM_BUCKETS
+            }
+        
+        histogram = stats.get('histogram', {})
+        return {
+            "totalReviews": count,
+            "averageScore": round(stats.get('scoreSum', 0) / count, 2),
+            "bestScore": stats.get('maxScore', 0),
+            "lowestScore": stats.get('minScore', 0),
+            "scoreDistribution": [histogram.get(str(i), 0) for i in range(self.HISTOGRAM_BUCKETS)]
+        }
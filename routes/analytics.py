@@ -0,0 +1,130 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+import os
+import logging
+from functools import wraps
+from models.analytics import Analytics
+from models.user import User
+from config.database import get_database
+
+logger = logging.getLogger(__name__)
+
+# Create blueprint
+analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
+
+# Get database instance
+db = get_database()
+
+# Comma-separated emails allowed to read platform analytics (empty denies everyone)
+ANALYTICS_ALLOWED_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv('ANALYTICS_ALLOWED_EMAILS', '').split(',')
+    if email.strip()
+}
+
+MAX_ANALYTICS_DAYS = 365
+
+
+def analytics_access_required(view):
+    """Require a signed-in user on the analytics allowlist"""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not ANALYTICS_ALLOWED_EMAILS:
+            return jsonify({"error": "Analytics access denied"}), 403
+        user = User(db.get_users_collection()).get_user_by_id(get_jwt_identity())
+        if not user or user['email'].lower() not in ANALYTICS_ALLOWED_EMAILS:
+            return jsonify({"error": "Analytics access denied"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def get_range_parameters():
+    """Read the ``days`` and ``limit`` query parameters"""
+    days = int(request.args.get('days', 30))
+    limit = int(request.args.get('limit', 20))
+    
+    if days < 1 or days > MAX_ANALYTICS_DAYS:
+        days = 30
+    if limit < 1 or limit > 100:
+        limit = 20
+    
+    return days, limit
+
+
+@analytics_bp.route('/missing-keywords', methods=['GET'])
+@analytics_access_required
+def get_missing_keywords():
+    """Most frequently missing keywords across all users, optionally for one job title"""
+    try:
+        days, limit = get_range_parameters()
+        title = request.args.get('title', '').strip() or None
+        
+        keywords = Analytics(db.db).get_missing_keywords(days, limit, title)
+        
+        return jsonify({
+            "jobTitle": title,
+            "days": days,
+            "keywords": keywords
+        }), 200
+        
+    except ValueError:
+        return jsonify({"error": "days and limit must be integers"}), 400
+    except Exception as e:
+        logger.error(f"Get missing keywords analytics error: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@analytics_bp.route('/titles', methods=['GET'])
+@analytics_access_required
+def get_top_titles():
+    """Job titles with the most reviews across all users"""
+    try:
+        days, limit = get_range_parameters()
+        
+        titles = Analytics(db.db).get_top_titles(days, limit)
+        
+        return jsonify({
+            "days": days,
+            "titles": titles
+        }), 200
+        
+    except ValueError:
+        return jsonify({"error": "days and limit must be integers"}), 400
+    except Exception as e:
+        logger.error(f"Get title analytics error: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@analytics_bp.route('/score-distribution', methods=['GET'])
+@analytics_access_required
+def get_score_distribution():
+    """Score distribution and daily volume for a job title"""
+    try:
+        days, _ = get_range_parameters()
+        title = request.args.get('title', '').strip()
+        
+        if not title:
+            return jsonify({"error": "title is required"}), 400
+        
+        distribution = Analytics(db.db).get_score_distribution(title, days)
+        distribution["days"] = days
+        
+        return jsonify(distribution), 200
+        
+    except ValueError:
+        return jsonify({"error": "days must be an integer"}), 400
+    except Exception as e:
+        logger.error(f"Get score distribution analytics error: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@analytics_bp.route('/status', methods=['GET'])
+@analytics_access_required
+def get_analytics_status():
+    """When the analytics views were last refreshed"""
+    try:
+        return jsonify(Analytics(db.db).get_status()), 200
+    except Exception as e:
+        logger.error(f"Get analytics status error: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
@@ -10,6 +10,7 @@ from datetime import timedelta
 import logging
 from models.user import User
 from config.database import get_database
+from services.password_hasher import PasswordHasherBusy
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,10 @@ def signup():
         
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except PasswordHasherBusy:
+        response = jsonify({"error": "Too many sign-in requests, please try again shortly"})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
         logger.error(f"Signup error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -110,6 +115,10 @@ def login():
             "refreshToken": refresh_token
         }), 200
         
+    except PasswordHasherBusy:
+        response = jsonify({"error": "Too many sign-in requests, please try again shortly"})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -231,7 +240,7 @@ def get_user_stats():
         from models.review import Review
         
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Get user stats
         stats = review_model.get_user_stats(user_id)
@@ -1,9 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+import io
+import csv
+import json
+import zlib
 import logging
-from models.review import Review
+from datetime import datetime
+from models.review import Review, SearchIndexMissingError
+from models.keyword_rollup import KeywordRollup
 from models.user import User
 from config.database import get_database
+from services.write_batcher import get_review_write_batcher
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +21,11 @@ reviews_bp = Blueprint('reviews', __name__, url_prefix='/reviews')
 db = get_database()
 
 
+def get_response_fields():
+    """Review fields requested with the ``view`` or ``fields`` query parameter"""
+    return Review.resolve_fields(request.args.get('view'), request.args.get('fields'))
+
+
 @reviews_bp.route('', methods=['POST'])
 @jwt_required()
 def create_review():
@@ -28,15 +40,8 @@ def create_review():
         # Add user ID to the data
         data['userId'] = user_id
         
-        # Create review model instance
-        review_model = Review(db.get_reviews_collection())
-        
-        # Create review
-        review = review_model.create_review(data)
-        
-        # Update user statistics
-        user_model = User(db.get_users_collection())
-        user_model.update_user_stats(user_id, data['matchScore'])
+        # Save the review and update user statistics through the write batcher
+        review = get_review_write_batcher().save(data)
         
         logger.info(f"New review created for user: {user_id}")
         
@@ -62,6 +67,8 @@ def get_reviews():
         # Get pagination parameters
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
+        after = request.args.get('after') or None
+        fields = get_response_fields()
         
         # Validate pagination parameters
         if page < 1:
@@ -70,13 +77,15 @@ def get_reviews():
             limit = 10
         
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Get reviews
-        result = review_model.get_user_reviews(user_id, page, limit)
+        result = review_model.get_user_reviews(user_id, page, limit, after, fields)
         
         return jsonify(result), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Get reviews error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -88,12 +97,13 @@ def get_review(review_id):
     """Get a specific review"""
     try:
         user_id = get_jwt_identity()
+        fields = get_response_fields()
         
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Get review
-        review = review_model.get_review_by_id(review_id, user_id)
+        review = review_model.get_review_by_id(review_id, user_id, fields)
         
         if not review:
             return jsonify({"error": "Review not found"}), 404
@@ -102,6 +112,8 @@ def get_review(review_id):
             "review": review
         }), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Get review error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -118,11 +130,13 @@ def update_review(review_id):
         if not data:
             return jsonify({"error": "No data provided"}), 400
         
+        fields = get_response_fields()
+        
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Update review
-        review = review_model.update_review(review_id, user_id, data)
+        review = review_model.update_review(review_id, user_id, data, fields)
         
         if not review:
             return jsonify({"error": "Review not found or update failed"}), 404
@@ -134,6 +148,8 @@ def update_review(review_id):
             "review": review
         }), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Update review error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -147,7 +163,7 @@ def delete_review(review_id):
         user_id = get_jwt_identity()
         
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Delete review
         success = review_model.delete_review(review_id, user_id)
@@ -172,15 +188,18 @@ def get_review_stats():
     """Get user's review statistics"""
     try:
         user_id = get_jwt_identity()
+        fields = get_response_fields()
         
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Get stats
-        stats = review_model.get_user_stats(user_id)
+        stats = review_model.get_user_stats(user_id, fields)
         
         return jsonify(stats), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Get review stats error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -197,6 +216,11 @@ def search_reviews():
         query = request.args.get('q', '').strip()
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
+        after = request.args.get('after') or None
+        fields = get_response_fields()
+        
+        # Counting all matches is skipped by default when paging with a cursor
+        include_total = request.args.get('includeTotal', 'false' if after else 'true').lower() == 'true'
         
         if not query:
             return jsonify({"error": "Search query is required"}), 400
@@ -208,13 +232,19 @@ def search_reviews():
             limit = 10
         
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Search reviews
-        result = review_model.search_reviews(user_id, query, page, limit)
+        result = review_model.search_reviews(user_id, query, page, limit, after, include_total, fields)
         
         return jsonify(result), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except SearchIndexMissingError as e:
+        logger.error(f"Search reviews error: {str(e)}")
+        return jsonify({"error": "Search is unavailable until the database is migrated. "
+                                 "Run `python manage.py migrate`."}), 503
     except Exception as e:
         logger.error(f"Search reviews error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -227,53 +257,160 @@ def get_trending_keywords():
     try:
         user_id = get_jwt_identity()
         
+        # Window in days (7, 30 or 90); all-time by default
+        window = request.args.get('window', 'all').lower()
+        if window == 'all':
+            window_days = None
+        elif window.isdigit() and int(window) in KeywordRollup.WINDOWS:
+            window_days = int(window)
+        else:
+            windows = ', '.join(str(days) for days in KeywordRollup.WINDOWS)
+            return jsonify({"error": f"Invalid window. Use all or one of: {windows}"}), 400
+        
+        limit = int(request.args.get('limit', 20))
+        if limit < 1 or limit > 100:
+            limit = 20
+        
         # Create review model instance
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Get trending keywords
-        keywords = review_model.get_trending_keywords(user_id)
+        keywords = review_model.get_trending_keywords(user_id, window_days, limit)
         
         return jsonify({
-            "keywords": keywords
+            "keywords": keywords,
+            "window": window
         }), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Get trending keywords error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv')
+}
+
+EXPORT_CSV_COLUMNS = [
+    'id', 'jobTitle', 'resumeFileName', 'matchScore', 'missingKeywords',
+    'profileSummary', 'recommendations', 'jobDescription', 'createdAt', 'updatedAt'
+]
+
+# Encoded output is flushed to the client in chunks of about this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _export_records(export_format, user, stats, reviews, exported_at, columns=None):
+    """Encode an export as a stream of text pieces"""
+    if export_format == 'ndjson':
+        yield json.dumps({"type": "user", "user": user, "stats": stats, "exportedAt": exported_at}) + '\n'
+        for review in reviews:
+            yield json.dumps({"type": "review", "review": review}) + '\n'
+    
+    elif export_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        columns = columns or EXPORT_CSV_COLUMNS
+        writer.writerow(columns)
+        for review in reviews:
+            row = dict(review)
+            for list_field in ('missingKeywords', 'recommendations'):
+                if list_field in row:
+                    row[list_field] = '; '.join(row[list_field])
+            writer.writerow([row[column] for column in columns])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    else:
+        # Same document as the original JSON export, written incrementally
+        header = json.dumps({"user": user, "stats": stats, "exportedAt": exported_at})
+        yield header[:-1] + ', "reviews": ['
+        for index, review in enumerate(reviews):
+            yield (', ' if index else '') + json.dumps(review)
+        yield ']}'
+
+
+def _chunked(pieces, gzip_output):
+    """Join text pieces into chunks, optionally gzip-compressing on the fly"""
+    compressor = zlib.compressobj(wbits=31) if gzip_output else None
+    buffer = []
+    size = 0
+    
+    for piece in pieces:
+        data = piece.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_BYTES:
+            chunk = b''.join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    
+    chunk = b''.join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
 @reviews_bp.route('/export', methods=['GET'])
 @jwt_required()
 def export_user_data():
-    """Export all user data"""
+    """Export all user data as a streamed JSON, NDJSON or CSV download"""
     try:
         user_id = get_jwt_identity()
         
+        export_format = request.args.get('format', 'json').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"error": f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        
+        fields = get_response_fields()
+        if export_format == 'csv':
+            columns = [column for column in EXPORT_CSV_COLUMNS if fields is None or column in fields]
+        else:
+            columns = None
+        
         # Create model instances
         user_model = User(db.get_users_collection())
-        review_model = Review(db.get_reviews_collection())
+        review_model = Review(db.get_reviews_collection(), db.get_user_stats_collection())
         
         # Get user data
         user = user_model.get_user_by_id(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
         
-        # Get all reviews
-        all_reviews = review_model.get_user_reviews(user_id, 1, 1000)  # Get up to 1000 reviews
-        
         # Get stats
         stats = review_model.get_user_stats(user_id)
         
-        export_data = {
-            "user": user,
-            "reviews": all_reviews['reviews'],
-            "stats": stats,
-            "exportedAt": "2024-01-01T00:00:00Z"  # You can use datetime.utcnow().isoformat()
+        exported_at = datetime.utcnow()
+        gzip_output = 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+        
+        def generate():
+            try:
+                pieces = _export_records(
+                    export_format, user, stats, review_model.iter_user_reviews(user_id, fields),
+                    exported_at.isoformat() + 'Z', columns)
+                yield from _chunked(pieces, gzip_output)
+                logger.info(f"Data exported for user: {user_id}")
+            except Exception as e:
+                # Headers are already sent; the truncated download is the only signal
+                logger.error(f"Export data error for user {user_id}: {str(e)}")
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        headers = {
+            "Content-Disposition": f"attachment; filename=smart-ats-export-{exported_at:%Y%m%d}.{extension}",
+            "Vary": "Accept-Encoding"
         }
+        if gzip_output:
+            headers["Content-Encoding"] = "gzip"
         
-        logger.info(f"Data exported for user: {user_id}")
-        
-        return jsonify(export_data), 200
+        return Response(stream_with_context(generate()), mimetype=mimetype, headers=headers)
         
     except Exception as e:
         logger.error(f"Export data error: {str(e)}")
@@ -0,0 +1,251 @@
+import os
+import math
+import socket
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+TITLE_KEYWORDS_COLLECTION = 'analytics_title_keywords'
+TITLE_SCORES_COLLECTION = 'analytics_title_scores'
+STATE_COLLECTION = 'analytics_state'
+
+PIPELINE_ID = 'review_analytics'
+
+HISTOGRAM_BUCKETS = 10
+
+
+def _normalized(field: str) -> Dict[str, Any]:
+    """Aggregation expression for a trimmed, lowercased string field"""
+    return {"$toLower": {"$trim": {"input": {"$toString": field}}}}
+
+
+def _day_of(field: str) -> Dict[str, Any]:
+    """Aggregation expression truncating a date field to its UTC day"""
+    return {
+        "$dateFromParts": {
+            "year": {"$year": field},
+            "month": {"$month": field},
+            "day": {"$dayOfMonth": field}
+        }
+    }
+
+
+class AnalyticsPipeline:
+    """Incremental platform-wide review analytics materialized with $merge
+
+    Each run aggregates reviews created between the day of the stored
+    watermark and ``now - settle_seconds`` and merges the results into:
+
+    - ``analytics_title_keywords``: missing-keyword counts per job title and day
+    - ``analytics_title_scores``: review count, score sum and a 10-bucket score
+      histogram per job title and day
+
+    Whole days are recomputed and merged with ``replace``, so re-running a
+    range after a crash never double counts. Only one process runs at a
+    time, guarded by a lease on the state document. Reviews edited or
+    deleted after their day was processed are not revisited.
+    """
+
+    def __init__(self, get_db: Callable, settle_seconds: int = 60, chunk_days: int = 7,
+                 lease_seconds: int = 600):
+        self._get_db = get_db
+        self.settle_seconds = settle_seconds
+        self.chunk_days = chunk_days
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _day(timestamp: datetime) -> datetime:
+        return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+    def _acquire_lease(self, state) -> Optional[Dict[str, Any]]:
+        """Take the pipeline lease, returning the state document or None if held"""
+        now = datetime.utcnow()
+        try:
+            return state.find_one_and_update(
+                {
+                    "_id": PIPELINE_ID,
+                    "$or": [
+                        {"leaseExpiresAt": {"$lt": now}},
+                        {"leaseExpiresAt": None},
+                        {"leaseOwner": self.owner}
+                    ]
+                },
+                {"$set": {"leaseOwner": self.owner, "leaseExpiresAt": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The state document exists and another process holds the lease
+            return None
+
+    def _release_lease(self, state, update: Dict[str, Any]):
+        state.update_one(
+            {"_id": PIPELINE_ID, "leaseOwner": self.owner},
+            {"$set": {**update, "leaseOwner": None, "leaseExpiresAt": None}}
+        )
+
+    def run_once(self) -> Dict[str, Any]:
+        """Process reviews newer than the watermark
+
+        Returns a summary of the run, or ``{"skipped": True}`` when another
+        process holds the lease.
+        """
+        db = self._get_db()
+        state = db[STATE_COLLECTION]
+        lease = self._acquire_lease(state)
+        if lease is None:
+            logger.info("Analytics pipeline is running elsewhere, skipping")
+            return {"skipped": True}
+
+        started = time.perf_counter()
+        days_processed = 0
+        watermark = lease.get('watermark')
+        try:
+            if watermark is None:
+                first_review = db.reviews.find_one({}, {"createdAt": 1}, sort=[("createdAt", 1)])
+                watermark = first_review['createdAt'] if first_review else None
+
+            upper = datetime.utcnow() - timedelta(seconds=self.settle_seconds)
+            if watermark is not None:
+                start = self._day(watermark)
+                while start < upper and not self._stopping.is_set():
+                    stop = min(start + timedelta(days=self.chunk_days), upper)
+                    self._process_range(db, start, stop)
+                    days_processed += math.ceil((stop - start).total_seconds() / 86400)
+
+                    # Recording progress per chunk lets a later run resume here
+                    watermark = stop
+                    state.update_one(
+                        {"_id": PIPELINE_ID, "leaseOwner": self.owner},
+                        {"$set": {
+                            "watermark": watermark,
+                            "leaseExpiresAt": datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+                        }}
+                    )
+                    start = stop
+
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            summary = {
+                "skipped": False,
+                "watermark": watermark,
+                "daysProcessed": days_processed,
+                "elapsedMs": elapsed_ms
+            }
+            self._release_lease(state, {
+                "watermark": watermark,
+                "lastRunAt": datetime.utcnow(),
+                "lastRunMs": elapsed_ms
+            })
+            logger.info(f"Analytics pipeline processed {days_processed} day(s) in {elapsed_ms}ms")
+            return summary
+        except Exception:
+            self._release_lease(state, {})
+            raise
+
+    def _process_range(self, db, start: datetime, stop: datetime):
+        """Recompute and merge analytics for reviews created in [start of day, stop)"""
+        match = {"$match": {"createdAt": {"$gte": start, "$lt": stop}}}
+
+        db.reviews.aggregate([
+            match,
+            {"$unwind": "$missingKeywords"},
+            {
+                "$group": {
+                    "_id": {
+                        "title": _normalized("$jobTitle"),
+                        "keyword": _normalized("$missingKeywords"),
+                        "day": _day_of("$createdAt")
+                    },
+                    "displayTitle": {"$first": "$jobTitle"},
+                    "displayKeyword": {"$first": "$missingKeywords"},
+                    "count": {"$sum": 1}
+                }
+            },
+            {"$match": {"_id.keyword": {"$ne": ""}}},
+            {
+                "$project": {
+                    "title": "$_id.title",
+                    "keyword": "$_id.keyword",
+                    "day": "$_id.day",
+                    "displayTitle": 1,
+                    "displayKeyword": 1,
+                    "count": 1
+                }
+            },
+            {"$merge": {"into": TITLE_KEYWORDS_COLLECTION, "on": "_id",
+                        "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+
+        bucket = {"$min": [{"$floor": {"$divide": ["$matchScore", 10]}}, HISTOGRAM_BUCKETS - 1]}
+        db.reviews.aggregate([
+            match,
+            {
+                "$group": {
+                    "_id": {"title": _normalized("$jobTitle"), "day": _day_of("$createdAt")},
+                    "displayTitle": {"$first": "$jobTitle"},
+                    "count": {"$sum": 1},
+                    "scoreSum": {"$sum": "$matchScore"},
+                    **{
+                        f"h{index}": {"$sum": {"$cond": [{"$eq": [bucket, index]}, 1, 0]}}
+                        for index in range(HISTOGRAM_BUCKETS)
+                    }
+                }
+            },
+            {
+                "$project": {
+                    "title": "$_id.title",
+                    "day": "$_id.day",
+                    "displayTitle": 1,
+                    "count": 1,
+                    "scoreSum": 1,
+                    "histogram": [f"$h{index}" for index in range(HISTOGRAM_BUCKETS)]
+                }
+            },
+            {"$merge": {"into": TITLE_SCORES_COLLECTION, "on": "_id",
+                        "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+
+    def start(self, interval_seconds: float):
+        """Run the pipeline every ``interval_seconds`` on a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run_forever, args=(interval_seconds,), name='analytics-pipeline', daemon=True)
+        self._thread.start()
+        logger.info(f"Analytics pipeline scheduled every {interval_seconds}s")
+
+    def _run_forever(self, interval_seconds: float):
+        while not self._stopping.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Analytics pipeline run failed: {str(e)}")
+            self._stopping.wait(interval_seconds)
+
+    def stop(self, wait: bool = True):
+        """Stop the background schedule"""
+        self._stopping.set()
+        if wait and self._thread:
+            self._thread.join()
+
+
+def create_analytics_pipeline(get_db: Callable) -> AnalyticsPipeline:
+    """Create the analytics pipeline configured by the environment"""
+    return AnalyticsPipeline(
+        get_db,
+        settle_seconds=int(os.getenv('ANALYTICS_SETTLE_SECONDS', 60)),
+        chunk_days=int(os.getenv('ANALYTICS_CHUNK_DAYS', 7)),
+        lease_seconds=int(os.getenv('ANALYTICS_LEASE_SECONDS', 600))
+    )
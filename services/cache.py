@@ -0,0 +1,579 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable
+
+from services.metrics import EXTRACTION_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry time-to-live"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            # Mark as most recently used
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entries if full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """Remove a value if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all values"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SizedLRUCache:
+    """Thread-safe in-process LRU cache bounded by the total size of its values"""
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = len):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None if missing"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries until it fits
+
+        Values larger than the whole cache are not stored.
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[0]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (size, value)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def delete(self, key: str):
+        """Remove a value if present"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[0]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MemoryCacheBackend:
+    """Result cache backend local to the current process"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        self._cache.set(key, value, ttl_seconds)
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+
+class MongoCacheBackend:
+    """Cache backend shared by all workers through a MongoDB collection
+
+    Expiry is handled by a TTL index on ``expiresAt``; the collection is kept
+    under ``max_entries`` by periodically trimming the least recently read
+    documents.
+    """
+
+    name = 'mongo'
+
+    # Check the collection size once every this many writes
+    TRIM_INTERVAL = 100
+
+    def __init__(self, get_collection: Callable, max_entries: int = 50000):
+        self._get_collection = get_collection
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            now = datetime.utcnow()
+            doc = self._get_collection().find_one_and_update(
+                {"_id": key, "expiresAt": {"$gt": now}},
+                {"$set": {"lastAccessedAt": now}},
+                projection={"value": 1}
+            )
+            return doc['value'] if doc else None
+        except Exception as e:
+            logger.warning(f"MongoDB cache read failed: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        try:
+            now = datetime.utcnow()
+            self._get_collection().update_one(
+                {"_id": key},
+                {
+                    "$set": {
+                        "value": value,
+                        "expiresAt": now + timedelta(seconds=ttl_seconds),
+                        "lastAccessedAt": now
+                    },
+                    "$setOnInsert": {"createdAt": now}
+                },
+                upsert=True
+            )
+            self._maybe_trim()
+        except Exception as e:
+            logger.warning(f"MongoDB cache write failed: {str(e)}")
+
+    def delete(self, key: str):
+        try:
+            self._get_collection().delete_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"MongoDB cache delete failed: {str(e)}")
+
+    def _maybe_trim(self):
+        """Evict least recently read entries once the collection is over capacity"""
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.TRIM_INTERVAL:
+                return
+
+        collection = self._get_collection()
+        excess = collection.estimated_document_count() - self.max_entries
+        if excess <= 0:
+            return
+
+        stale_ids = [
+            doc['_id'] for doc in
+            collection.find({}, {"_id": 1}).sort("lastAccessedAt", 1).limit(excess)
+        ]
+        if stale_ids:
+            collection.delete_many({"_id": {"$in": stale_ids}})
+            logger.info(f"MongoDB cache evicted {len(stale_ids)} entries from {collection.name}")
+
+
+class DiskCacheBackend:
+    """Cache backend storing one JSON file per key in a local directory
+
+    Survives restarts and is shared by the workers on one host. Files
+    carry their expiry time; a file's modification time records its last
+    read, and the least recently read files are deleted once the directory
+    exceeds ``max_bytes``.
+    """
+
+    name = 'disk'
+
+    # Check the directory size once every this many writes
+    TRIM_INTERVAL = 50
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Keys are hex digests, optionally prefixed; keep file names safe
+        safe_key = ''.join(c if c.isalnum() or c in '-_' else '_' for c in key)
+        return os.path.join(self.directory, f"{safe_key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            if entry['expiresAt'] <= time.time():
+                os.remove(path)
+                return None
+            os.utime(path)
+            return entry['value']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Disk cache read failed: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({"expiresAt": time.time() + ttl_seconds, "value": value}, f)
+            # Readers in other workers see either the old file or the new one
+            os.replace(temp_path, path)
+            self._maybe_trim()
+        except Exception as e:
+            logger.warning(f"Disk cache write failed: {str(e)}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Disk cache delete failed: {str(e)}")
+
+    def _maybe_trim(self):
+        """Delete least recently read files once the directory is over capacity"""
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.TRIM_INTERVAL:
+                return
+
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        excess = sum(size for _, size, _ in files) - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted = 0
+        for _, size, path in sorted(files):
+            if excess <= 0:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            excess -= size
+            evicted += 1
+        logger.info(f"Disk cache evicted {evicted} entries")
+
+
+class TieredCacheBackend:
+    """In-process cache in front of a shared backend"""
+
+    def __init__(self, local: MemoryCacheBackend, shared):
+        self.local = local
+        self.shared = shared
+        self.name = f"{local.name}+{shared.name}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, self.local.ttl_seconds)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        self.local.set(key, value, ttl_seconds)
+        self.shared.set(key, value, ttl_seconds)
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so that formatting-only differences share a cache key"""
+    text = unicodedata.normalize('NFKC', text or '')
+    return ' '.join(text.split())
+
+
+class ResultCache:
+    """Content-addressed cache for analysis results"""
+
+    # Bump when the cached result shape or prompt changes
+    KEY_VERSION = 1
+
+    def __init__(self, backend, ttl_seconds: float = 86400):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, resume_text: str, job_description: str,
+                 model_name: str, generation_config: Dict[str, Any]) -> str:
+        """Build the cache key for an analysis request"""
+        payload = json.dumps({
+            "v": self.KEY_VERSION,
+            "resume": normalize_text(resume_text),
+            "jd": normalize_text(job_description),
+            "model": model_name,
+            "config": generation_config
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result and record the hit or miss"""
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return dict(value) if value is not None else None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store an analysis result"""
+        self.backend.set(key, dict(value), self.ttl_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for this process"""
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 4) if total else 0
+        }
+
+
+class ExtractionCache:
+    """Extracted PDF text keyed by the SHA-256 of the uploaded bytes
+
+    A size-bounded in-process LRU sits in front of an optional persistent
+    backend (disk or MongoDB), so a resume uploaded again, to this worker or
+    another, skips PDF parsing. The key also covers the extraction settings
+    that change the text.
+    """
+
+    # Bump when the extracted text or its normalization changes
+    KEY_VERSION = 1
+
+    def __init__(self, max_memory_bytes: int, persistent=None, ttl_seconds: float = 7 * 86400):
+        self.memory = SizedLRUCache(max_memory_bytes, sizeof=lambda value: len(value['text'].encode('utf-8')))
+        self.persistent = persistent
+        self.ttl_seconds = ttl_seconds
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, data: bytes, max_pages: int) -> str:
+        """Build the cache key for a PDF extracted with at most ``max_pages`` pages"""
+        return f"v{self.KEY_VERSION}-p{max_pages}-{hashlib.sha256(data).hexdigest()}"
+
+    def _count(self, result: str):
+        with self._lock:
+            if result == 'memory_hit':
+                self.memory_hits += 1
+            elif result == 'persistent_hit':
+                self.persistent_hits += 1
+            else:
+                self.misses += 1
+        EXTRACTION_CACHE_LOOKUPS.labels(result).inc()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up an extraction, promoting persistent hits into memory"""
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('memory_hit')
+            return dict(value)
+
+        value = self.persistent.get(key) if self.persistent else None
+        if value is not None:
+            self.memory.set(key, value)
+            self._count('persistent_hit')
+            return dict(value)
+
+        self._count('miss')
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store an extraction in memory and in the persistent backend"""
+        self.memory.set(key, dict(value))
+        if self.persistent:
+            self.persistent.set(key, dict(value), self.ttl_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and memory use for this process"""
+        total = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            "backend": f"memory+{self.persistent.name}" if self.persistent else 'memory',
+            "memoryHits": self.memory_hits,
+            "persistentHits": self.persistent_hits,
+            "misses": self.misses,
+            "hitRate": round((self.memory_hits + self.persistent_hits) / total, 4) if total else 0,
+            "memoryEntries": len(self.memory),
+            "memoryBytes": self.memory.total_bytes,
+            "memoryMaxBytes": self.memory.max_bytes
+        }
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_initialized = False
+_result_cache_lock = threading.Lock()
+
+
+def create_result_cache() -> Optional[ResultCache]:
+    """Create the result cache configured by the environment
+
+    RESULT_CACHE_BACKEND is one of ``memory`` (default), ``mongo`` or ``none``.
+    """
+    backend_name = os.getenv('RESULT_CACHE_BACKEND', 'memory').lower()
+    ttl_seconds = int(os.getenv('RESULT_CACHE_TTL_SECONDS', 86400))
+    max_entries = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', 1024))
+
+    if backend_name == 'none':
+        return None
+
+    local = MemoryCacheBackend(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    if backend_name == 'mongo':
+        from config.database import get_database
+        shared = MongoCacheBackend(
+            get_database().get_analysis_cache_collection,
+            max_entries=int(os.getenv('RESULT_CACHE_MONGO_MAX_ENTRIES', 50000))
+        )
+        backend = TieredCacheBackend(local, shared)
+    else:
+        backend = local
+
+    logger.info(f"Result cache enabled with {backend.name} backend")
+    return ResultCache(backend, ttl_seconds=ttl_seconds)
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the process-wide result cache"""
+    global _result_cache, _result_cache_initialized
+    if not _result_cache_initialized:
+        with _result_cache_lock:
+            if not _result_cache_initialized:
+                _result_cache = create_result_cache()
+                _result_cache_initialized = True
+    return _result_cache
+
+
+_user_cache: Optional[TTLCache] = None
+_user_cache_initialized = False
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache() -> Optional[TTLCache]:
+    """Get the process-wide cache of formatted user documents
+
+    Entries are dropped whenever this process changes a user; changes made by
+    other processes show up within USER_CACHE_TTL_SECONDS. A TTL of 0
+    disables the cache.
+    """
+    global _user_cache, _user_cache_initialized
+    if not _user_cache_initialized:
+        with _user_cache_lock:
+            if not _user_cache_initialized:
+                ttl_seconds = float(os.getenv('USER_CACHE_TTL_SECONDS', 30))
+                if ttl_seconds > 0:
+                    _user_cache = TTLCache(
+                        max_entries=int(os.getenv('USER_CACHE_MAX_ENTRIES', 10000)),
+                        ttl_seconds=ttl_seconds
+                    )
+                _user_cache_initialized = True
+    return _user_cache
+
+
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_initialized = False
+_extraction_cache_lock = threading.Lock()
+
+
+def create_extraction_cache() -> Optional[ExtractionCache]:
+    """Create the extracted-text cache configured by the environment
+
+    EXTRACTION_CACHE_BACKEND is one of ``memory`` (default), ``disk``,
+    ``mongo`` or ``none``; disk and mongo add a persistent tier behind the
+    in-process one.
+    """
+    backend_name = os.getenv('EXTRACTION_CACHE_BACKEND', 'memory').lower()
+    if backend_name == 'none':
+        return None
+
+    if backend_name == 'disk':
+        persistent = DiskCacheBackend(
+            os.getenv('EXTRACTION_CACHE_DIR', os.path.join('.cache', 'extracted-text')),
+            max_bytes=int(os.getenv('EXTRACTION_CACHE_DISK_MAX_BYTES', 512 * 1024 * 1024))
+        )
+    elif backend_name == 'mongo':
+        from config.database import get_database
+        persistent = MongoCacheBackend(
+            get_database().get_extraction_cache_collection,
+            max_entries=int(os.getenv('EXTRACTION_CACHE_MONGO_MAX_ENTRIES', 50000))
+        )
+    else:
+        persistent = None
+
+    cache = ExtractionCache(
+        max_memory_bytes=int(os.getenv('EXTRACTION_CACHE_MEMORY_MAX_BYTES', 64 * 1024 * 1024)),
+        persistent=persistent,
+        ttl_seconds=float(os.getenv('EXTRACTION_CACHE_TTL_SECONDS', 7 * 86400))
+    )
+    logger.info(f"Extraction cache enabled with {cache.get_stats()['backend']} backend")
+    return cache
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Get the process-wide extracted-text cache"""
+    global _extraction_cache, _extraction_cache_initialized
+    if not _extraction_cache_initialized:
+        with _extraction_cache_lock:
+            if not _extraction_cache_initialized:
+                _extraction_cache = create_extraction_cache()
+                _extraction_cache_initialized = True
+    return _extraction_cache
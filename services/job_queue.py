@@ -0,0 +1,360 @@
+import json
+import socket
+import hashlib
+import logging
+import secrets
+import ipaddress
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable, Iterable
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUS_QUEUED = 'queued'
+JOB_STATUS_RUNNING = 'running'
+JOB_STATUS_COMPLETED = 'completed'
+JOB_STATUS_FAILED = 'failed'
+
+
+class CallbackURLError(ValueError):
+    """Raised when a callback URL may not receive job results"""
+
+
+def check_callback_url(url: str, allowed_hosts: Optional[Iterable[str]] = None):
+    """Reject callback URLs that could reach internal services
+
+    With an allowlist, the host must be listed. Otherwise every address the
+    host resolves to must be public: loopback, private, link-local (which
+    includes cloud metadata endpoints) and reserved ranges are refused.
+    """
+    parsed = urllib.parse.urlsplit(url or '')
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise CallbackURLError('Callback URL must be an http(s) URL')
+
+    host = parsed.hostname.lower()
+    allowed_hosts = [allowed.strip().lower() for allowed in (allowed_hosts or []) if allowed.strip()]
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise CallbackURLError('Callback URL host is not allowed')
+        return
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or None, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise CallbackURLError('Callback URL host could not be resolved')
+
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%', 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise CallbackURLError('Callback URL must not point to a private or internal address')
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Refuse redirects, which could lead a checked callback to an internal address"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def hash_access_token(token: str) -> str:
+    """Digest stored in place of an anonymous job's access token"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class JobQueue:
+    """MongoDB-backed job queue processed by a bounded worker pool
+
+    Jobs are claimed with an atomic ``find_one_and_update`` and hold a lease
+    while running, so any number of processes can share one collection. A
+    heartbeat renews the leases of running jobs, and a job's outcome is only
+    recorded while its worker still holds the lease. A job whose lease
+    expires (for example because its worker died) is picked up again until
+    ``max_attempts`` is reached, after which it is failed.
+
+    Anonymous jobs are readable only with the access token returned when
+    they are submitted.
+    """
+
+    def __init__(self, get_collection: Callable, handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 max_workers: int = 4, lease_seconds: float = 300, max_attempts: int = 3,
+                 poll_interval: float = 2.0, retention_days: int = 7,
+                 callback_allowed_hosts: Optional[Iterable[str]] = None):
+        self._get_collection = get_collection
+        self.handler = handler
+        self.max_workers = max_workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retention_days = retention_days
+        self.callback_allowed_hosts = list(callback_allowed_hosts or [])
+        self._callback_opener = urllib.request.build_opener(_NoRedirectHandler)
+
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._heartbeat_done = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # Leases held by this process's running jobs, renewed by the heartbeat
+        self._held_leases: Dict[ObjectId, str] = {}
+        self._held_leases_lock = threading.Lock()
+
+    def submit(self, payload: Dict[str, Any], user_id: Optional[str] = None,
+               callback_url: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Queue a job and return its ID and, for anonymous jobs, its access token"""
+        if callback_url:
+            if not user_id:
+                raise CallbackURLError('Callback URLs require authentication')
+            check_callback_url(callback_url, self.callback_allowed_hosts)
+
+        access_token = None if user_id else secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        job_doc = {
+            "status": JOB_STATUS_QUEUED,
+            "userId": ObjectId(user_id) if user_id else None,
+            "accessTokenHash": hash_access_token(access_token) if access_token else None,
+            "payload": payload,
+            "callbackUrl": callback_url,
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "createdAt": now,
+            "updatedAt": now
+        }
+
+        result = self._get_collection().insert_one(job_doc)
+        self._wakeup.set()
+        return {"jobId": str(result.inserted_id), "accessToken": access_token}
+
+    def get_job(self, job_id: str, user_id: Optional[str] = None,
+                access_token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a job's status and result (only if it belongs to the user, or
+        for anonymous jobs, only with its access token)"""
+        if user_id:
+            query = {"userId": ObjectId(user_id)}
+        elif access_token:
+            query = {"userId": None, "accessTokenHash": hash_access_token(access_token)}
+        else:
+            return None
+
+        try:
+            query["_id"] = ObjectId(job_id)
+            job = self._get_collection().find_one(query, {"payload": 0})
+            return self._format_job_response(job) if job else None
+        except Exception:
+            return None
+
+    def start(self):
+        """Start the dispatcher thread and worker pool (idempotent)"""
+        with self._start_lock:
+            if self._dispatcher and self._dispatcher.is_alive():
+                return
+
+            self._stopping.clear()
+            self._heartbeat_done.clear()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='analysis-job')
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name='analysis-job-dispatcher', daemon=True)
+            self._dispatcher.start()
+            self._heartbeat = threading.Thread(
+                target=self._heartbeat_loop, name='analysis-job-heartbeat', daemon=True)
+            self._heartbeat.start()
+            logger.info(f"Job queue started with {self.max_workers} workers")
+
+    def stop(self, wait: bool = True):
+        """Stop claiming new jobs and optionally wait for running ones"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._dispatcher:
+            self._dispatcher.join()
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+        if self._heartbeat and wait:
+            self._heartbeat_done.set()
+            self._heartbeat.join()
+
+    def _dispatch_loop(self):
+        """Claim jobs whenever a worker slot is free"""
+        while not self._stopping.is_set():
+            self._slots.acquire()
+            try:
+                self._fail_exhausted_jobs()
+                job = self._claim_next_job()
+            except Exception as e:
+                logger.error(f"Failed to claim job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._slots.release()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._executor.submit(self._run_job, job)
+
+    def _heartbeat_loop(self):
+        """Renew the leases of running jobs until the queue stops"""
+        # Jobs still running after stop() are renewed until they finish
+        while not self._heartbeat_done.wait(self.lease_seconds / 3):
+            with self._held_leases_lock:
+                held = list(self._held_leases.items())
+            if not held and self._stopping.is_set():
+                return
+            for job_id, lease_id in held:
+                try:
+                    self._renew_lease(job_id, lease_id)
+                except Exception as e:
+                    logger.warning(f"Failed to renew lease of job {job_id}: {str(e)}")
+
+    def _renew_lease(self, job_id, lease_id: str):
+        now = datetime.utcnow()
+        result = self._get_collection().update_one(
+            {"_id": job_id, "status": JOB_STATUS_RUNNING, "leaseId": lease_id},
+            {"$set": {"leaseExpiresAt": now + timedelta(seconds=self.lease_seconds), "updatedAt": now}}
+        )
+        if result.matched_count == 0:
+            logger.warning(f"Job {job_id} lost its lease; its result will be discarded")
+            with self._held_leases_lock:
+                self._held_leases.pop(job_id, None)
+
+    def _fail_exhausted_jobs(self):
+        """Fail jobs whose lease expired on their last attempt"""
+        while True:
+            finished = self._finish_job(
+                {
+                    "status": JOB_STATUS_RUNNING,
+                    "leaseExpiresAt": {"$lt": datetime.utcnow()},
+                    "attempts": {"$gte": self.max_attempts}
+                },
+                {
+                    "status": JOB_STATUS_FAILED,
+                    "error": f"Job did not finish after {self.max_attempts} attempts"
+                }
+            )
+            if finished is None:
+                return
+            logger.warning(f"Job {finished['_id']} failed: lease expired after {finished['attempts']} attempts")
+
+    def _claim_next_job(self) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest runnable job to the running state"""
+        now = datetime.utcnow()
+        return self._get_collection().find_one_and_update(
+            {
+                "attempts": {"$lt": self.max_attempts},
+                "$or": [
+                    {"status": JOB_STATUS_QUEUED},
+                    {"status": JOB_STATUS_RUNNING, "leaseExpiresAt": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": JOB_STATUS_RUNNING,
+                    "startedAt": now,
+                    "leaseId": secrets.token_hex(8),
+                    "leaseExpiresAt": now + timedelta(seconds=self.lease_seconds),
+                    "updatedAt": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("createdAt", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _run_job(self, job: Dict[str, Any]):
+        """Run a claimed job and record its outcome while holding its lease"""
+        with self._held_leases_lock:
+            self._held_leases[job['_id']] = job['leaseId']
+        try:
+            try:
+                result = self.handler(job['payload'])
+                update = {"status": JOB_STATUS_COMPLETED, "result": result}
+            except Exception as e:
+                logger.warning(f"Job {job['_id']} failed: {str(e)}")
+                update = {"status": JOB_STATUS_FAILED, "error": str(e)}
+
+            finished = self._finish_job(
+                {"_id": job['_id'], "status": JOB_STATUS_RUNNING, "leaseId": job['leaseId']}, update)
+            if finished is None:
+                logger.warning(f"Job {job['_id']} lost its lease before finishing; result discarded")
+        except Exception as e:
+            logger.error(f"Failed to record result for job {job['_id']}: {str(e)}")
+        finally:
+            with self._held_leases_lock:
+                self._held_leases.pop(job['_id'], None)
+            self._slots.release()
+            self._wakeup.set()
+
+    def _finish_job(self, query: Dict[str, Any], update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record the outcome of the job matching ``query`` and send its callback
+
+        Returns the finished job, or None if no job matched (for example
+        because another worker took over its lease).
+        """
+        now = datetime.utcnow()
+        update.update({
+            "completedAt": now,
+            "updatedAt": now,
+            "expiresAt": now + timedelta(days=self.retention_days)
+        })
+
+        # Drop the payload once finished; it holds the whole resume text
+        finished = self._get_collection().find_one_and_update(
+            query,
+            {"$set": update, "$unset": {"payload": "", "leaseId": "", "leaseExpiresAt": ""}},
+            projection={"payload": 0},
+            sort=[("createdAt", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+        if finished and finished.get('callbackUrl'):
+            self._send_callback(finished)
+        return finished
+
+    def _send_callback(self, job: Dict[str, Any]):
+        """POST the finished job to its callback URL"""
+        try:
+            # Checked again at send time, in case the host now resolves elsewhere
+            check_callback_url(job['callbackUrl'], self.callback_allowed_hosts)
+            body = json.dumps(self._format_job_response(job)).encode('utf-8')
+            callback_request = urllib.request.Request(
+                job['callbackUrl'],
+                data=body,
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            with self._callback_opener.open(callback_request, timeout=10) as response:
+                logger.info(f"Callback for job {job['_id']} returned {response.status}")
+        except Exception as e:
+            logger.warning(f"Callback for job {job['_id']} failed: {str(e)}")
+
+    @staticmethod
+    def _format_job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Format job data for API response"""
+        if not job:
+            return None
+
+        def isoformat(value):
+            return value.isoformat() if value else None
+
+        return {
+            "jobId": str(job['_id']),
+            "status": job['status'],
+            "attempts": job.get('attempts', 0),
+            "result": job.get('result'),
+            "error": job.get('error'),
+            "createdAt": isoformat(job.get('createdAt')),
+            "startedAt": isoformat(job.get('startedAt')),
+            "completedAt": isoformat(job.get('completedAt'))
+        }
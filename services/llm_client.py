@@ -0,0 +1,453 @@
+import os
+import json
+import time
+import asyncio
+import random
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Optional, Dict, Any, Iterator
+
+from services.metrics import LLM_REQUESTS, LLM_RETRIES, record_llm_usage, record_stage
+
+logger = logging.getLogger(__name__)
+
+# Gemini model and generation parameters (also part of the result cache key)
+GEMINI_MODEL_NAME = 'gemini-2.0-flash-exp'
+GENERATION_CONFIG = {
+    'temperature': 0.1,  # Lower temperature for more consistent responses
+    'top_p': 0.8,
+    'top_k': 40,
+    'max_output_tokens': 1000,
+}
+
+
+class LLMError(Exception):
+    """Raised when the language model request fails"""
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the model while the circuit breaker is open"""
+
+
+class GeminiBackend:
+    """Google Gemini backend holding one long-lived model object"""
+
+    name = 'gemini'
+
+    def __init__(self, model_name: str = GEMINI_MODEL_NAME,
+                 generation_config: Optional[Dict[str, Any]] = None):
+        # Imported and configured on first use; the SDK is slow to import
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(
+            model_name,
+            generation_config=genai.types.GenerationConfig(
+                **(generation_config or GENERATION_CONFIG))
+        )
+
+    @staticmethod
+    def _record_usage(response):
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            record_llm_usage(usage.prompt_token_count, usage.candidates_token_count)
+
+    def generate(self, prompt: str) -> str:
+        response = self.model.generate_content(prompt)
+        self._record_usage(response)
+        if not response.text:
+            raise LLMError("Empty response from AI model")
+        return response.text
+
+    async def agenerate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        self._record_usage(response)
+        if not response.text:
+            raise LLMError("Empty response from AI model")
+        return response.text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self.model.generate_content(prompt, stream=True)
+        for chunk in response:
+            # Chunks without text parts (e.g. safety metadata) are skipped
+            if chunk.parts:
+                yield chunk.text
+        # Usage is complete once the stream is exhausted
+        self._record_usage(response)
+
+
+class FakeBackend:
+    """In-process stand-in for load testing without calling Gemini
+
+    Responses follow the prompt's JSON format with a score derived from the
+    prompt, so identical prompts get identical answers.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency_seconds: float = 0.5, error_rate: float = 0.0,
+                 chunk_count: int = 8, seed: Optional[int] = None):
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.chunk_count = chunk_count
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _jittered(self, seconds: float) -> float:
+        with self._lock:
+            return seconds * self._random.uniform(0.8, 1.2)
+
+    def _sleep(self, seconds: float):
+        time.sleep(self._jittered(seconds))
+
+    def _response_for(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        return json.dumps({
+            "JD Match": f"{40 + digest[0] % 56}%",
+            "MissingKeywords": ["Kubernetes", "Terraform", "GraphQL"][:1 + digest[1] % 3],
+            "Profile Summary": "Synthetic analysis generated by the fake LLM backend for load testing."
+        }, indent=2)
+
+    def generate(self, prompt: str) -> str:
+        self._sleep(self.latency_seconds)
+        if self._should_fail():
+            raise LLMError("Fake backend injected failure")
+        return self._response_for(prompt)
+
+    async def agenerate(self, prompt: str) -> str:
+        await asyncio.sleep(self._jittered(self.latency_seconds))
+        if self._should_fail():
+            raise LLMError("Fake backend injected failure")
+        return self._response_for(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        text = self._response_for(prompt)
+        size = max(1, len(text) // self.chunk_count)
+        for index, start in enumerate(range(0, len(text), size)):
+            self._sleep(self.latency_seconds / self.chunk_count)
+            if index == 0 and self._should_fail():
+                raise LLMError("Fake backend injected failure")
+            yield text[start:start + size]
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding time window
+
+    The circuit opens when at least ``min_calls`` calls in the last
+    ``window_seconds`` failed at ``failure_rate`` or more. After
+    ``open_seconds`` a single probe call is let through (half-open); its
+    outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 10,
+                 window_seconds: float = 60, open_seconds: float = 30):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self.state = self.CLOSED
+        self._outcomes = deque()
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go to the backend"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            # Half-open: allow one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def is_open(self) -> bool:
+        """Check whether calls are currently being rejected"""
+        with self._lock:
+            return (self.state == self.OPEN
+                    and time.monotonic() - self._opened_at < self.open_seconds)
+
+    def record_success(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                logger.info("LLM circuit breaker closed after successful probe")
+                self.state = self.CLOSED
+                self._outcomes.clear()
+                self._probe_in_flight = False
+                return
+            self._record(True)
+
+    def release_probe(self):
+        """End a call that finished without an outcome (abandoned by its caller)
+
+        A half-open probe is released so the next call can probe instead.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._open()
+                return
+            self._record(False)
+
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (self.state == self.CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def _record(self, ok: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self):
+        logger.warning(
+            f"LLM circuit breaker opened for {self.open_seconds}s")
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": self.state,
+                "recentCalls": len(self._outcomes),
+                "recentFailures": failures
+            }
+
+
+class LLMClient:
+    """Language model client shared by all requests in a process
+
+    Caps in-flight calls with a semaphore, retries failures with exponential
+    backoff and full jitter, and fails fast while the circuit breaker is open.
+    Calls made with ``agenerate`` from an event loop hold no thread while
+    waiting, so they are capped separately by ``async_max_concurrency``.
+    """
+
+    def __init__(self, backend, max_concurrency: int = 8, acquire_timeout: float = 30,
+                 max_retries: int = 2, backoff_base_seconds: float = 0.5,
+                 backoff_max_seconds: float = 8, breaker: Optional[CircuitBreaker] = None,
+                 async_max_concurrency: int = 256):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.async_max_concurrency = async_max_concurrency
+        self.acquire_timeout = acquire_timeout
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.breaker = breaker or CircuitBreaker()
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots = asyncio.BoundedSemaphore(async_max_concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        """Delay before retry ``attempt`` (0-based) using full jitter"""
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _backoff(self, attempt: int):
+        time.sleep(self._backoff_seconds(attempt))
+
+    def _acquire(self):
+        # Fail fast without queueing for a slot while the circuit is open
+        if self.breaker.is_open():
+            LLM_REQUESTS.labels('circuit_open').inc()
+            raise CircuitOpenError("AI service circuit breaker is open")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            LLM_REQUESTS.labels('busy').inc()
+            raise LLMError("Too many concurrent AI requests")
+        if not self.breaker.allow_request():
+            self._slots.release()
+            LLM_REQUESTS.labels('circuit_open').inc()
+            raise CircuitOpenError("AI service circuit breaker is open")
+        with self._lock:
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def _acquire_async(self):
+        if self.breaker.is_open():
+            LLM_REQUESTS.labels('circuit_open').inc()
+            raise CircuitOpenError("AI service circuit breaker is open")
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            LLM_REQUESTS.labels('busy').inc()
+            raise LLMError("Too many concurrent AI requests")
+        if not self.breaker.allow_request():
+            self._async_slots.release()
+            LLM_REQUESTS.labels('circuit_open').inc()
+            raise CircuitOpenError("AI service circuit breaker is open")
+        with self._lock:
+            self._in_flight += 1
+
+    def _release_async(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._async_slots.release()
+
+    def generate(self, prompt: str) -> str:
+        """Generate a complete response, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            started = time.perf_counter()
+            try:
+                text = self.backend.generate(prompt)
+                self.breaker.record_success()
+                LLM_REQUESTS.labels('success').inc()
+                return text
+            except Exception as e:
+                self.breaker.record_failure()
+                LLM_REQUESTS.labels('error').inc()
+                logger.warning(f"AI request attempt {attempt + 1} failed: {str(e)}")
+                if attempt == self.max_retries:
+                    raise LLMError(str(e))
+            finally:
+                record_stage('llm_attempt', time.perf_counter() - started)
+                self._release()
+            LLM_RETRIES.inc()
+            self._backoff(attempt)
+
+    async def agenerate(self, prompt: str) -> str:
+        """Generate a complete response from an event loop, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire_async()
+            started = time.perf_counter()
+            try:
+                text = await self.backend.agenerate(prompt)
+                self.breaker.record_success()
+                LLM_REQUESTS.labels('success').inc()
+                return text
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                LLM_REQUESTS.labels('error').inc()
+                logger.warning(f"AI request attempt {attempt + 1} failed: {str(e)}")
+                if attempt == self.max_retries:
+                    raise LLMError(str(e))
+            finally:
+                record_stage('llm_attempt', time.perf_counter() - started)
+                self._release_async()
+            LLM_RETRIES.inc()
+            await asyncio.sleep(self._backoff_seconds(attempt))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Stream a response, retrying only until the first chunk arrives"""
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            started = False
+            attempt_started = time.perf_counter()
+            try:
+                for chunk in self.backend.stream(prompt):
+                    started = True
+                    yield chunk
+                self.breaker.record_success()
+                LLM_REQUESTS.labels('success').inc()
+                return
+            except GeneratorExit:
+                # The consumer stopped reading (for example the client disconnected)
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                LLM_REQUESTS.labels('error').inc()
+                logger.warning(f"AI streaming attempt {attempt + 1} failed: {str(e)}")
+                if started or attempt == self.max_retries:
+                    raise LLMError(str(e))
+            finally:
+                record_stage('llm_attempt', time.perf_counter() - attempt_started)
+                self._release()
+            LLM_RETRIES.inc()
+            self._backoff(attempt)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend, concurrency and circuit breaker state"""
+        return {
+            "backend": self.backend.name,
+            "inFlight": self._in_flight,
+            "maxConcurrency": self.max_concurrency,
+            "asyncMaxConcurrency": self.async_max_concurrency,
+            "circuitBreaker": self.breaker.get_stats()
+        }
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def create_llm_client() -> LLMClient:
+    """Create the LLM client configured by the environment
+
+    LLM_BACKEND is ``gemini`` (default) or ``fake`` for load testing.
+    """
+    backend_name = os.getenv('LLM_BACKEND', 'gemini').lower()
+
+    if backend_name == 'fake':
+        backend = FakeBackend(
+            latency_seconds=float(os.getenv('FAKE_LLM_LATENCY_SECONDS', 0.5)),
+            error_rate=float(os.getenv('FAKE_LLM_ERROR_RATE', 0))
+        )
+    else:
+        backend = GeminiBackend(GEMINI_MODEL_NAME, GENERATION_CONFIG)
+
+    breaker = CircuitBreaker(
+        failure_rate=float(os.getenv('LLM_BREAKER_FAILURE_RATE', 0.5)),
+        min_calls=int(os.getenv('LLM_BREAKER_MIN_CALLS', 10)),
+        window_seconds=float(os.getenv('LLM_BREAKER_WINDOW_SECONDS', 60)),
+        open_seconds=float(os.getenv('LLM_BREAKER_OPEN_SECONDS', 30))
+    )
+
+    logger.info(f"LLM client using {backend.name} backend")
+    return LLMClient(
+        backend,
+        max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 8)),
+        acquire_timeout=float(os.getenv('LLM_ACQUIRE_TIMEOUT_SECONDS', 30)),
+        max_retries=int(os.getenv('LLM_MAX_RETRIES', 2)),
+        backoff_base_seconds=float(os.getenv('LLM_BACKOFF_BASE_SECONDS', 0.5)),
+        backoff_max_seconds=float(os.getenv('LLM_BACKOFF_MAX_SECONDS', 8)),
+        breaker=breaker,
+        async_max_concurrency=int(os.getenv('LLM_ASYNC_MAX_CONCURRENCY', 256))
+    )
+
+
+def get_llm_client() -> LLMClient:
+    """Get the process-wide LLM client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_llm_client()
+    return _client
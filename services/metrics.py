@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+from flask import g, has_request_context, request, Response
+from prometheus_client import (
+    Counter, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+)
+from pymongo import monitoring
+
+from services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers fast Mongo reads through slow AI model calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    'smart_ats_stage_seconds',
+    'Time spent in each stage of the analysis pipeline',
+    ['stage'], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'smart_ats_http_request_seconds',
+    'HTTP request duration until the response is returned by the view',
+    ['method', 'endpoint', 'status'], buckets=LATENCY_BUCKETS
+)
+LLM_REQUESTS = Counter(
+    'smart_ats_llm_requests_total',
+    'AI model attempts by outcome (success, error, circuit_open, busy)',
+    ['outcome']
+)
+LLM_RETRIES = Counter('smart_ats_llm_retries_total', 'AI model attempts retried after a failure')
+LLM_TOKENS = Counter(
+    'smart_ats_llm_tokens_total',
+    'AI model tokens reported by the model, by direction (prompt, output)',
+    ['direction']
+)
+LLM_BYTES = Counter('smart_ats_llm_bytes_total', 'AI model prompt and response sizes in bytes', ['direction'])
+ANALYSIS_FALLBACKS = Counter(
+    'smart_ats_analysis_fallbacks_total',
+    'Analyses answered with a fallback response instead of an AI result',
+    ['reason']
+)
+PARSE_FAILURES = Counter(
+    'smart_ats_parse_failures_total',
+    'AI responses that needed repair or could not be parsed',
+    ['kind']
+)
+EXTRACTION_CACHE_LOOKUPS = Counter(
+    'smart_ats_extraction_cache_lookups_total',
+    'Extracted-text cache lookups by result (memory_hit, persistent_hit, miss)',
+    ['result']
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    'smart_ats_mongo_command_seconds',
+    'MongoDB command duration as reported by the driver',
+    ['command', 'collection', 'outcome'], buckets=LATENCY_BUCKETS
+)
+
+
+# Stage durations of the current request outside Flask (the ASGI entry point)
+_server_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('server_timings', default=None)
+
+
+def _request_timings() -> Optional[Dict[str, float]]:
+    """Stage durations collected for the current request, if any"""
+    if has_request_context():
+        return g.setdefault('server_timings', {})
+    return _server_timings.get()
+
+
+@contextmanager
+def collect_server_timings():
+    """Collect stage durations for a request served outside Flask"""
+    timings: Dict[str, float] = {}
+    previous = _server_timings.get()
+    _server_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _server_timings.set(previous)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage into the stage histogram, the request's Server-Timing header and its trace"""
+    started = time.perf_counter()
+    try:
+        with span(name) as active:
+            yield active
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def record_stage(name: str, seconds: float):
+    """Record a stage duration measured elsewhere"""
+    STAGE_SECONDS.labels(name).observe(seconds)
+    timings = _request_timings()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def record_llm_usage(prompt_tokens: Optional[int] = None, output_tokens: Optional[int] = None):
+    """Record token counts reported by the AI model"""
+    if prompt_tokens:
+        LLM_TOKENS.labels('prompt').inc(prompt_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels('output').inc(output_tokens)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """PyMongo command listener feeding the Mongo command histogram
+
+    The collection is taken from the started event, since the succeeded
+    and failed events do not carry the command document.
+    """
+
+    def __init__(self):
+        self._collections: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else '')
+
+    def _finished(self, event, outcome: str):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), '')
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection, outcome).observe(seconds)
+        timings = _request_timings()
+        if timings is not None:
+            timings['mongo'] = timings.get('mongo', 0.0) + seconds
+
+    def succeeded(self, event):
+        self._finished(event, 'success')
+
+    def failed(self, event):
+        self._finished(event, 'failure')
+
+
+def server_timing_header(timings: Dict[str, float], total_seconds: float) -> str:
+    """Format stage durations as a Server-Timing header value"""
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ', '.join(entries)
+
+
+def init_app(app):
+    """Time every request and add a Server-Timing header with its stages"""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.labels(request.method, endpoint, str(response.status_code)).observe(elapsed)
+        # Streamed responses send headers before their stages run
+        if not response.is_streamed:
+            response.headers['Server-Timing'] = server_timing_header(g.get('server_timings', {}), elapsed)
+        return response
+
+
+def metrics_response() -> Response:
+    """Render all metrics in the Prometheus text format
+
+    With PROMETHEUS_MULTIPROC_DIR set (as under gunicorn), metrics from all
+    worker processes are aggregated.
+    """
+    registry = REGISTRY
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,92 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already queued"""
+
+
+class PasswordHasher:
+    """Bounded pool for bcrypt hashing and verification
+
+    bcrypt releases the GIL while hashing, so a small thread pool runs hashes
+    in parallel without the cost of shipping passwords to worker processes.
+    The pool caps how many CPU-bound hashes a process runs at once, and at
+    most ``max_pending`` hashes may be running or waiting; beyond that callers
+    get PasswordHasherBusy instead of piling up behind a login spike.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_pending: int = 64,
+                 timeout_seconds: float = 10):
+        self.rounds = rounds
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout_seconds):
+            raise PasswordHasherBusy("Too many password hashes in progress")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the hash itself finishes, even if the caller gives up waiting
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            # Frees the slot right away if the hash has not started yet
+            future.cancel()
+            raise PasswordHasherBusy("Password hashing timed out")
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured cost factor"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against its hash"""
+        try:
+            return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # Malformed stored hash
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether a hash was made with a different cost factor than configured"""
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher"""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    rounds=int(os.getenv('BCRYPT_ROUNDS', 12)),
+                    max_workers=int(os.getenv('BCRYPT_MAX_WORKERS', min(4, os.cpu_count() or 1))),
+                    max_pending=int(os.getenv('BCRYPT_MAX_PENDING', 64)),
+                    timeout_seconds=float(os.getenv('BCRYPT_TIMEOUT_SECONDS', 10))
+                )
+                logger.info(f"Password hasher using bcrypt cost {_hasher.rounds}")
+    return _hasher
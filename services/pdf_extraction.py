@@ -0,0 +1,353 @@
+import io
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+
+import PyPDF2 as pdf
+
+from services.cache import get_extraction_cache
+
+logger = logging.getLogger(__name__)
+
+# Pages are joined with a form feed so later stages can tell page boundaries apart
+PAGE_SEPARATOR = '\f'
+
+# Extractions waiting to be written to the cache before new ones are skipped
+MAX_PENDING_CACHE_WRITES = 256
+
+
+def normalize_page_text(text: str) -> str:
+    """Normalize a page's extracted text: NFC, no NUL characters, no trailing spaces"""
+    text = unicodedata.normalize('NFC', text).replace('\x00', '')
+    return '\n'.join(line.rstrip() for line in text.split('\n'))
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be extracted"""
+
+
+class PDFExtractionTimeout(PDFExtractionError):
+    """Raised when extracting a PDF exceeds its time budget"""
+
+
+def _limit_cpu_time(cpu_seconds: float):
+    """Let the kernel kill this worker if the current task burns too much CPU
+
+    The soft RLIMIT_CPU is set relative to the CPU time this process has
+    already used. SIGXCPU is left at its default action (terminate), so a
+    parse stuck inside C code is killed too; the pool replaces the worker.
+    """
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = usage.ru_utime + usage.ru_stime
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(math.ceil(used + cpu_seconds))
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+        return hard
+    except (ImportError, ValueError, OSError):
+        return None
+
+
+def _reset_cpu_limit(hard):
+    """Lift the per-task CPU limit set by _limit_cpu_time"""
+    if hard is None:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _init_worker():
+    """Initialize an extraction worker process"""
+    # Ctrl+C is handled by the parent process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGXCPU, signal.SIG_DFL)
+
+
+def _extract_page_range(data: bytes, start: int, stop: int, max_pages: int,
+                        cpu_seconds: float) -> Tuple[int, List[str], float]:
+    """Extract pages [start, stop) of a PDF inside a worker process
+
+    Returns the document's page count, the extracted page texts and the CPU
+    time spent.
+    """
+    hard_limit = _limit_cpu_time(cpu_seconds)
+    cpu_started = time.process_time()
+    try:
+        reader = pdf.PdfReader(io.BytesIO(data))
+        page_count = len(reader.pages)
+        stop = min(stop, page_count, max_pages)
+        texts = [str(reader.pages[i].extract_text()) for i in range(start, stop)]
+        return page_count, texts, time.process_time() - cpu_started
+    finally:
+        _reset_cpu_limit(hard_limit)
+
+
+class _Extraction:
+    """Bookkeeping for one in-flight document"""
+
+    def __init__(self, data: bytes, deadline: float, cache_key: Optional[str] = None):
+        self.data = data
+        self.deadline = deadline
+        self.cache_key = cache_key
+        self.future: Future = Future()
+        self.started = time.perf_counter()
+        self.pages: Dict[int, str] = {}
+        self.page_count = 0
+        self.pages_to_extract = 0
+        self.cpu_seconds = 0.0
+        self.tasks = 0
+        self.lock = threading.Lock()
+
+
+class PDFExtractionEngine:
+    """Process-pool PDF text extraction with page-level parallelism
+
+    The first task of each document extracts the first ``pages_per_task``
+    pages and reports the page count; the remaining pages are fanned out
+    across the pool. Each task runs under a CPU time limit and each document
+    under a wall-clock deadline, and at most ``max_pages`` pages are read.
+
+    With an extraction cache, a PDF whose bytes were extracted before is
+    served from the cache without parsing, and concurrent submissions of
+    the same PDF share one extraction.
+    """
+
+    def __init__(self, processes: int = 2, timeout_seconds: float = 10.0,
+                 cpu_seconds_per_task: float = 5.0, max_pages: int = 30,
+                 pages_per_task: int = 4, cache=None):
+        self.processes = processes
+        self.timeout_seconds = timeout_seconds
+        self.cpu_seconds_per_task = cpu_seconds_per_task
+        self.max_pages = max_pages
+        self.pages_per_task = pages_per_task
+        self.cache = cache
+
+        # Cache writes may go to MongoDB or disk, so they run on their own
+        # thread rather than on the pool's result handler thread
+        self._cache_writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='pdf-extraction-cache') if cache else None
+        self._cache_write_slots = threading.BoundedSemaphore(MAX_PENDING_CACHE_WRITES)
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[int, _Extraction] = {}
+        self._in_flight_by_key: Dict[str, _Extraction] = {}
+        self._watchdog: Optional[threading.Thread] = None
+
+    def _get_pool(self):
+        """Start the worker processes on first use"""
+        with self._lock:
+            if self._pool is None:
+                # Workers are not forked from this process directly: it runs threads
+                # (request handlers, the watchdog, PyMongo monitors), and a forked
+                # child could inherit a lock held by one of them and deadlock.
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    context.set_forkserver_preload(['services.pdf_extraction'])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._pool = context.Pool(self.processes, initializer=_init_worker)
+                logger.info(f"PDF extraction engine started with {self.processes} processes")
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(
+                    target=self._watch_deadlines, name='pdf-extraction-watchdog', daemon=True)
+                self._watchdog.start()
+            return self._pool
+
+    def submit(self, data: bytes) -> Future:
+        """Start extracting a PDF and return a future for its result"""
+        cache_key = None
+        if self.cache:
+            started = time.perf_counter()
+            cache_key = self.cache.make_key(data, self.max_pages)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                future: Future = Future()
+                future.set_result({
+                    **cached,
+                    "tasks": 0,
+                    "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+                    "cpuMs": 0.0,
+                    "cached": True
+                })
+                return future
+
+        pool = self._get_pool()
+        extraction = _Extraction(data, time.monotonic() + self.timeout_seconds, cache_key)
+
+        with self._lock:
+            # The same PDF is already being extracted; share its result
+            if cache_key and cache_key in self._in_flight_by_key:
+                return self._in_flight_by_key[cache_key].future
+            self._in_flight[id(extraction)] = extraction
+            if cache_key:
+                self._in_flight_by_key[cache_key] = extraction
+
+        self._dispatch(pool, extraction, 0, first=True)
+        return extraction.future
+
+    def extract(self, data: bytes) -> Dict[str, Any]:
+        """Extract a PDF and wait for the result"""
+        return self.submit(data).result()
+
+    def _dispatch(self, pool, extraction: _Extraction, start: int, first: bool = False):
+        """Queue extraction of one page range"""
+        stop = start + self.pages_per_task
+        with extraction.lock:
+            extraction.tasks += 1
+
+        pool.apply_async(
+            _extract_page_range,
+            (extraction.data, start, stop, self.max_pages, self.cpu_seconds_per_task),
+            callback=lambda result: self._on_pages(pool, extraction, start, result, first),
+            error_callback=lambda error: self._fail(extraction, PDFExtractionError(str(error)))
+        )
+
+    def _on_pages(self, pool, extraction: _Extraction, start: int, result, first: bool):
+        """Record extracted pages, fanning out the rest after the first range"""
+        page_count, texts, cpu_seconds = result
+        if extraction.future.done():
+            return
+
+        with extraction.lock:
+            extraction.cpu_seconds += cpu_seconds
+            for offset, text in enumerate(texts):
+                extraction.pages[start + offset] = text
+            if first:
+                extraction.page_count = page_count
+                extraction.pages_to_extract = min(page_count, self.max_pages)
+            complete = len(extraction.pages) >= extraction.pages_to_extract
+
+        if first:
+            for range_start in range(self.pages_per_task, extraction.pages_to_extract, self.pages_per_task):
+                self._dispatch(pool, extraction, range_start)
+
+        if complete:
+            self._finish(extraction)
+
+    def _finish(self, extraction: _Extraction):
+        """Join pages in order and resolve the document's future"""
+        self._forget(extraction)
+        pages = extraction.pages
+        text = PAGE_SEPARATOR.join(
+            normalize_page_text(pages[i]) for i in range(extraction.pages_to_extract))
+
+        cacheable = {
+            "text": text,
+            "pageCount": extraction.page_count,
+            "pagesExtracted": extraction.pages_to_extract,
+            "truncated": extraction.page_count > extraction.pages_to_extract,
+        }
+        result = {
+            **cacheable,
+            "tasks": extraction.tasks,
+            "elapsedMs": round((time.perf_counter() - extraction.started) * 1000, 2),
+            "cpuMs": round(extraction.cpu_seconds * 1000, 2),
+            "cached": False
+        }
+
+        try:
+            extraction.future.set_result(result)
+        except InvalidStateError:
+            # Already failed by the deadline watchdog
+            return
+
+        if extraction.cache_key:
+            self._store_in_cache(extraction.cache_key, cacheable)
+
+    def _store_in_cache(self, cache_key: str, value: Dict[str, Any]):
+        """Queue a cache write, skipping it if too many are already waiting"""
+        if not self._cache_write_slots.acquire(blocking=False):
+            logger.warning("Extraction cache writes are backed up; not caching this document")
+            return
+
+        def write():
+            try:
+                self.cache.set(cache_key, value)
+            except Exception as e:
+                logger.warning(f"Failed to cache extracted text: {str(e)}")
+            finally:
+                self._cache_write_slots.release()
+
+        try:
+            self._cache_writer.submit(write)
+        except RuntimeError:
+            # The engine is shutting down
+            self._cache_write_slots.release()
+
+    def _fail(self, extraction: _Extraction, error: Exception):
+        """Resolve the document's future with an error"""
+        self._forget(extraction)
+        try:
+            extraction.future.set_exception(error)
+        except InvalidStateError:
+            pass
+
+    def _forget(self, extraction: _Extraction):
+        with self._lock:
+            self._in_flight.pop(id(extraction), None)
+            if extraction.cache_key and self._in_flight_by_key.get(extraction.cache_key) is extraction:
+                del self._in_flight_by_key[extraction.cache_key]
+        # Release the PDF bytes as soon as the document is done
+        extraction.data = b''
+
+    def _watch_deadlines(self):
+        """Fail documents whose tasks did not finish in time
+
+        A worker killed by its CPU limit never reports back, so its document
+        is resolved here when the deadline passes.
+        """
+        while True:
+            time.sleep(0.25)
+            now = time.monotonic()
+            with self._lock:
+                overdue = [e for e in self._in_flight.values() if e.deadline <= now]
+            for extraction in overdue:
+                logger.warning(
+                    f"PDF extraction exceeded {self.timeout_seconds}s and was abandoned")
+                self._fail(extraction, PDFExtractionTimeout(
+                    f"PDF extraction timed out after {self.timeout_seconds} seconds"))
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.terminate()
+            pool.join()
+        if self._cache_writer:
+            self._cache_writer.shutdown(wait=True)
+
+
+_engine: Optional[PDFExtractionEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_extraction_engine() -> PDFExtractionEngine:
+    """Get the process-wide PDF extraction engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = PDFExtractionEngine(
+                    processes=int(os.getenv('PDF_EXTRACTION_PROCESSES', os.cpu_count() or 2)),
+                    timeout_seconds=float(os.getenv('PDF_EXTRACTION_TIMEOUT_SECONDS', 10)),
+                    cpu_seconds_per_task=float(os.getenv('PDF_EXTRACTION_CPU_SECONDS', 5)),
+                    max_pages=int(os.getenv('PDF_EXTRACTION_MAX_PAGES', 30)),
+                    pages_per_task=int(os.getenv('PDF_EXTRACTION_PAGES_PER_TASK', 4)),
+                    cache=get_extraction_cache()
+                )
+    return _engine
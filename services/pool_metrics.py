@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+
+from pymongo import monitoring
+
+
+class ConnectionPoolMetrics(monitoring.ConnectionPoolListener):
+    """PyMongo connection pool listener tracking utilization and checkout latency
+
+    Checkout latency is the time from asking the pool for a connection to
+    getting one, so it includes any time spent waiting for a free connection
+    when the pool is exhausted. A thread checks out one connection at a time,
+    so the start of each checkout is tracked per thread.
+    """
+
+    # Number of recent checkouts kept for latency percentiles
+    SAMPLE_SIZE = 2048
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._samples = deque(maxlen=self.SAMPLE_SIZE)
+        self.pools = 0
+        self.open_connections = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def _checkout_finished(self) -> float:
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        self.waiting -= 1
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            wait_ms = self._checkout_finished()
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._samples.append(wait_ms)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._checkout_finished()
+            reason = str(event.reason)
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current pool utilization and checkout latency over recent checkouts"""
+        with self._lock:
+            samples = sorted(self._samples)
+
+            def percentile(fraction):
+                return round(samples[min(len(samples) - 1, int(len(samples) * fraction))], 3) if samples else 0
+
+            return {
+                "pools": self.pools,
+                "openConnections": self.open_connections,
+                "checkedOut": self.checked_out,
+                "maxCheckedOut": self.max_checked_out,
+                "waiting": self.waiting,
+                "maxWaiting": self.max_waiting,
+                "checkouts": self.checkouts,
+                "checkoutFailures": dict(self.checkout_failures),
+                "checkoutLatencyMs": {
+                    "mean": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0,
+                    "p50": percentile(0.5),
+                    "p95": percentile(0.95),
+                    "p99": percentile(0.99),
+                    "max": round(self.max_wait_ms, 3)
+                }
+            }
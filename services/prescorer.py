@@ -0,0 +1,176 @@
+import os
+import re
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tokens keep characters used in skill names such as c++, c#, node.js and ci/cd
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./\-]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+etc few for from further had has have having he her here hers herself him himself his
+how i if in into is it its itself just me more most my myself no nor not now of off on
+once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too
+under until up very via was we were what when where which while who whom why will with
+within would you your yours yourself yourselves
+""".split())
+
+# Words common to nearly every job description; they count for little
+GENERIC_TERMS = frozenset("""
+ability able across apply candidate candidates company environment excellent experience
+experienced familiarity good great ideal including knowledge least looking must new
+opportunity plus position preferred proven required requirements responsibilities role
+skills strong team teams understanding using work working world year years
+""".split())
+
+# Skills and technologies weighted above ordinary vocabulary
+SKILL_TERMS = frozenset("""
+agile airflow android angular ansible api aws azure bash bigquery c c# c++ cassandra
+ci/cd css dart databricks django docker dynamodb elasticsearch etl excel fastapi figma
+flask flutter gcp git github go golang graphql hadoop html ios java javascript jenkins
+jira kafka keras kotlin kubernetes linux looker matlab microservices mongodb mysql nestjs
+next.js nlp node.js nosql numpy pandas php postgresql powerbi python pytorch rabbitmq
+react redis rest ruby rust sass scala scikit-learn scrum selenium snowflake spark sql
+swift tableau tensorflow terraform typescript vue.js
+""".split())
+
+# Multi-word skills, matched on adjacent tokens
+SKILL_PHRASES = frozenset([
+    'machine learning', 'deep learning', 'data science', 'data analysis',
+    'data engineering', 'data visualization', 'computer vision',
+    'natural language', 'unit testing', 'test automation', 'system design',
+    'distributed systems', 'cloud computing', 'project management',
+    'product management', 'power bi', 'google cloud', 'spring boot',
+    'ruby on rails', 'react native', 'version control', 'continuous integration',
+])
+
+SKILL_WEIGHT = 3.0
+GENERIC_WEIGHT = 0.3
+
+# BM25 parameters; AVERAGE_RESUME_TOKENS stands in for a corpus average length
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVERAGE_RESUME_TOKENS = 450
+
+MAX_MISSING_KEYWORDS = 8
+
+
+def _normalize_token(token: str) -> str:
+    """Fold simple plurals of dictionary skills (``apis`` -> ``api``)"""
+    if token.endswith('s') and token[:-1] in SKILL_TERMS:
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase tokens without stopwords"""
+    tokens = TOKEN_PATTERN.findall((text or '').lower())
+    return [_normalize_token(token) for token in tokens if token not in STOPWORDS]
+
+
+def extract_terms(text: str) -> List[str]:
+    """Tokenize text and add skill phrases found on adjacent tokens"""
+    tokens = tokenize(text)
+    phrases = [
+        f"{first} {second}" for first, second in zip(tokens, tokens[1:])
+        if f"{first} {second}" in SKILL_PHRASES
+    ]
+    return tokens + phrases
+
+
+def _term_weights(terms: np.ndarray) -> np.ndarray:
+    """Dictionary-based term weights used in place of corpus IDF"""
+    is_skill = np.fromiter(
+        (term in SKILL_TERMS or term in SKILL_PHRASES for term in terms), dtype=bool, count=len(terms))
+    is_generic = np.fromiter(
+        (term in GENERIC_TERMS or term.isdigit() for term in terms), dtype=bool, count=len(terms))
+    return np.where(is_skill, SKILL_WEIGHT, np.where(is_generic, GENERIC_WEIGHT, 1.0))
+
+
+def prescore(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """Score how well a resume covers the job description's vocabulary
+
+    Each job description term is weighted by its sublinear frequency and the
+    skill dictionary, and credited by a length-normalized BM25 saturation of
+    its frequency in the resume. Returns the weighted coverage as a
+    percentage plus the highest-weighted terms the resume lacks.
+    """
+    jd_terms = extract_terms(job_description)
+    resume_terms = extract_terms(resume_text)
+
+    if not jd_terms:
+        return {"score": 0, "matchedTerms": 0, "totalTerms": 0, "missingKeywords": []}
+
+    jd_vocab, jd_counts = np.unique(np.array(jd_terms), return_counts=True)
+
+    if resume_terms:
+        resume_vocab, resume_counts = np.unique(
+            np.array(resume_terms), return_counts=True)
+        positions = np.clip(np.searchsorted(resume_vocab, jd_vocab), 0, len(resume_vocab) - 1)
+        present = resume_vocab[positions] == jd_vocab
+        resume_tf = np.where(present, resume_counts[positions], 0)
+    else:
+        resume_tf = np.zeros(len(jd_vocab), dtype=np.int64)
+
+    term_weights = _term_weights(jd_vocab)
+    weights = (1.0 + np.log(jd_counts)) * term_weights
+
+    length_norm = 1 - BM25_B + BM25_B * (len(resume_terms) / AVERAGE_RESUME_TOKENS)
+    saturation = resume_tf * (BM25_K1 + 1) / (resume_tf + BM25_K1 * length_norm)
+    credit = np.minimum(saturation, 1.0)
+
+    score = float(np.dot(weights, credit) / weights.sum()) * 100
+
+    # Missing terms, most important first; generic words are never suggested
+    missing = (resume_tf == 0) & (term_weights > GENERIC_WEIGHT)
+    missing_order = np.argsort(-weights[missing], kind='stable')
+    missing_keywords = jd_vocab[missing][missing_order][:MAX_MISSING_KEYWORDS].tolist()
+
+    return {
+        "score": int(round(score)),
+        "matchedTerms": int(np.count_nonzero(resume_tf)),
+        "totalTerms": int(len(jd_vocab)),
+        "missingKeywords": missing_keywords
+    }
+
+
+def get_prescore_threshold() -> int:
+    """Scores below this percentage skip the AI model (0 disables short-circuiting)"""
+    return int(os.getenv('PRESCORE_THRESHOLD', 0))
+
+
+def local_analysis(resume_text: str, job_description: str,
+                   threshold: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Return a local-only analysis when the resume is clearly mismatched
+
+    The result has the same shape as parse_ai_response. Returns None when the
+    resume should go to the AI model.
+    """
+    threshold = get_prescore_threshold() if threshold is None else threshold
+    if threshold <= 0:
+        return None
+
+    result = prescore(resume_text, job_description)
+    logger.info(
+        f"Local pre-score {result['score']}% "
+        f"({result['matchedTerms']}/{result['totalTerms']} job description terms)")
+
+    if result['score'] >= threshold:
+        return None
+
+    return {
+        'jd_match': f"{result['score']}%",
+        'missing_keywords': result['missingKeywords'],
+        'profile_summary': (
+            f"The resume shares little vocabulary with the job description: it covers "
+            f"{result['matchedTerms']} of {result['totalTerms']} key terms. "
+            f"Detailed AI analysis was skipped because the local match score is below "
+            f"{threshold}%. Consider adding the missing keywords where they reflect real experience."
+        )
+    }
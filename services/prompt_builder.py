@@ -0,0 +1,179 @@
+import os
+import re
+import math
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+from services.pdf_extraction import PAGE_SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+# Rough Gemini tokenizer ratio for English text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Lines checked at the top and bottom of each page for repeated headers/footers
+HEADER_FOOTER_LINES = 3
+
+# Share of the budget the job description may use when both inputs are too long
+JOB_DESCRIPTION_BUDGET_SHARE = 0.4
+
+TRIM_MARKER = '[...]'
+
+_SPACE_PATTERN = re.compile(r'[ \t\f\v\u00a0\u2000-\u200b\u3000]+')
+_DIGITS_PATTERN = re.compile(r'\d+')
+# "3", "- 3 -", "Page 3", "Page 3 of 5", "3 / 5"
+_PAGE_NUMBER_PATTERN = re.compile(
+    r'^(?:page|pg\.?|p\.)?\s*[-\u2013\u2014]?\s*\d{1,3}\s*(?:(?:/|of)\s*\d{1,3})?\s*[-\u2013\u2014]?$')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of model tokens in text"""
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def _normalize_lines(text: str) -> List[str]:
+    """Collapse runs of spaces within lines and strip each line"""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return [_SPACE_PATTERN.sub(' ', line).strip() for line in text.split('\n')]
+
+
+def _line_signature(line: str) -> str:
+    """Compare lines ignoring case, and page numbers ignoring the number
+
+    Only page-number lines have their digits folded; other lines, such as
+    dates at the end of one page and the start of the next, must match exactly.
+    """
+    line = line.lower()
+    if _PAGE_NUMBER_PATTERN.match(line):
+        return _DIGITS_PATTERN.sub('#', line)
+    return line
+
+
+def strip_page_headers(text: str) -> str:
+    """Remove lines repeated at the top or bottom of most pages
+
+    The first page keeps its copy, so a name header still appears once.
+    """
+    pages = [[line for line in _normalize_lines(page) if line] for page in text.split(PAGE_SEPARATOR)]
+    if len(pages) < 2:
+        return '\n'.join(_normalize_lines(text))
+
+    edge_counts = Counter()
+    for lines in pages:
+        edges = lines[:HEADER_FOOTER_LINES] + lines[-HEADER_FOOTER_LINES:]
+        edge_counts.update({_line_signature(line) for line in edges})
+
+    min_pages = max(2, math.ceil(len(pages) / 2))
+    repeated = {signature for signature, count in edge_counts.items() if count >= min_pages}
+
+    kept_pages = ['\n'.join(pages[0])]
+    for lines in pages[1:]:
+        top = len(lines[:HEADER_FOOTER_LINES])
+        bottom_start = max(top, len(lines) - HEADER_FOOTER_LINES)
+        kept = [
+            line for index, line in enumerate(lines)
+            if not ((index < top or index >= bottom_start) and _line_signature(line) in repeated)
+        ]
+        kept_pages.append('\n'.join(kept))
+
+    return '\n\n'.join(kept_pages)
+
+
+def compress_text(text: str) -> str:
+    """Normalize whitespace and drop repeated page furniture and duplicate lines"""
+    text = strip_page_headers(text or '')
+
+    seen = set()
+    lines = []
+    for line in _normalize_lines(text):
+        if not line:
+            # Keep single blank lines as section breaks
+            if lines and lines[-1]:
+                lines.append('')
+            continue
+
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+
+    return '\n'.join(lines).strip()
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Shorten text to a token budget, keeping the start of every section
+
+    Sections are blocks separated by blank lines. Each keeps the same share
+    of its lines, so a long work history cannot crowd out the skills list.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ''
+
+    sections = [section.split('\n') for section in text.split('\n\n')]
+    ratio = max_tokens / estimate_tokens(text)
+
+    trimmed_sections = []
+    for lines in sections:
+        section_budget = estimate_tokens('\n'.join(lines)) * ratio
+        kept, used = [], 0
+        for line in lines:
+            cost = estimate_tokens(line + '\n')
+            if kept and used + cost > section_budget:
+                break
+            kept.append(line)
+            used += cost
+        if len(kept) < len(lines):
+            kept.append(TRIM_MARKER)
+        trimmed_sections.append('\n'.join(kept))
+
+    trimmed = '\n\n'.join(trimmed_sections)
+
+    # First lines of many short sections can still overshoot
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(trimmed) > max_chars:
+        trimmed = trimmed[:max_chars - len(TRIM_MARKER) - 1].rstrip() + '\n' + TRIM_MARKER
+
+    return trimmed
+
+
+def get_prompt_token_budget() -> int:
+    """Maximum estimated tokens for a complete analysis prompt"""
+    return int(os.getenv('PROMPT_TOKEN_BUDGET', 6000))
+
+
+def build_prompt(template: str, resume_text: str, job_description: str,
+                 token_budget: int = None) -> Tuple[str, Dict[str, Any]]:
+    """Fill the prompt template with compressed inputs that fit the budget
+
+    Returns the prompt and its estimated token counts before and after
+    compression.
+    """
+    token_budget = get_prompt_token_budget() if token_budget is None else token_budget
+
+    original_tokens = estimate_tokens(template.format(text=resume_text, jd=job_description))
+
+    resume = compress_text(resume_text)
+    jd = compress_text(job_description)
+
+    available = token_budget - estimate_tokens(template.format(text='', jd=''))
+    resume_tokens = estimate_tokens(resume)
+    jd_tokens = estimate_tokens(jd)
+
+    if resume_tokens + jd_tokens > available:
+        # The job description keeps up to its share; the resume gets the rest
+        jd_limit = max(min(jd_tokens, int(available * JOB_DESCRIPTION_BUDGET_SHARE)),
+                       available - resume_tokens)
+        jd = trim_to_tokens(jd, jd_limit)
+        resume = trim_to_tokens(resume, available - estimate_tokens(jd))
+
+    prompt = template.format(text=resume, jd=jd)
+    stats = {
+        'original': original_tokens,
+        'compressed': estimate_tokens(prompt),
+        'budget': token_budget
+    }
+    return prompt, stats
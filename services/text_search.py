@@ -0,0 +1,71 @@
+import re
+import html
+from typing import List, Set, Dict, Any
+
+# Words kept in skill names such as c++, c#, node.js
+WORD_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.]*[A-Za-z0-9+#]|[A-Za-z0-9]")
+
+# Suffixes removed before comparing words, longest first
+SUFFIXES = ('ations', 'ation', 'ings', 'ing', 'ers', 'er', 'ies', 'ied', 'es', 'ed', 'ly', 's')
+MIN_STEM_LENGTH = 3
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+
+def stem(word: str) -> str:
+    """Reduce a word to a rough stem so "developer" matches "developing"
+
+    A light suffix stripper; MongoDB's $text search uses its own stemmer, so
+    this only decides which words are highlighted.
+    """
+    word = word.lower()
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            if suffix in ('ies', 'ied'):
+                return word[:-len(suffix)] + 'y'
+            return word[:-len(suffix)]
+    return word
+
+
+def query_terms(query: str) -> Set[str]:
+    """Stems of the words a $text query searches for
+
+    Negated words (``-java``) are left out, matching $text semantics.
+    """
+    terms = set()
+    for token in query.split():
+        if token.startswith('-'):
+            continue
+        terms.update(stem(word) for word in WORD_PATTERN.findall(token))
+    return terms
+
+
+def highlight_text(text: str, terms: Set[str]) -> str:
+    """HTML-escape text and wrap words matching the query terms in <mark> tags"""
+    parts = []
+    position = 0
+    for match in WORD_PATTERN.finditer(text or ''):
+        if stem(match.group()) in terms:
+            parts.append(html.escape(text[position:match.start()]))
+            parts.append(HIGHLIGHT_START + html.escape(match.group()) + HIGHLIGHT_END)
+            position = match.end()
+    parts.append(html.escape((text or '')[position:]))
+    return ''.join(parts)
+
+
+def matching_keywords(keywords: List[str], terms: Set[str]) -> List[str]:
+    """Keywords containing at least one query term"""
+    return [
+        keyword for keyword in keywords or []
+        if any(stem(word) in terms for word in WORD_PATTERN.findall(keyword))
+    ]
+
+
+def build_highlights(review: Dict[str, Any], query: str) -> Dict[str, Any]:
+    """Highlight where a review matched a search query"""
+    terms = query_terms(query)
+    return {
+        "jobTitle": highlight_text(review.get('jobTitle', ''), terms),
+        "missingKeywords": matching_keywords(review.get('missingKeywords', []), terms)
+    }
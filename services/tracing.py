@@ -0,0 +1,437 @@
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Callable
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'smart-ats-api'
+
+# Spans kept per trace; later spans are counted but dropped
+MAX_SPANS_PER_TRACE = 2000
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+
+class _Trace:
+    """Spans of one trace, buffered until its local root span ends"""
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List['Span'] = []
+        self.dropped = 0
+        self.has_error = False
+        self._lock = threading.Lock()
+
+    def add(self, span: 'Span'):
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+            if span.status == STATUS_ERROR:
+                self.has_error = True
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    def __init__(self, name: str, trace: _Trace, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None,
+                 kind: int = KIND_INTERNAL):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.kind = kind
+        self.status = STATUS_OK
+        self.status_message = ''
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            self.trace.add(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: _Trace) -> Dict[str, Any]:
+    """Encode a trace as an OTLP/JSON ExportTraceServiceRequest"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "smart_ats.tracing"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                        "name": span.name,
+                        "kind": span.kind,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [
+                            {"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()
+                        ],
+                        "status": {"code": span.status, **({"message": span.status_message} if span.status_message else {})}
+                    }
+                    for span in trace.spans
+                ]
+            }]
+        }]
+    }
+
+
+class FileExporter:
+    """Appends each exported trace as one OTLP/JSON line to a file"""
+
+    name = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: _Trace):
+        line = json.dumps(to_otlp(trace), separators=(',', ':'))
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+    def shutdown(self):
+        pass
+
+
+class OTLPHttpExporter:
+    """Posts traces as OTLP/JSON to a collector from a background thread
+
+    Export never blocks requests: when the queue is full, traces are dropped.
+    """
+
+    name = 'otlp'
+
+    def __init__(self, endpoint: str, max_queue: int = 1000, timeout_seconds: float = 5):
+        self.url = endpoint.rstrip('/') + '/v1/traces'
+        self.timeout_seconds = timeout_seconds
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+        self._thread.start()
+
+    def export(self, trace: _Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                request = urllib.request.Request(
+                    self.url, data=json.dumps(to_otlp(trace)).encode('utf-8'),
+                    headers={'Content-Type': 'application/json'}, method='POST')
+                urllib.request.urlopen(request, timeout=self.timeout_seconds).close()
+            except Exception as e:
+                logger.warning(f"Trace export to {self.url} failed: {str(e)}")
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(self.timeout_seconds)
+
+
+class Tracer:
+    """Creates spans and exports finished traces that are sampled, slow or failed
+
+    The sampling decision for a new trace is made up front with
+    ``sample_rate``; unsampled traces are still exported when their root span
+    takes at least ``slow_ms`` or any span records an error, so tail latency
+    is always captured.
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 0.01, slow_ms: Optional[float] = None):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    def _new_trace(self, trace_id: Optional[str] = None, sampled: Optional[bool] = None) -> _Trace:
+        if sampled is None:
+            sampled = random.random() < self.sample_rate
+        return _Trace(trace_id or os.urandom(16).hex(), sampled)
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent: Optional[Span] = None, kind: int = KIND_INTERNAL) -> Span:
+        """Start a span under ``parent`` (default: the current span) or a new trace"""
+        parent = parent if parent is not None else _current_span.get()
+        trace = parent.trace if parent else self._new_trace()
+        return Span(name, trace, parent.span_id if parent else None, attributes, kind=kind)
+
+    def start_remote_child(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                           traceparent: Optional[str] = None) -> Span:
+        """Start a local root span, continuing the caller's W3C ``traceparent`` if valid
+
+        The caller's sampling flag is honoured.
+        """
+        parts = (traceparent or '').split('-')
+        try:
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                int(parts[1], 16), int(parts[2], 16)
+                trace = self._new_trace(parts[1], sampled=bool(int(parts[3], 16) & 1))
+                return Span(name, trace, parts[2], attributes, kind=KIND_SERVER)
+        except ValueError:
+            pass
+        return Span(name, self._new_trace(), None, attributes, kind=KIND_SERVER)
+
+    def finish_root(self, span: Span):
+        """End a local root span and export its trace if it qualifies"""
+        span.end()
+        trace = span.trace
+        slow = self.slow_ms is not None and span.duration_ms >= self.slow_ms
+        if self.exporter and (trace.sampled or slow or trace.has_error):
+            try:
+                self.exporter.export(trace)
+            except Exception as e:
+                logger.warning(f"Trace export failed: {str(e)}")
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def create_tracer() -> Tracer:
+    """Create the tracer configured by the environment
+
+    TRACE_EXPORTER is ``none`` (default; spans only label log lines),
+    ``file`` (TRACE_FILE) or ``otlp`` (OTLP_ENDPOINT).
+    """
+    exporter_name = os.getenv('TRACE_EXPORTER', 'none').lower()
+    if exporter_name == 'file':
+        exporter = FileExporter(os.getenv('TRACE_FILE', 'traces.jsonl'))
+    elif exporter_name == 'otlp':
+        exporter = OTLPHttpExporter(os.getenv('OTLP_ENDPOINT', 'http://localhost:4318'))
+    else:
+        exporter = None
+
+    slow_ms = os.getenv('TRACE_SLOW_MS', '2000')
+    tracer = Tracer(
+        exporter,
+        sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', 0.01)),
+        slow_ms=float(slow_ms) if slow_ms else None
+    )
+    if exporter:
+        logger.info(f"Tracing enabled with {exporter.name} exporter")
+    return tracer
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = create_tracer()
+    return _tracer
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Run a block in a child span of the current span
+
+    Does nothing outside a trace, so background work does not start traces
+    of its own.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = get_tracer().start_span(name, attributes, parent)
+    _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        _current_span.set(parent)
+        child.end()
+
+
+@contextmanager
+def use_span(active: Optional[Span]):
+    """Make ``active`` the current span in this thread for the duration of a block"""
+    previous = _current_span.get()
+    _current_span.set(active)
+    try:
+        yield
+    finally:
+        _current_span.set(previous)
+
+
+def bind(fn: Callable) -> Callable:
+    """Wrap ``fn`` to run under the current span when called from another thread"""
+    parent = _current_span.get()
+
+    def wrapper(*args, **kwargs):
+        with use_span(parent):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def traceparent_header(span: Span) -> str:
+    """W3C traceparent value identifying ``span`` to downstream callers"""
+    return f"00-{span.trace_id}-{span.span_id}-{'01' if span.trace.sampled else '00'}"
+
+
+class TraceIdFilter(logging.Filter):
+    """Adds the current trace ID to log records as ``trace_id``"""
+
+    def filter(self, record):
+        record.trace_id = current_trace_id() or '-'
+        return True
+
+
+def install_log_filter():
+    """Label every record handled by the root logger's handlers with its trace ID"""
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(existing, TraceIdFilter) for existing in handler.filters):
+            handler.addFilter(TraceIdFilter())
+
+
+class MongoTracingListener(monitoring.CommandListener):
+    """PyMongo command listener recording a span per command in the current trace"""
+
+    def __init__(self):
+        self._spans: Dict[Any, Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        collection = event.command.get(event.command_name)
+        child = get_tracer().start_span(f"mongo.{event.command_name}", {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": event.command_name,
+            "db.mongodb.collection": collection if isinstance(collection, str) else '',
+        }, parent, KIND_CLIENT)
+        with self._lock:
+            self._spans[(event.connection_id, event.request_id)] = child
+
+    def _finish(self, event, error: Optional[str] = None):
+        with self._lock:
+            child = self._spans.pop((event.connection_id, event.request_id), None)
+        if child is None:
+            return
+        if error:
+            child.status = STATUS_ERROR
+            child.status_message = error
+        child.end(child.start_ns + event.duration_micros * 1000)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get('errmsg', 'command failed')))
+
+
+def init_app(app):
+    """Trace every request with a root span and return its trace ID to the caller"""
+    from flask import g, request
+
+    @app.before_request
+    def start_request_span():
+        root = get_tracer().start_remote_child(
+            f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+            {
+                "http.method": request.method,
+                "http.route": request.url_rule.rule if request.url_rule else '',
+                # Without the query string, which may carry search terms or secrets
+                "http.target": request.path,
+            },
+            traceparent=request.headers.get('traceparent')
+        )
+        g.trace_root = root
+        g.trace_previous_span = _current_span.get()
+        _current_span.set(root)
+
+    @app.after_request
+    def add_trace_headers(response):
+        root = g.get('trace_root')
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                root.status = STATUS_ERROR
+            response.headers['traceparent'] = traceparent_header(root)
+        return response
+
+    @app.teardown_request
+    def finish_request_span(error):
+        # Streamed responses are torn down after the stream completes
+        root = g.pop('trace_root', None)
+        if root is None:
+            return
+        if error is not None:
+            root.record_error(error)
+        _current_span.set(g.pop('trace_previous_span', None))
+        get_tracer().finish_root(root)
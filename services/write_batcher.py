@@ -0,0 +1,225 @@
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, InvalidStateError
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Acknowledge a save once its batch is written (reviews survive a crash)
+DURABILITY_FLUSHED = 'flushed'
+# Acknowledge a save once it is queued; it is written within max_delay_seconds
+DURABILITY_QUEUED = 'queued'
+
+DURABILITY_MODES = (DURABILITY_FLUSHED, DURABILITY_QUEUED)
+
+
+class _PendingReview:
+    """A built review document waiting to be written"""
+
+    def __init__(self, review_doc: Dict[str, Any]):
+        self.review_doc = review_doc
+        self.future: Future = Future()
+        self.queued_at = time.monotonic()
+
+
+class ReviewWriteBatcher:
+    """Write-behind batcher for review inserts and user profile counters
+
+    Saves from all requests in the process are queued and written by one
+    background thread with a single ``insert_many`` per batch, followed by
+    one ``bulk_write`` of user profile updates. A batch is flushed when it
+    reaches ``max_batch_size`` reviews or its oldest review has waited
+    ``max_delay_seconds``. Review IDs are assigned before queueing, so a
+    saved review can be returned right away in ``queued`` durability mode.
+    """
+
+    def __init__(self, get_review_model: Callable, get_user_model: Callable,
+                 max_batch_size: int = 100, max_delay_seconds: float = 0.02,
+                 max_pending: int = 5000, durability: str = DURABILITY_FLUSHED,
+                 flush_timeout: float = 30):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+
+        self._get_review_model = get_review_model
+        self._get_user_model = get_user_model
+        self.max_batch_size = max_batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self.max_pending = max_pending
+        self.durability = durability
+        self.flush_timeout = flush_timeout
+
+        self._pending: List[_PendingReview] = []
+        self._writing = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self):
+        """Start the writer thread on first use"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='review-write-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, review_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Future]:
+        """Queue a review for writing
+
+        Returns the formatted review (with its final ID) and a future that
+        resolves once the review is written. Raises ValueError for invalid
+        review data.
+        """
+        review_model = self._get_review_model()
+        review_doc = review_model.new_review_document(review_data)
+        pending = _PendingReview(review_doc)
+
+        with self._condition:
+            self._ensure_started()
+            # Back-pressure: wait for the writer when too much is queued
+            while len(self._pending) >= self.max_pending and not self._stopping:
+                self._condition.wait()
+            self._pending.append(pending)
+            self._condition.notify_all()
+
+        return review_model.format_review(review_doc), pending.future
+
+    def save(self, review_data: Dict[str, Any], durability: Optional[str] = None) -> Dict[str, Any]:
+        """Save a review, returning it when the durability mode allows"""
+        review, future = self.submit(review_data)
+        if (durability or self.durability) == DURABILITY_FLUSHED:
+            future.result(timeout=self.flush_timeout)
+        return review
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until everything queued so far is written"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+    def _next_batch(self) -> List[_PendingReview]:
+        """Block until a batch is due, then take it from the queue"""
+        with self._condition:
+            while not self._pending and not self._stopping:
+                self._condition.wait()
+
+            while self._pending and len(self._pending) < self.max_batch_size and not self._stopping:
+                remaining = self._pending[0].queued_at + self.max_delay_seconds - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self._writing += len(batch)
+            self._condition.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._stopping:
+                    return
+                continue
+            try:
+                self._write(batch)
+            finally:
+                with self._condition:
+                    self._writing -= len(batch)
+                    self._condition.notify_all()
+
+    def _write(self, batch: List[_PendingReview]):
+        """Insert a batch of reviews and update their users' profile counters"""
+        review_model = self._get_review_model()
+        try:
+            failures = review_model.insert_documents([item.review_doc for item in batch])
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} reviews: {str(e)}")
+            for item in batch:
+                self._resolve(item.future, error=e)
+            return
+
+        scores = defaultdict(list)
+        inserted = []
+        for index, item in enumerate(batch):
+            if index in failures:
+                logger.warning(f"Failed to write review {item.review_doc['_id']}: {failures[index]}")
+                self._resolve(item.future, error=Exception(failures[index]))
+            else:
+                inserted.append(item.review_doc)
+                scores[item.review_doc['userId']].append(item.review_doc['matchScore'])
+
+        if not review_model.update_derived_stats(inserted):
+            # The reviews are saved; only the user stats and keyword rollups lag
+            logger.warning(f"Failed to update review statistics for {len(inserted)} reviews")
+
+        if scores and not self._get_user_model().update_user_stats_bulk(scores):
+            # The reviews are saved; only the denormalized profile counters lag
+            logger.warning(f"Failed to update profile stats for {len(scores)} users")
+
+        for index, item in enumerate(batch):
+            if index not in failures:
+                self._resolve(item.future, result=str(item.review_doc['_id']))
+
+        logger.debug(f"Wrote batch of {len(batch)} reviews")
+
+    @staticmethod
+    def _resolve(future: Future, result=None, error: Optional[Exception] = None):
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def stop(self, timeout: Optional[float] = None):
+        """Write everything queued and stop the writer thread"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+_batcher: Optional[ReviewWriteBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_review_write_batcher() -> ReviewWriteBatcher:
+    """Get the process-wide review write batcher"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                from config.database import get_database
+                from models.review import Review
+                from models.user import User
+
+                def review_model():
+                    db = get_database()
+                    return Review(db.get_reviews_collection(), db.get_user_stats_collection())
+
+                def user_model():
+                    return User(get_database().get_users_collection())
+
+                _batcher = ReviewWriteBatcher(
+                    review_model,
+                    user_model,
+                    max_batch_size=int(os.getenv('REVIEW_WRITE_BATCH_SIZE', 100)),
+                    max_delay_seconds=float(os.getenv('REVIEW_WRITE_MAX_DELAY_MS', 20)) / 1000,
+                    max_pending=int(os.getenv('REVIEW_WRITE_MAX_PENDING', 5000)),
+                    durability=os.getenv('REVIEW_WRITE_DURABILITY', DURABILITY_FLUSHED).lower()
+                )
+                # Queued reviews are written before the process exits
+                atexit.register(_batcher.stop)
+    return _batcher
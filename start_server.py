@@ -92,7 +92,18 @@ def start_server():
         print("-" * 50)
         
         # Import and run the Flask app
-        from app import app
+        from app import app, start_analysis_job_workers
+        from config.database import get_database
+        from config.migrations import apply_migrations
+        try:
+            apply_migrations(get_database().db)
+        except Exception as e:
+            print(f"⚠️  Failed to apply migrations: {e}")
+        
+        # The debug reloader runs the server in a child process; only that
+        # process processes jobs
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_analysis_job_workers()
         app.run(host='0.0.0.0', port=5000, debug=True)
         
     except KeyboardInterrupt:
@@ -0,0 +1,59 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+import routes.analytics as analytics
+
+
+@pytest.fixture
+def client(monkeypatch):
+    database = mongomock.MongoClient().db
+    user_id = database.users.insert_one({
+        'email': 'admin@example.com', 'firstName': 'Ada', 'lastName': 'Admin',
+        'createdAt': datetime.utcnow(), 'isActive': True
+    }).inserted_id
+    monkeypatch.setattr(analytics, 'db', SimpleNamespace(
+        db=database, get_users_collection=lambda: database.users))
+
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'analytics-access-test-secret-0123456789'
+    JWTManager(app)
+    app.register_blueprint(analytics.analytics_bp)
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return app.test_client(), {'Authorization': f'Bearer {token}'}
+
+
+def test_empty_allowlist_denies_access(client, monkeypatch):
+    test_client, headers = client
+    monkeypatch.setattr(analytics, 'ANALYTICS_ALLOWED_EMAILS', set())
+
+    assert test_client.get('/analytics/titles', headers=headers).status_code == 403
+
+
+def test_unlisted_user_is_denied(client, monkeypatch):
+    test_client, headers = client
+    monkeypatch.setattr(analytics, 'ANALYTICS_ALLOWED_EMAILS', {'someone@example.com'})
+
+    assert test_client.get('/analytics/titles', headers=headers).status_code == 403
+
+
+def test_listed_user_is_allowed(client, monkeypatch):
+    test_client, headers = client
+    monkeypatch.setattr(analytics, 'ANALYTICS_ALLOWED_EMAILS', {'admin@example.com'})
+
+    response = test_client.get('/analytics/titles', headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['titles'] == []
+
+
+def test_anonymous_requests_are_rejected(client, monkeypatch):
+    test_client, _ = client
+    monkeypatch.setattr(analytics, 'ANALYTICS_ALLOWED_EMAILS', {'admin@example.com'})
+
+    assert test_client.get('/analytics/titles').status_code == 401
@@ -0,0 +1,129 @@
+import time
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from services.job_queue import (
+    JobQueue, CallbackURLError, check_callback_url, JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, JOB_STATUS_RUNNING
+)
+
+USER_ID = '665f1c2e8b3e4a0012345678'
+
+
+@pytest.fixture
+def queue():
+    collection = mongomock.MongoClient().db.analysis_jobs
+    return JobQueue(lambda: collection, lambda payload: {'ok': True}, max_attempts=2)
+
+
+@pytest.mark.parametrize('url', [
+    'http://127.0.0.1/hook',
+    'http://localhost:8080/hook',
+    'http://10.0.0.5/hook',
+    'http://192.168.1.10/hook',
+    'http://169.254.169.254/latest/meta-data/',
+    'http://[::1]/hook',
+    'http://[::ffff:127.0.0.1]/hook',
+    'http://0.0.0.0/hook',
+    'ftp://93.184.216.34/hook',
+    'not a url',
+])
+def test_callback_url_rejects_internal_addresses(url):
+    with pytest.raises(CallbackURLError):
+        check_callback_url(url)
+
+
+def test_callback_url_accepts_public_address():
+    check_callback_url('https://93.184.216.34/hook')
+
+
+def test_callback_url_allowlist():
+    check_callback_url('https://hooks.example.com/done', ['hooks.example.com'])
+    with pytest.raises(CallbackURLError):
+        check_callback_url('https://other.example.com/done', ['hooks.example.com'])
+
+
+def test_anonymous_jobs_cannot_register_callbacks(queue):
+    with pytest.raises(CallbackURLError):
+        queue.submit({}, callback_url='https://93.184.216.34/hook')
+
+
+def test_anonymous_job_requires_access_token(queue):
+    job = queue.submit({'resumeText': 'text'})
+
+    assert job['accessToken']
+    assert queue.get_job(job['jobId']) is None
+    assert queue.get_job(job['jobId'], access_token='wrong') is None
+    assert queue.get_job(job['jobId'], user_id=USER_ID) is None
+    assert queue.get_job(job['jobId'], access_token=job['accessToken'])['jobId'] == job['jobId']
+
+
+def test_user_job_is_only_visible_to_its_owner(queue):
+    job = queue.submit({'resumeText': 'text'}, user_id=USER_ID)
+
+    assert job['accessToken'] is None
+    assert queue.get_job(job['jobId'], user_id=USER_ID)['jobId'] == job['jobId']
+    assert queue.get_job(job['jobId'], user_id='665f1c2e8b3e4a0087654321') is None
+
+
+def test_expired_lease_on_last_attempt_fails_job(queue, monkeypatch):
+    callbacks = []
+    monkeypatch.setattr(queue, '_send_callback', callbacks.append)
+    job = queue.submit({'resumeText': 'text'}, user_id=USER_ID, callback_url='https://93.184.216.34/hook')
+    queue._get_collection().update_one({}, {'$set': {
+        'status': JOB_STATUS_RUNNING,
+        'attempts': 2,
+        'leaseExpiresAt': datetime.utcnow() - timedelta(seconds=1)
+    }})
+
+    queue._fail_exhausted_jobs()
+
+    assert queue._claim_next_job() is None
+    finished = queue.get_job(job['jobId'], user_id=USER_ID)
+    assert finished['status'] == JOB_STATUS_FAILED
+    assert 'after 2 attempts' in finished['error']
+    assert 'payload' not in queue._get_collection().find_one()
+    assert len(callbacks) == 1
+
+
+def test_heartbeat_keeps_long_job_from_being_reclaimed():
+    collection = mongomock.MongoClient().db.analysis_jobs
+    calls = []
+
+    def slow_handler(payload):
+        calls.append(payload)
+        time.sleep(1.0)
+        return {'ok': True}
+
+    queue = JobQueue(lambda: collection, slow_handler, max_workers=2, lease_seconds=0.3, poll_interval=0.05)
+    job = queue.submit({'resumeText': 'text'}, user_id=USER_ID)
+    queue.start()
+    try:
+        deadline = time.monotonic() + 5
+        while queue.get_job(job['jobId'], user_id=USER_ID)['status'] != JOB_STATUS_COMPLETED:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+    finally:
+        queue.stop(wait=True)
+
+    assert len(calls) == 1
+    assert queue.get_job(job['jobId'], user_id=USER_ID)['attempts'] == 1
+
+
+def test_result_is_discarded_after_losing_the_lease(queue, monkeypatch):
+    callbacks = []
+    monkeypatch.setattr(queue, '_send_callback', callbacks.append)
+    job = queue.submit({'resumeText': 'text'}, user_id=USER_ID, callback_url='https://93.184.216.34/hook')
+    claimed = queue._claim_next_job()
+    # Another worker reclaimed the job after the lease expired
+    queue._get_collection().update_one({}, {'$set': {'leaseId': 'other-worker'}})
+    queue._slots.acquire()
+
+    queue._run_job(claimed)
+
+    stored = queue._get_collection().find_one()
+    assert stored['status'] == JOB_STATUS_RUNNING
+    assert stored['leaseId'] == 'other-worker'
+    assert callbacks == []
+    assert queue.get_job(job['jobId'], user_id=USER_ID)['result'] is None
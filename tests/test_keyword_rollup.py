@@ -0,0 +1,68 @@
+import threading
+
+import mongomock
+from bson import ObjectId
+
+from models.review import Review
+
+USER_ID = '665f1c2e8b3e4a0012345678'
+
+
+def review_data(keywords):
+    return {
+        'userId': USER_ID, 'jobTitle': 'Engineer', 'jobDescription': 'Python',
+        'resumeFileName': 'resume.pdf', 'matchScore': 60, 'missingKeywords': keywords
+    }
+
+
+def legacy_model():
+    """A user whose stats predate keyword rollups, with one review"""
+    collection = mongomock.MongoClient().db.reviews
+    model = Review(collection)
+    collection.insert_one(model.new_review_document(review_data(['Docker'])))
+    model.stats.get(ObjectId(USER_ID))
+    return model
+
+
+def frequencies(model):
+    return {item['keyword']: item['frequency'] for item in model.get_trending_keywords(USER_ID)}
+
+
+def test_first_write_builds_rollups_from_existing_reviews():
+    model = legacy_model()
+
+    model.create_review(review_data(['Docker', 'Kubernetes']))
+
+    assert frequencies(model) == {'Docker': 2, 'Kubernetes': 1}
+
+
+def test_review_saved_during_rebuild_is_counted_once(monkeypatch):
+    model = legacy_model()
+    rebuild = model.keywords.rebuild
+    writer = threading.Thread(target=model.create_review, args=(review_data(['Docker']),))
+
+    def rebuild_while_review_is_saved(user_id):
+        # A review saved while the rollups are rebuilt waits for the rebuild
+        writer.start()
+        writer.join(timeout=0.5)
+        assert writer.is_alive()
+        rebuild(user_id)
+
+    monkeypatch.setattr(model.keywords, 'rebuild', rebuild_while_review_is_saved)
+
+    assert frequencies(model) == {'Docker': 1}
+    writer.join(timeout=5)
+    assert frequencies(model) == {'Docker': 2}
+
+
+def test_failed_rebuild_releases_the_lease(monkeypatch):
+    model = legacy_model()
+
+    def fail(user_id):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(model.keywords, 'rebuild', fail)
+    assert model.get_trending_keywords(USER_ID) == []
+    monkeypatch.undo()
+
+    assert frequencies(model) == {'Docker': 1}
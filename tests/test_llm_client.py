@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from services.llm_client import CircuitBreaker, FakeBackend, LLMClient, CircuitOpenError
+
+
+def half_open_client(latency_seconds=0.0):
+    breaker = CircuitBreaker(open_seconds=0)
+    breaker._open()
+    client = LLMClient(FakeBackend(latency_seconds=latency_seconds, seed=1), max_retries=0,
+                       backoff_base_seconds=0, breaker=breaker)
+    return client, breaker
+
+
+def test_abandoned_stream_releases_half_open_probe():
+    client, breaker = half_open_client()
+
+    stream = client.stream('prompt')
+    next(stream)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+    stream.close()
+
+    assert breaker.allow_request()
+    assert client.get_stats()['inFlight'] == 0
+
+
+def test_completed_stream_closes_breaker():
+    client, breaker = half_open_client()
+
+    assert ''.join(client.stream('prompt'))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_async_call_releases_half_open_probe():
+    client, breaker = half_open_client(latency_seconds=10)
+
+    async def cancel_call():
+        task = asyncio.ensure_future(client.agenerate('prompt'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_call())
+
+    assert breaker.allow_request()
+
+
+def test_open_breaker_rejects_calls():
+    breaker = CircuitBreaker(open_seconds=60)
+    breaker._open()
+    client = LLMClient(FakeBackend(latency_seconds=0), breaker=breaker)
+
+    with pytest.raises(CircuitOpenError):
+        client.generate('prompt')
@@ -0,0 +1,36 @@
+import threading
+
+import pytest
+
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def test_timeout_raises_busy_and_keeps_slot_until_hash_finishes():
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=1, timeout_seconds=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher._run(release.wait, 5)
+
+        # The timed-out hash is still running, so its slot is still taken
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash('password')
+
+        release.set()
+        assert hasher.verify('password', hasher.hash('password'))
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(rounds=4)
+    try:
+        hashed = hasher.hash('correct horse')
+
+        assert hasher.verify('correct horse', hashed)
+        assert not hasher.verify('wrong', hashed)
+        assert not hasher.verify('anything', 'not-a-hash')
+        assert hasher.needs_rehash(PasswordHasher(rounds=5).hash('x'))
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fixtures import build_resume_pdf
+from services.cache import ExtractionCache
+from services.pdf_extraction import PDFExtractionEngine
+
+
+class BlockingPersistentBackend:
+    """Persistent cache tier whose writes wait until released, then fail"""
+
+    name = 'blocking'
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.writes = 0
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl_seconds):
+        self.writes += 1
+        self.release.wait(5)
+        raise RuntimeError('cache backend unavailable')
+
+
+@pytest.fixture
+def engine():
+    backend = BlockingPersistentBackend()
+    engine = PDFExtractionEngine(processes=1, timeout_seconds=10, cache=ExtractionCache(
+        1024 * 1024, persistent=backend))
+    yield engine, backend
+    backend.release.set()
+    engine.shutdown()
+
+
+def test_slow_cache_writes_do_not_delay_results(engine):
+    engine, backend = engine
+
+    first = engine.extract(build_resume_pdf(1, seed=1))
+    started = time.perf_counter()
+    second = engine.extract(build_resume_pdf(1, seed=2))
+
+    assert not first['cached'] and not second['cached']
+    assert time.perf_counter() - started < 2
+    assert backend.writes >= 1
+
+
+def test_failed_cache_write_keeps_engine_working(engine):
+    engine, backend = engine
+    backend.release.set()
+    data = build_resume_pdf(1, seed=3)
+
+    assert not engine.extract(data)['cached']
+    engine._cache_writer.submit(lambda: None).result(timeout=5)
+
+    # The memory tier was written before the persistent tier failed
+    assert engine.extract(data)['cached']
+    assert not engine.extract(build_resume_pdf(1, seed=4))['cached']
+
+
+def test_shutdown_without_pool_or_cache():
+    PDFExtractionEngine(cache=ExtractionCache(1024)).shutdown()
+    PDFExtractionEngine().shutdown()
+
+
+def test_shutdown_stops_started_pool():
+    engine = PDFExtractionEngine(processes=1)
+    engine.extract(build_resume_pdf(1))
+    pool = engine._pool
+
+    engine.shutdown()
+
+    assert engine._pool is None
+    assert not any(process.is_alive() for process in pool._pool)
@@ -0,0 +1,42 @@
+from services.pdf_extraction import PAGE_SEPARATOR
+from services.prompt_builder import compress_text, strip_page_headers
+
+
+def test_date_lines_at_page_edges_are_kept():
+    pages = [
+        "Jane Doe\nSenior Engineer, Acme\n2021 - 2023",
+        "2018 - 2020\nEngineer, Initech\nBuilt billing services",
+    ]
+
+    text = strip_page_headers(PAGE_SEPARATOR.join(pages))
+
+    assert "2021 - 2023" in text
+    assert "2018 - 2020" in text
+
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    pages = [
+        "Jane Doe - Resume\nSummary\nBackend engineer\nPage 1 of 3",
+        "Jane Doe - Resume\nExperience\nAcme 2019 - 2023\nPage 2 of 3",
+        "Jane Doe - Resume\nSkills\nPython, Go\nPage 3 of 3",
+    ]
+
+    text = strip_page_headers(PAGE_SEPARATOR.join(pages))
+
+    assert text.count("Jane Doe - Resume") == 1
+    assert "Page 2 of 3" not in text
+    assert "Page 3 of 3" not in text
+    assert "Acme 2019 - 2023" in text
+
+
+def test_bare_and_slashed_page_numbers_are_removed():
+    pages = ["Summary\nBackend engineer\n1 / 2", "Skills\nPython, Go\n2 / 2"]
+
+    text = strip_page_headers(PAGE_SEPARATOR.join(pages))
+
+    assert "2 / 2" not in text
+    assert "Python, Go" in text
+
+
+def test_compress_text_drops_duplicate_lines_and_extra_spaces():
+    assert compress_text("Python   Go\n\n\n\nPython Go\nSQL") == "Python Go\n\nSQL"
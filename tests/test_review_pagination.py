@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from models.review import Review
+
+USER_ID = '665f1c2e8b3e4a0012345678'
+
+
+@pytest.fixture
+def model():
+    collection = mongomock.MongoClient().db.reviews
+    start = datetime(2024, 1, 1)
+    collection.insert_many([
+        {'userId': ObjectId(USER_ID), 'jobTitle': f'Job {i}', 'createdAt': start + timedelta(days=i)}
+        for i in range(3)
+    ])
+    return Review(collection)
+
+
+def test_listing_cursor_continues_after_the_last_review(model):
+    first = model.get_user_reviews(USER_ID, limit=2, fields=['jobTitle'])
+    second = model.get_user_reviews(USER_ID, limit=2, after=first['nextCursor'], fields=['jobTitle'])
+
+    assert [review['jobTitle'] for review in first['reviews']] == ['Job 2', 'Job 1']
+    assert [review['jobTitle'] for review in second['reviews']] == ['Job 0']
+
+
+@pytest.mark.parametrize('values', [
+    [{'$gt': datetime(1970, 1, 1)}, ObjectId()],
+    [datetime(2024, 1, 1), {'$ne': None}],
+    ['2024-01-01', ObjectId()],
+])
+def test_listing_cursor_with_other_types_is_rejected(model, values):
+    with pytest.raises(ValueError, match='Invalid pagination cursor'):
+        model.get_user_reviews(USER_ID, after=Review.encode_cursor(values))
+
+
+@pytest.mark.parametrize('values', [
+    [{'$gt': 0}, ObjectId()],
+    [datetime(2024, 1, 1), ObjectId()],
+    [1.5, 'not-an-id'],
+])
+def test_search_cursor_with_other_types_is_rejected(model, values):
+    with pytest.raises(ValueError, match='Invalid pagination cursor'):
+        model.search_reviews(USER_ID, 'job', after=Review.encode_cursor(values))
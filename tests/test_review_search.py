@@ -0,0 +1,31 @@
+import mongomock
+import pytest
+from pymongo.errors import OperationFailure
+
+from models.review import Review, SearchIndexMissingError
+
+USER_ID = '665f1c2e8b3e4a0012345678'
+
+
+def review_model(error):
+    collection = mongomock.MongoClient().db.reviews
+
+    def aggregate(pipeline, *args, **kwargs):
+        raise error
+
+    collection.aggregate = aggregate
+    return Review(collection)
+
+
+def test_search_without_text_index_raises():
+    model = review_model(OperationFailure('text index required for $text query', code=27))
+
+    with pytest.raises(SearchIndexMissingError, match='manage.py migrate'):
+        model.search_reviews(USER_ID, 'python')
+
+
+def test_search_errors_are_not_reported_as_empty_results():
+    model = review_model(OperationFailure('interrupted', code=11601))
+
+    with pytest.raises(OperationFailure):
+        model.search_reviews(USER_ID, 'python')
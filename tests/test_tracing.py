@@ -0,0 +1,31 @@
+from flask import Flask
+
+import services.tracing as tracing
+
+
+class RecordingExporter:
+    name = 'recording'
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+def test_request_span_target_omits_query_string(monkeypatch):
+    exporter = RecordingExporter()
+    monkeypatch.setattr(tracing, '_tracer', tracing.Tracer(exporter, sample_rate=1.0))
+    app = Flask(__name__)
+    tracing.init_app(app)
+
+    @app.route('/analyze/jobs/<job_id>')
+    def get_job(job_id):
+        return 'ok'
+
+    response = app.test_client().get('/analyze/jobs/123?token=secret&q=python')
+
+    assert response.status_code == 200
+    root = exporter.traces[0].spans[-1]
+    assert root.attributes['http.target'] == '/analyze/jobs/123'
+    assert 'secret' not in repr(root.attributes)
@@ -0,0 +1,59 @@
+import mongomock
+from bson import ObjectId
+
+from models.review import Review
+
+USER_ID = '665f1c2e8b3e4a0012345678'
+
+
+def review_data(score):
+    return {
+        'userId': USER_ID, 'jobTitle': 'Engineer', 'jobDescription': 'Python',
+        'resumeFileName': 'resume.pdf', 'matchScore': score
+    }
+
+
+def lose_first_build_to_stale_read(model, monkeypatch):
+    """Make the next stats build lose its insert to a concurrent build that read no reviews"""
+    stale = model.stats._compute(ObjectId(USER_ID))
+    compute = model.stats._compute
+
+    def compute_then_lose_race(user_id):
+        stats = compute(user_id)
+        model.stats.collection.update_one({'_id': user_id}, {'$setOnInsert': stale}, upsert=True)
+        return stats
+
+    monkeypatch.setattr(model.stats, '_compute', compute_then_lose_race)
+
+
+def test_first_review_survives_losing_the_stats_build(monkeypatch):
+    model = Review(mongomock.MongoClient().db.reviews)
+    lose_first_build_to_stale_read(model, monkeypatch)
+
+    model.create_review(review_data(72))
+
+    stats = model.stats.get(ObjectId(USER_ID))
+    assert (stats['count'], stats['scoreSum'], stats['histogram']) == (1, 72, {'7': 1})
+
+
+def test_first_batch_survives_losing_the_stats_build(monkeypatch):
+    model = Review(mongomock.MongoClient().db.reviews)
+    lose_first_build_to_stale_read(model, monkeypatch)
+
+    review_docs = [model.new_review_document(review_data(score)) for score in (40, 95)]
+    assert model.insert_documents(review_docs) == {}
+    assert model.update_derived_stats(review_docs)
+
+    stats = model.stats.get(ObjectId(USER_ID))
+    assert (stats['count'], stats['scoreSum'], stats['histogram']) == (2, 135, {'4': 1, '9': 1})
+
+
+def test_existing_reviews_are_counted_once_when_stats_are_built():
+    collection = mongomock.MongoClient().db.reviews
+    model = Review(collection)
+    collection.insert_one(model.new_review_document(review_data(50)))
+
+    model.create_review(review_data(60))
+
+    stats = model.stats.get(ObjectId(USER_ID))
+    assert (stats['count'], stats['scoreSum']) == (2, 110)
@@ -0,0 +1,71 @@
+import mongomock
+import pytest
+from pymongo.errors import BulkWriteError
+
+from models.review import Review
+from services.write_batcher import ReviewWriteBatcher
+
+USER_ID = '665f1c2e8b3e4a0012345678'
+
+
+class StubUserModel:
+    def __init__(self):
+        self.updates = []
+
+    def update_user_stats_bulk(self, review_scores):
+        self.updates.append(dict(review_scores))
+        return True
+
+
+def review_data(title):
+    return {
+        'userId': USER_ID, 'jobTitle': title, 'jobDescription': 'Build APIs',
+        'resumeFileName': 'resume.pdf', 'matchScore': 80, 'missingKeywords': ['Go']
+    }
+
+
+@pytest.fixture
+def review_model():
+    return Review(mongomock.MongoClient().db.reviews)
+
+
+def make_batcher(review_model, user_model, max_delay_seconds=0.01):
+    return ReviewWriteBatcher(lambda: review_model, lambda: user_model, max_delay_seconds=max_delay_seconds)
+
+
+def test_derived_stat_failure_still_reports_saved_reviews(review_model, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('stats unavailable')
+
+    monkeypatch.setattr(review_model.stats, 'reviews_created', fail)
+    user_model = StubUserModel()
+    batcher = make_batcher(review_model, user_model)
+
+    submitted = [batcher.submit(review_data(f"Engineer {index}")) for index in range(3)]
+    results = [future.result(timeout=5) for _, future in submitted]
+    batcher.stop(timeout=5)
+
+    assert results == [review['id'] for review, _ in submitted]
+    assert review_model.collection.count_documents({}) == 3
+    assert user_model.updates
+
+
+def test_partial_insert_failure_only_fails_rejected_reviews(review_model, monkeypatch):
+    insert_many = review_model.collection.insert_many
+
+    def insert_with_one_failure(docs, ordered=True):
+        insert_many(docs[1:], ordered=ordered)
+        raise BulkWriteError({'writeErrors': [{'index': 0, 'errmsg': 'duplicate key'}]})
+
+    monkeypatch.setattr(review_model.collection, 'insert_many', insert_with_one_failure)
+    # Long enough for all three reviews to share one batch
+    batcher = make_batcher(review_model, StubUserModel(), max_delay_seconds=0.2)
+
+    submitted = [batcher.submit(review_data(f"Engineer {index}")) for index in range(3)]
+    batcher.flush(timeout=5)
+    batcher.stop(timeout=5)
+
+    futures = [future for _, future in submitted]
+    with pytest.raises(Exception, match='duplicate key'):
+        futures[0].result(timeout=1)
+    assert [future.result(timeout=1) for future in futures[1:]] == [review['id'] for review, _ in submitted[1:]]
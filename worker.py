@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Standalone worker process for queued Smart ATS analysis jobs and the
+scheduled analytics pipeline
+"""
+import os
+import signal
+import threading
+
+from app import analysis_job_queue, logger
+from config.database import get_database
+from services.analytics_pipeline import create_analytics_pipeline
+
+# Seconds between analytics pipeline runs (0 disables the schedule)
+ANALYTICS_INTERVAL_SECONDS = int(os.getenv('ANALYTICS_INTERVAL_SECONDS', 900))
+
+
+def main():
+    """Process analysis jobs until interrupted"""
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, finishing running jobs")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    analysis_job_queue.start()
+
+    analytics_pipeline = create_analytics_pipeline(lambda: get_database().db)
+    if ANALYTICS_INTERVAL_SECONDS > 0:
+        analytics_pipeline.start(ANALYTICS_INTERVAL_SECONDS)
+
+    stop_event.wait()
+    analytics_pipeline.stop(wait=True)
+    analysis_job_queue.stop(wait=True)
+
+
+if __name__ == "__main__":
+    main()